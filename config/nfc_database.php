@@ -0,0 +1,17 @@
+<?php
+// Gemeinsame Datenbankverbindung der NFC-Endpunkte
+// Zugangsdaten kommen aus .env (über config/config.php) - nie in die Endpunkte schreiben
+
+function nfcDatabase(): PDO {
+    static $pdo = null;
+    if ($pdo === null) {
+        $config = require __DIR__ . '/config.php';
+        $db = $config['database'];
+        $charset = $db['charset'] ?: 'utf8mb4';
+        $pdo = new PDO("mysql:host={$db['host']};dbname={$db['name']};charset=$charset", $db['user'], $db['password'], [
+            PDO::ATTR_ERRMODE => PDO::ERRMODE_EXCEPTION,
+            PDO::ATTR_DEFAULT_FETCH_MODE => PDO::FETCH_ASSOC
+        ]);
+    }
+    return $pdo;
+}
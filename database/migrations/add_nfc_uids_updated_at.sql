@@ -0,0 +1,7 @@
+-- Änderungszeitpunkt für UID-Zuordnungen (nfc_catalog.php Delta-Abgleich)
+-- Wird eine UID einer anderen Spule zugeordnet (UPDATE auf filament_nfc_uids),
+-- liefert das nächste Delta sie mit der neuen Spule aus. Vor dieser Migration
+-- erschienen nur neue Zuordnungen im Delta.
+ALTER TABLE filament_nfc_uids
+    ADD COLUMN updated_at DATETIME NULL ON UPDATE CURRENT_TIMESTAMP AFTER created_at,
+    ADD INDEX idx_updated_at (updated_at);
@@ -0,0 +1,58 @@
+-- Änderungs-Ereignisse für Scanner (nfc_events.php)
+-- Trigger halten jede Änderung an Spulen und UID-Zuordnungen fest; die
+-- fortlaufende id ist die SSE Event-ID, ab der Scanner nach einem
+-- Verbindungsabbruch weiterlesen (Last-Event-ID). scripts/backup-cron.php
+-- löscht Ereignisse nach NFC_EVENT_RETENTION_DAYS (7 Tage).
+CREATE TABLE IF NOT EXISTS nfc_change_events (
+    id BIGINT PRIMARY KEY AUTO_INCREMENT,
+    event ENUM('spool', 'bind', 'unbind') NOT NULL,
+    filament_id INT NOT NULL,
+    nfc_uid VARCHAR(128) NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    INDEX idx_created_at (created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+DROP TRIGGER IF EXISTS trg_filaments_change_event;
+DROP TRIGGER IF EXISTS trg_filaments_delete_event;
+DROP TRIGGER IF EXISTS trg_nfc_uids_bind_event;
+DROP TRIGGER IF EXISTS trg_nfc_uids_update_event;
+DROP TRIGGER IF EXISTS trg_nfc_uids_unbind_event;
+
+DELIMITER //
+
+CREATE TRIGGER trg_filaments_change_event AFTER UPDATE ON filaments
+FOR EACH ROW
+BEGIN
+    INSERT INTO nfc_change_events (event, filament_id) VALUES ('spool', NEW.id);
+END//
+
+-- ON DELETE CASCADE löst keine Trigger auf filament_nfc_uids aus
+CREATE TRIGGER trg_filaments_delete_event AFTER DELETE ON filaments
+FOR EACH ROW
+BEGIN
+    INSERT INTO nfc_change_events (event, filament_id) VALUES ('spool', OLD.id);
+END//
+
+CREATE TRIGGER trg_nfc_uids_bind_event AFTER INSERT ON filament_nfc_uids
+FOR EACH ROW
+BEGIN
+    INSERT INTO nfc_change_events (event, filament_id, nfc_uid) VALUES ('bind', NEW.filament_id, NEW.nfc_uid);
+END//
+
+CREATE TRIGGER trg_nfc_uids_update_event AFTER UPDATE ON filament_nfc_uids
+FOR EACH ROW
+BEGIN
+    IF OLD.nfc_uid <> NEW.nfc_uid OR OLD.filament_id <> NEW.filament_id THEN
+        INSERT INTO nfc_change_events (event, filament_id, nfc_uid) VALUES ('unbind', OLD.filament_id, OLD.nfc_uid);
+    END IF;
+    INSERT INTO nfc_change_events (event, filament_id, nfc_uid) VALUES ('bind', NEW.filament_id, NEW.nfc_uid);
+END//
+
+CREATE TRIGGER trg_nfc_uids_unbind_event AFTER DELETE ON filament_nfc_uids
+FOR EACH ROW
+BEGIN
+    INSERT INTO nfc_change_events (event, filament_id, nfc_uid) VALUES ('unbind', OLD.filament_id, OLD.nfc_uid);
+END//
+
+DELIMITER ;
@@ -0,0 +1,144 @@
+<?php
+/**
+ * NFC Katalog für Scanner-Spiegel
+ * Liefert die UID → Spule Zuordnung (dieselben Felder wie nfc_lookup.php)
+ * komplett oder als Delta seit einem Cursor. Ohne Authentifizierung wie
+ * nfc_lookup.php (nur für Scanner im lokalen Netz).
+ *
+ * GET nfc_catalog.php              → alle aktiven Zuordnungen
+ * GET nfc_catalog.php?since=<cur>  → Änderungen seit <cur> inkl. deaktivierter Spulen
+ *                                    und umgehängter UIDs
+ */
+
+// Datenbankverbindung (Zugangsdaten aus .env)
+require_once __DIR__ . '/../config/nfc_database.php';
+
+header('Content-Type: application/json');
+header('Access-Control-Allow-Origin: *');
+header('Access-Control-Allow-Methods: GET, OPTIONS');
+header('Access-Control-Allow-Headers: Content-Type, X-Requested-With');
+header('X-Robots-Tag: noindex');
+header('Cache-Control: no-store');
+
+// Handle OPTIONS requests
+if ($_SERVER['REQUEST_METHOD'] === 'OPTIONS') {
+    http_response_code(200);
+    exit;
+}
+
+// Only allow GET
+if ($_SERVER['REQUEST_METHOD'] !== 'GET') {
+    http_response_code(405);
+    echo json_encode(['error' => 'Method not allowed']);
+    exit;
+}
+
+// Cursor: DATETIME des letzten Abgleichs ('Y-m-d H:i:s')
+$since = $_GET['since'] ?? null;
+if ($since !== null && $since !== '') {
+    $parsed = DateTime::createFromFormat('Y-m-d H:i:s', $since);
+    if (!$parsed || $parsed->format('Y-m-d H:i:s') !== $since) {
+        http_response_code(400);
+        echo json_encode(['error' => 'since must be a cursor returned by this endpoint']);
+        exit;
+    }
+} else {
+    $since = null;
+}
+
+try {
+    $pdo = nfcDatabase();
+
+    // Cursor vor der Abfrage festhalten: was danach geändert wird, kommt beim nächsten Delta.
+    // Der Client fragt mit >= ab, Zeilen derselben Sekunde kommen also eher doppelt als gar nicht.
+    $cursor = $pdo->query("SELECT DATE_FORMAT(NOW(), '%Y-%m-%d %H:%i:%s') AS now")->fetch()['now'];
+
+    $sql = "
+        SELECT
+            s.id,
+            s.uuid,
+            s.material,
+            s.total_weight,
+            s.remaining_weight,
+            s.location,
+            s.created_at,
+            s.is_active,
+            t.name as filament_type,
+            c.name as color_name,
+            nfc.id as nfc_uid_id,
+            nfc.nfc_uid,
+            nfc.tag_type,
+            nfc.tag_position,
+            nfc.is_primary
+        FROM filaments s
+        LEFT JOIN filament_types t ON s.type_id = t.id
+        LEFT JOIN colors c ON s.color_id = c.id
+        INNER JOIN filament_nfc_uids nfc ON s.id = nfc.filament_id
+    ";
+
+    if ($since === null) {
+        $stmt = $pdo->query($sql . " WHERE s.is_active = 1");
+    } else {
+        // Deaktivierte Spulen mitliefern, damit der Client sie entfernt. Geänderte
+        // Zuordnungen (UID auf andere Spule umgehängt) kommen über nfc.updated_at
+        // (database/migrations/add_nfc_uids_updated_at.sql) mit der neuen Spule.
+        $stmt = $pdo->prepare($sql . " WHERE COALESCE(s.updated_at, s.created_at) >= ? OR COALESCE(nfc.updated_at, nfc.created_at) >= ?");
+        $stmt->execute([$since, $since]);
+    }
+
+    $entries = [];
+    foreach ($stmt->fetchAll() as $row) {
+        $entries[] = buildCatalogEntry($row);
+    }
+
+    // Gelöschte UID-Zuordnungen hinterlassen keine Zeile - der Client vergleicht
+    // seine Größe mit total und lädt bei Abweichung komplett neu
+    $total = (int)$pdo->query("
+        SELECT COUNT(*) AS total
+        FROM filament_nfc_uids nfc
+        INNER JOIN filaments s ON s.id = nfc.filament_id
+        WHERE s.is_active = 1
+    ")->fetch()['total'];
+
+    echo json_encode([
+        'full' => $since === null,
+        'cursor' => $cursor,
+        'total' => $total,
+        'entries' => $entries
+    ]);
+
+} catch (Exception $e) {
+    http_response_code(500);
+    echo json_encode([
+        'error' => 'Database error',
+        'message' => $e->getMessage()
+    ]);
+}
+
+/**
+ * Build one catalog entry - 'spool' and 'nfc_info' match the nfc_lookup.php response
+ */
+function buildCatalogEntry(array $row): array
+{
+    return [
+        'nfc_uid' => $row['nfc_uid'],
+        'active' => (bool)$row['is_active'],
+        'spool' => [
+            'id' => $row['id'],
+            'uuid' => $row['uuid'],
+            'material' => $row['material'],
+            'filament_type' => $row['filament_type'],
+            'color_name' => $row['color_name'],
+            'total_weight' => (float)$row['total_weight'],
+            'remaining_weight' => (float)$row['remaining_weight'],
+            'location' => $row['location'],
+            'created_at' => $row['created_at']
+        ],
+        'nfc_info' => [
+            'nfc_uid' => $row['nfc_uid'],
+            'tag_type' => $row['tag_type'],
+            'tag_position' => $row['tag_position'],
+            'is_primary' => (bool)$row['is_primary']
+        ]
+    ];
+}
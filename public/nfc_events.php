@@ -0,0 +1,192 @@
+<?php
+/**
+ * NFC Änderungs-Stream für Scanner (Server-Sent Events)
+ * Meldet Spulen-Änderungen und UID-Zuordnungen aus nfc_change_events, damit
+ * Scanner Cache und Katalog-Spiegel sofort anpassen. Ohne Authentifizierung
+ * wie nfc_lookup.php (nur für Scanner im lokalen Netz).
+ *
+ * GET nfc_events.php  (Header Last-Event-ID oder ?last_event_id=<id> zum Fortsetzen)
+ *
+ * event: spool   data: {spool_id, active, entries: [Katalogzeilen wie nfc_catalog.php]}
+ * event: bind    data: {spool_id, nfc_uid, entry: Katalogzeile oder null}
+ * event: unbind  data: {spool_id, nfc_uid}
+ * event: reset   data: {reason} - Ereignisse fehlen, Client muss alles verwerfen
+ *
+ * Jeder verbundene Scanner belegt für die Dauer einer Verbindung einen PHP-Worker
+ * (bis zu STREAM_DURATION Sekunden, danach verbindet er sich neu). Der Worker-Pool
+ * (z.B. pm.max_children bei PHP-FPM) muss also mindestens so viele Worker wie
+ * Scanner mit CHANGE_STREAM=1 plus die normale Last haben. Ereignisse älter als
+ * NFC_EVENT_RETENTION_DAYS löscht scripts/backup-cron.php.
+ */
+
+// Datenbankverbindung (Zugangsdaten aus .env)
+require_once __DIR__ . '/../config/nfc_database.php';
+
+// Verbindung nach dieser Zeit beenden, der Client setzt mit Last-Event-ID fort.
+// Kurz halten: gibt den Worker regelmäßig frei und bleibt unter üblichen Proxy-Timeouts (60s)
+const STREAM_DURATION = 55;
+const POLL_INTERVAL = 1;
+const HEARTBEAT_INTERVAL = 15;
+const MAX_EVENTS_PER_POLL = 100;
+
+header('Access-Control-Allow-Origin: *');
+header('Access-Control-Allow-Methods: GET, OPTIONS');
+header('Access-Control-Allow-Headers: Last-Event-ID, X-Requested-With');
+header('X-Robots-Tag: noindex');
+
+// Handle OPTIONS requests
+if ($_SERVER['REQUEST_METHOD'] === 'OPTIONS') {
+    http_response_code(200);
+    exit;
+}
+
+// Only allow GET
+if ($_SERVER['REQUEST_METHOD'] !== 'GET') {
+    header('Content-Type: application/json');
+    http_response_code(405);
+    echo json_encode(['error' => 'Method not allowed']);
+    exit;
+}
+
+$lastEventId = $_SERVER['HTTP_LAST_EVENT_ID'] ?? ($_GET['last_event_id'] ?? null);
+$lastEventId = ($lastEventId !== null && ctype_digit((string)$lastEventId)) ? (int)$lastEventId : null;
+
+try {
+    $pdo = nfcDatabase();
+} catch (Exception $e) {
+    header('Content-Type: application/json');
+    http_response_code(500);
+    echo json_encode(['error' => 'Database error', 'message' => $e->getMessage()]);
+    exit;
+}
+
+set_time_limit(0);
+header('Content-Type: text/event-stream');
+header('Cache-Control: no-cache');
+header('Connection: keep-alive');
+header('X-Accel-Buffering: no');
+while (ob_get_level() > 0) {
+    ob_end_flush();
+}
+
+$range = $pdo->query("SELECT COALESCE(MIN(id), 0) AS first_id, COALESCE(MAX(id), 0) AS last_id FROM nfc_change_events")->fetch();
+
+if ($lastEventId === null) {
+    // Neuer Client: ab jetzt, den aktuellen Stand hat er aus Lookup bzw. Katalog
+    $lastEventId = (int)$range['last_id'];
+} elseif ($lastEventId > (int)$range['last_id'] || ((int)$range['first_id'] > $lastEventId + 1)) {
+    // Unbekannte oder bereits aufgeräumte Ereignisse - Lücke nicht überbrückbar
+    $lastEventId = (int)$range['last_id'];
+    sendEvent($lastEventId, 'reset', ['reason' => 'events_unavailable']);
+}
+
+// Wiederverbindung nach Ende des Streams
+echo "retry: 2000\n";
+sendEvent($lastEventId, 'ready', ['last_event_id' => $lastEventId]);
+
+$events = $pdo->prepare("SELECT id, event, filament_id, nfc_uid FROM nfc_change_events WHERE id > ? ORDER BY id LIMIT " . MAX_EVENTS_PER_POLL);
+$started = time();
+$lastSent = time();
+
+while (!connection_aborted() && time() - $started < STREAM_DURATION) {
+    $events->execute([$lastEventId]);
+    $rows = $events->fetchAll();
+
+    foreach ($rows as $row) {
+        $lastEventId = (int)$row['id'];
+        $spoolId = (int)$row['filament_id'];
+
+        if ($row['event'] === 'spool') {
+            $entries = findCatalogEntries($pdo, 's.id = ?', [$spoolId]);
+            $active = !empty($entries) && $entries[0]['active'];
+            sendEvent($lastEventId, 'spool', ['spool_id' => $spoolId, 'active' => $active, 'entries' => $entries]);
+        } elseif ($row['event'] === 'bind') {
+            $entries = findCatalogEntries($pdo, 'nfc.nfc_uid = ?', [$row['nfc_uid']]);
+            $entry = (!empty($entries) && $entries[0]['active']) ? $entries[0] : null;
+            sendEvent($lastEventId, 'bind', ['spool_id' => $spoolId, 'nfc_uid' => $row['nfc_uid'], 'entry' => $entry]);
+        } else {
+            sendEvent($lastEventId, 'unbind', ['spool_id' => $spoolId, 'nfc_uid' => $row['nfc_uid']]);
+        }
+        $lastSent = time();
+    }
+
+    if (count($rows) === MAX_EVENTS_PER_POLL) {
+        continue;
+    }
+
+    if (time() - $lastSent >= HEARTBEAT_INTERVAL) {
+        // Kommentarzeile hält Proxies und den Read-Timeout des Clients offen
+        echo ": ping\n\n";
+        flush();
+        $lastSent = time();
+    }
+
+    sleep(POLL_INTERVAL);
+}
+
+/**
+ * Send one SSE event
+ */
+function sendEvent(int $id, string $event, array $data): void
+{
+    echo "id: {$id}\n";
+    echo "event: {$event}\n";
+    echo "data: " . json_encode($data, JSON_UNESCAPED_UNICODE) . "\n\n";
+    flush();
+}
+
+/**
+ * Catalog entries (same shape as nfc_catalog.php) for a spool or UID
+ */
+function findCatalogEntries(PDO $pdo, string $where, array $params): array
+{
+    $stmt = $pdo->prepare("
+        SELECT
+            s.id,
+            s.uuid,
+            s.material,
+            s.total_weight,
+            s.remaining_weight,
+            s.location,
+            s.created_at,
+            s.is_active,
+            t.name as filament_type,
+            c.name as color_name,
+            nfc.nfc_uid,
+            nfc.tag_type,
+            nfc.tag_position,
+            nfc.is_primary
+        FROM filaments s
+        LEFT JOIN filament_types t ON s.type_id = t.id
+        LEFT JOIN colors c ON s.color_id = c.id
+        INNER JOIN filament_nfc_uids nfc ON s.id = nfc.filament_id
+        WHERE {$where}
+    ");
+    $stmt->execute($params);
+
+    $entries = [];
+    foreach ($stmt->fetchAll() as $row) {
+        $entries[] = [
+            'nfc_uid' => $row['nfc_uid'],
+            'active' => (bool)$row['is_active'],
+            'spool' => [
+                'id' => $row['id'],
+                'uuid' => $row['uuid'],
+                'material' => $row['material'],
+                'filament_type' => $row['filament_type'],
+                'color_name' => $row['color_name'],
+                'total_weight' => (float)$row['total_weight'],
+                'remaining_weight' => (float)$row['remaining_weight'],
+                'location' => $row['location'],
+                'created_at' => $row['created_at']
+            ],
+            'nfc_info' => [
+                'nfc_uid' => $row['nfc_uid'],
+                'tag_type' => $row['tag_type'],
+                'tag_position' => $row['tag_position'],
+                'is_primary' => (bool)$row['is_primary']
+            ]
+        ];
+    }
+    return $entries;
+}
@@ -3,6 +3,9 @@
  * Einfacher NFC Lookup Service
  * Kann ohne Authentifizierung verwendet werden (nur für Scanner)
  * WICHTIG: Umgeht alle Security-Middleware für Scanner-Access
+ *
+ * GET  nfc_lookup.php?nfc_uid=<uid>&scanner_id=<id>  → nur lesen, cachebar (Scans über nfc_scan_log.php)
+ * POST {"nfc_uid": ...} oder {"scans": [...]}         → Lookup + nfc_scan_log, mit "log": false nur lesen
  */
 
 // Session-Start um Security-Konflikte zu vermeiden
@@ -10,11 +13,8 @@ if (session_status() !== PHP_SESSION_ACTIVE) {
     session_start();
 }
 
-// Direkter Datenbankzugriff
-$host = 'localhost';
-$db = 'filament'; 
-$user = 'filament';
-$password = '7fLy2Ckr2NhyJYrA';
+// Datenbankverbindung (Zugangsdaten aus .env)
+require_once __DIR__ . '/../config/nfc_database.php';
 
 // CORS und Security Headers für Scanner
 header('Content-Type: application/json');
@@ -29,33 +29,87 @@ if ($_SERVER['REQUEST_METHOD'] === 'OPTIONS') {
     exit;
 }
 
-// Only allow POST
-if ($_SERVER['REQUEST_METHOD'] !== 'POST') {
+// Only allow GET (read-only) and POST
+if ($_SERVER['REQUEST_METHOD'] !== 'POST' && $_SERVER['REQUEST_METHOD'] !== 'GET') {
     http_response_code(405);
     echo json_encode(['error' => 'Method not allowed']);
     exit;
 }
 
-// Get JSON input
-$input = json_decode(file_get_contents('php://input'), true);
+// Maximum number of scans accepted in one batch request
+const MAX_BATCH_SIZE = 200;
 
-if (!$input || empty($input['nfc_uid'])) {
+// Read-only answers may be reused briefly (seconds) - spool edits reach scanners via nfc_events.php
+const LOOKUP_MAX_AGE = 10;
+
+if ($_SERVER['REQUEST_METHOD'] === 'GET') {
+    // Read-only lookup: the scanner uploads its scan log separately in batches
+    $input = [
+        'nfc_uid' => $_GET['nfc_uid'] ?? null,
+        'scanner_id' => $_GET['scanner_id'] ?? 'unknown',
+        'log' => false
+    ];
+} else {
+    // Get JSON input
+    $input = json_decode(file_get_contents('php://input'), true);
+}
+
+// Batch mode: {"scans": [{"nfc_uid": ..., "scanner_id": ..., "timestamp": ...}, ...]}
+$isBatch = is_array($input) && isset($input['scans']);
+
+if ($isBatch) {
+    if (!is_array($input['scans']) || empty($input['scans'])) {
+        http_response_code(400);
+        echo json_encode(['error' => 'scans must be a non-empty array']);
+        exit;
+    }
+    if (count($input['scans']) > MAX_BATCH_SIZE) {
+        http_response_code(400);
+        echo json_encode(['error' => 'Too many scans in batch (max ' . MAX_BATCH_SIZE . ')']);
+        exit;
+    }
+    $rawScans = array_values($input['scans']);
+} elseif (!$input || empty($input['nfc_uid'])) {
     http_response_code(400);
     echo json_encode(['error' => 'nfc_uid is required']);
     exit;
+} else {
+    $rawScans = [$input];
 }
 
-$nfcUid = trim($input['nfc_uid']);
-$scannerId = $input['scanner_id'] ?? 'unknown';
+$defaultScannerId = $input['scanner_id'] ?? 'unknown';
+
+// Older scanners rely on the lookup writing nfc_scan_log
+$logScans = !isset($input['log']) || $input['log'] !== false;
+$scans = [];
+
+foreach ($rawScans as $index => $rawScan) {
+    if (!is_array($rawScan) || empty($rawScan['nfc_uid']) || !is_string($rawScan['nfc_uid'])) {
+        http_response_code(400);
+        echo json_encode(['error' => "nfc_uid is required (scan {$index})"]);
+        exit;
+    }
+
+    // Scans replayed from the scanner's offline journal keep their original time
+    $scannedAt = isset($rawScan['timestamp']) && is_numeric($rawScan['timestamp'])
+        ? min((int)$rawScan['timestamp'], time())
+        : time();
+
+    $scans[] = [
+        'nfc_uid' => trim($rawScan['nfc_uid']),
+        'scanner_id' => $rawScan['scanner_id'] ?? $defaultScannerId,
+        'timestamp' => date('Y-m-d H:i:s', $scannedAt)
+    ];
+}
 
 try {
     // Database connection
-    $pdo = new PDO("mysql:host=$host;dbname=$db;charset=utf8mb4", $user, $password, [
-        PDO::ATTR_ERRMODE => PDO::ERRMODE_EXCEPTION,
-        PDO::ATTR_DEFAULT_FETCH_MODE => PDO::FETCH_ASSOC,
-    ]);
+    $pdo = nfcDatabase();
     
-    // Search for spool by NFC UID (Multiple NFC-UIDs System)
+    // Search for all spools by NFC UID in one query (Multiple NFC-UIDs System)
+    $uids = array_values(array_unique(array_column($scans, 'nfc_uid')));
+    $placeholders = implode(', ', array_fill(0, count($uids), '?'));
+
     $stmt = $pdo->prepare("
         SELECT 
             s.id,
@@ -67,6 +121,7 @@ try {
             s.created_at,
             t.name as filament_type,
             c.name as color_name,
+            nfc.id as nfc_uid_id,
             nfc.nfc_uid,
             nfc.tag_type,
             nfc.tag_position,
@@ -75,34 +130,67 @@ try {
         LEFT JOIN filament_types t ON s.type_id = t.id
         LEFT JOIN colors c ON s.color_id = c.id
         INNER JOIN filament_nfc_uids nfc ON s.id = nfc.filament_id
-        WHERE nfc.nfc_uid = ? AND s.is_active = 1
-        LIMIT 1
+        WHERE nfc.nfc_uid IN ($placeholders) AND s.is_active = 1
     ");
     
-    $stmt->execute([$nfcUid]);
-    $spool = $stmt->fetch();
-    
-    // Log scan attempt (Multiple NFC-UIDs System)
-    $timestamp = date('Y-m-d H:i:s');
-    $logStmt = $pdo->prepare("
-        INSERT INTO nfc_scan_log (nfc_uid, scanner_id, found_filament_id, found_nfc_uid_id, created_at)
-        VALUES (?, ?, ?, ?, ?)
-    ");
+    $stmt->execute($uids);
+
+    // nfc_uid comparison is case-insensitive in MySQL, so index the rows the same way
+    $spoolsByUid = [];
+    foreach ($stmt->fetchAll() as $row) {
+        $spoolsByUid[strtoupper($row['nfc_uid'])] = $row;
+    }
     
-    if ($spool) {
-        // Get the NFC-UID ID for logging
-        $nfcUidStmt = $pdo->prepare("SELECT id FROM filament_nfc_uids WHERE nfc_uid = ? AND filament_id = ?");
-        $nfcUidStmt->execute([$nfcUid, $spool['id']]);
-        $nfcUidRecord = $nfcUidStmt->fetch();
-        $nfcUidId = $nfcUidRecord ? $nfcUidRecord['id'] : null;
-        
-        $logStmt->execute([$nfcUid, $scannerId, $spool['id'], $nfcUidId, $timestamp]);
-    } else {
-        $logStmt->execute([$nfcUid, $scannerId, null, null, $timestamp]);
+    // Log all scan attempts with a single multi-row insert (Multiple NFC-UIDs System)
+    $logValues = [];
+    $logParams = [];
+    $results = [];
+
+    foreach ($scans as $scan) {
+        $spool = $spoolsByUid[strtoupper($scan['nfc_uid'])] ?? null;
+
+        if ($logScans) {
+            $logValues[] = '(?, ?, ?, ?, ?)';
+            array_push(
+                $logParams,
+                $scan['nfc_uid'],
+                $scan['scanner_id'],
+                $spool ? $spool['id'] : null,
+                $spool ? $spool['nfc_uid_id'] : null,
+                $scan['timestamp']
+            );
+        }
+
+        $results[] = buildLookupResult($scan, $spool);
     }
+
+    if ($logScans) {
+        $logStmt = $pdo->prepare("
+            INSERT INTO nfc_scan_log (nfc_uid, scanner_id, found_filament_id, found_nfc_uid_id, created_at)
+            VALUES " . implode(', ', $logValues)
+        );
+        $logStmt->execute($logParams);
+    } elseif ($_SERVER['REQUEST_METHOD'] === 'GET') {
+        header('Cache-Control: private, max-age=' . LOOKUP_MAX_AGE);
+    }
+    
+    echo json_encode($isBatch ? ['results' => $results] : $results[0]);
     
+} catch (Exception $e) {
+    http_response_code(500);
+    echo json_encode([
+        'error' => 'Database error',
+        'message' => $e->getMessage()
+    ]);
+}
+
+/**
+ * Build the lookup response for a single scan
+ */
+function buildLookupResult(array $scan, ?array $spool): array
+{
     if ($spool) {
-        echo json_encode([
+        return [
             'found' => true,
             'spool' => [
                 'id' => $spool['id'],
@@ -121,23 +209,16 @@ try {
                 'tag_position' => $spool['tag_position'],
                 'is_primary' => (bool)$spool['is_primary']
             ],
-            'scanner_id' => $scannerId,
-            'timestamp' => $timestamp
-        ]);
-    } else {
-        echo json_encode([
-            'found' => false,
-            'message' => 'no_spool_found',
-            'nfc_uid' => $nfcUid,
-            'scanner_id' => $scannerId,
-            'timestamp' => $timestamp
-        ]);
+            'scanner_id' => $scan['scanner_id'],
+            'timestamp' => $scan['timestamp']
+        ];
     }
-    
-} catch (Exception $e) {
-    http_response_code(500);
-    echo json_encode([
-        'error' => 'Database error',
-        'message' => $e->getMessage()
-    ]);
-}
\ No newline at end of file
+
+    return [
+        'found' => false,
+        'message' => 'no_spool_found',
+        'nfc_uid' => $scan['nfc_uid'],
+        'scanner_id' => $scan['scanner_id'],
+        'timestamp' => $scan['timestamp']
+    ];
+}
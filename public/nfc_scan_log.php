@@ -0,0 +1,120 @@
+<?php
+/**
+ * NFC Scan-Protokoll für Scanner
+ * Nimmt Scans gesammelt entgegen (ein Request pro Batch, unabhängig vom
+ * Lookup) und schreibt sie mit einem INSERT nach nfc_scan_log. Ohne
+ * Authentifizierung wie nfc_lookup.php (nur für Scanner im lokalen Netz).
+ *
+ * POST {"scanner_id": ..., "scans": [{"nfc_uid": ..., "scanner_id": ..., "timestamp": <unix>}, ...]}
+ */
+
+// Datenbankverbindung (Zugangsdaten aus .env)
+require_once __DIR__ . '/../config/nfc_database.php';
+
+header('Content-Type: application/json');
+header('Access-Control-Allow-Origin: *');
+header('Access-Control-Allow-Methods: POST, OPTIONS');
+header('Access-Control-Allow-Headers: Content-Type, X-Requested-With');
+header('X-Robots-Tag: noindex');
+
+// Handle OPTIONS requests
+if ($_SERVER['REQUEST_METHOD'] === 'OPTIONS') {
+    http_response_code(200);
+    exit;
+}
+
+// Only allow POST
+if ($_SERVER['REQUEST_METHOD'] !== 'POST') {
+    http_response_code(405);
+    echo json_encode(['error' => 'Method not allowed']);
+    exit;
+}
+
+// Maximum number of scans accepted in one upload
+const MAX_UPLOAD_SIZE = 500;
+
+$input = json_decode(file_get_contents('php://input'), true);
+
+if (!is_array($input) || !isset($input['scans']) || !is_array($input['scans']) || empty($input['scans'])) {
+    http_response_code(400);
+    echo json_encode(['error' => 'scans must be a non-empty array']);
+    exit;
+}
+if (count($input['scans']) > MAX_UPLOAD_SIZE) {
+    http_response_code(400);
+    echo json_encode(['error' => 'Too many scans in upload (max ' . MAX_UPLOAD_SIZE . ')']);
+    exit;
+}
+
+$defaultScannerId = $input['scanner_id'] ?? 'unknown';
+$scans = [];
+
+foreach (array_values($input['scans']) as $index => $rawScan) {
+    if (!is_array($rawScan) || empty($rawScan['nfc_uid']) || !is_string($rawScan['nfc_uid'])) {
+        http_response_code(400);
+        echo json_encode(['error' => "nfc_uid is required (scan {$index})"]);
+        exit;
+    }
+
+    $scannedAt = isset($rawScan['timestamp']) && is_numeric($rawScan['timestamp'])
+        ? min((int)$rawScan['timestamp'], time())
+        : time();
+
+    $scans[] = [
+        'nfc_uid' => trim($rawScan['nfc_uid']),
+        'scanner_id' => $rawScan['scanner_id'] ?? $defaultScannerId,
+        'timestamp' => date('Y-m-d H:i:s', $scannedAt)
+    ];
+}
+
+try {
+    $pdo = nfcDatabase();
+
+    // Zuordnungen für alle UIDs des Batches in einer Abfrage (wie nfc_lookup.php: nur aktive Spulen)
+    $uids = array_values(array_unique(array_column($scans, 'nfc_uid')));
+    $placeholders = implode(', ', array_fill(0, count($uids), '?'));
+
+    $stmt = $pdo->prepare("
+        SELECT nfc.id AS nfc_uid_id, nfc.nfc_uid, nfc.filament_id
+        FROM filament_nfc_uids nfc
+        INNER JOIN filaments s ON s.id = nfc.filament_id
+        WHERE nfc.nfc_uid IN ($placeholders) AND s.is_active = 1
+    ");
+    $stmt->execute($uids);
+
+    $bindingsByUid = [];
+    foreach ($stmt->fetchAll() as $row) {
+        $bindingsByUid[strtoupper($row['nfc_uid'])] = $row;
+    }
+
+    $logValues = [];
+    $logParams = [];
+    foreach ($scans as $scan) {
+        $binding = $bindingsByUid[strtoupper($scan['nfc_uid'])] ?? null;
+
+        $logValues[] = '(?, ?, ?, ?, ?)';
+        array_push(
+            $logParams,
+            $scan['nfc_uid'],
+            $scan['scanner_id'],
+            $binding ? $binding['filament_id'] : null,
+            $binding ? $binding['nfc_uid_id'] : null,
+            $scan['timestamp']
+        );
+    }
+
+    $logStmt = $pdo->prepare("
+        INSERT INTO nfc_scan_log (nfc_uid, scanner_id, found_filament_id, found_nfc_uid_id, created_at)
+        VALUES " . implode(', ', $logValues)
+    );
+    $logStmt->execute($logParams);
+
+    echo json_encode(['accepted' => count($scans)]);
+
+} catch (Exception $e) {
+    http_response_code(500);
+    echo json_encode([
+        'error' => 'Database error',
+        'message' => $e->getMessage()
+    ]);
+}
@@ -6,11 +6,11 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('nfc_scanner_gui.py', '.')],
-    hiddenimports=['smartcard', 'smartcard.System', 'smartcard.util', 'smartcard.CardMonitoring', 'smartcard.CardType', 'smartcard.CardRequest', 'smartcard.Exceptions', 'requests', 'json', 'time', 'winsound', 'tkinter', 'tkinter.ttk', 'tkinter.messagebox', 'tkinter.scrolledtext', 'threading', 'webbrowser'],
+    hiddenimports=['smartcard', 'smartcard.System', 'smartcard.util', 'smartcard.CardMonitoring', 'smartcard.CardType', 'smartcard.CardRequest', 'smartcard.Exceptions', 'requests', 'json', 'time', 'winsound', 'tkinter', 'tkinter.ttk', 'tkinter.messagebox', 'tkinter.scrolledtext', 'threading', 'webbrowser', 'filament_scanner.core', 'filament_scanner.scan_engine', 'filament_scanner.scan_service', 'filament_scanner.reader_emulator'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['tkinter.test', 'unittest', 'doctest', 'pdb', 'pydoc', 'lib2to3', 'distutils', 'setuptools', 'pip', 'xmlrpc', 'PIL', 'numpy'],
     noarchive=False,
     optimize=0,
 )
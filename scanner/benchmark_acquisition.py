@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Latenz-Benchmark: CardMonitor Events vs. Polling-Schleife
+Läuft ohne ACR122U gegen den emulierten Reader (filament_scanner/reader_emulator.py)
+"""
+
+import argparse
+import contextlib
+import io
+import statistics
+import threading
+import time
+from typing import Dict, Any, List
+
+from filament_scanner.core import ACR122UNFCScanner, POLL_INTERVAL
+from filament_scanner.reader_emulator import EmulatorBackend, DEFAULT_READER, build_tap_script
+
+# Simulierte Dauer für connect + GET_UID am echten Reader
+CONNECT_COST = 0.015
+
+
+def run_mode(mode: str, script: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Tap-Folge abspielen und Erkennungslatenz pro Tap messen"""
+    backend = EmulatorBackend([DEFAULT_READER], CONNECT_COST * 1000, 0)
+    config = {'TAG_RECORDS': '0', 'ENABLE_SOUND': '0', 'METRICS_LOG_INTERVAL': '0'}
+    placed_at = {}
+    detected_at = {}
+    done = threading.Event()
+
+    def play():
+        for tap in script:
+            time.sleep(tap['gap'])
+            placed_at[tap['uid']] = time.perf_counter()
+            backend.place(tap['uid'])
+            time.sleep(tap['dwell'])
+            backend.remove()
+        time.sleep(0.5)
+        done.set()
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        scanner = ACR122UNFCScanner("http://localhost:8000", "benchmark", mode, config, backend=backend)
+        scanner.reader = DEFAULT_READER
+        use_events = scanner.start_acquisition()
+        player = threading.Thread(target=play, daemon=True)
+        player.start()
+
+        while not done.is_set():
+            event = scanner.acquire(use_events)
+            if event and event['type'] == 'inserted' and event['uid']:
+                detected_at.setdefault(event['uid'], time.perf_counter())
+            if not use_events:
+                time.sleep(POLL_INTERVAL)
+
+        scanner.stop_acquisition()
+        scanner.close()
+
+    latencies = [
+        (detected_at[uid] - placed_at[uid]) * 1000
+        for uid in placed_at if uid in detected_at
+    ]
+
+    return {
+        'mode': mode,
+        'taps': len(script),
+        'detected': len(latencies),
+        'p50': statistics.median(latencies) if latencies else 0.0,
+        'p95': statistics.quantiles(latencies, n=20)[-1] if len(latencies) >= 2 else 0.0,
+        'max': max(latencies) if latencies else 0.0,
+        'cpu': time.process_time() - cpu_start,
+        'wall': time.perf_counter() - wall_start
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latenz-Benchmark der Tag-Erkennung")
+    parser.add_argument('--taps', type=int, default=20, help="Anzahl simulierter Taps")
+    parser.add_argument('--seed', type=int, default=42, help="Seed für die Tap-Folge")
+    args = parser.parse_args()
+
+    script = build_tap_script(args.taps, args.seed, gap=(0.2, 1.2), dwell=(0.4, 1.0), unknown_ratio=0,
+                              burst_every=0, flap_ratio=0, error_ratio=0)
+
+    print("⏱️  Tag-Erkennung: CardMonitor vs. Polling (simulierter Reader)")
+    print(f"   {args.taps} Taps, connect+GET_UID {CONNECT_COST * 1000:.0f} ms, Poll-Pause {POLL_INTERVAL * 1000:.0f} ms")
+    print("")
+    print(f"   {'Modus':<8} {'erkannt':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'CPU s':>7}")
+
+    for mode in ('monitor', 'poll'):
+        stats = run_mode(mode, script)
+        print(f"   {stats['mode']:<8} {stats['detected']:>4}/{stats['taps']:<3} "
+              f"{stats['p50']:>8.1f} {stats['p95']:>8.1f} {stats['max']:>8.1f} {stats['cpu']:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
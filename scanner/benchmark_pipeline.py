@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+End-to-End Benchmark der Scan-Pipeline ohne Hardware
+Emulierter ACR122U spielt eine Tap-Folge ab, der Lookup-Ersatz beantwortet
+die Requests - gemessen werden Scans/Sekunde, Latenz vom Auflegen bis zum
+Ergebnis (p50/p95/p99) und CPU-Last für CLI-Scanner und GUI-Engine.
+"""
+
+import argparse
+import bisect
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import threading
+import time
+from typing import Dict, Any, List
+
+from filament_scanner.cli import ScannerCLI
+from filament_scanner.core import ACR122UNFCScanner
+from filament_scanner.fake_lookup_server import FakeLookupServer
+from filament_scanner.reader_emulator import EmulatorBackend, TapPlayer, build_tap_script
+from filament_scanner.scan_engine import AsyncScanEngine
+
+# Nach dem letzten Tap noch so lange auf ausstehende Ergebnisse warten
+DRAIN_TIMEOUT = 5.0
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def scanner_config(args, server: FakeLookupServer, journal_file: str) -> Dict[str, str]:
+    return {
+        'API_URL': server.url,
+        'SCANNER_ID': 'benchmark',
+        'ENABLE_SOUND': '0',
+        'ACQUISITION_MODE': args.acquisition,
+        'JOURNAL_FILE': journal_file,
+        'BATCH_WINDOW_MS': str(args.batch_window),
+        'MULTI_READER': '1' if args.readers > 1 else '0',
+        'TAG_RECORDS': '1' if args.tag_records else '0',
+        'TAG_WRITEBACK': '1' if args.tag_records else '0',
+        # Jede Platzierung im Skript ist ein gewollter Tap
+        'TAP_COOLDOWN_MS': '0',
+        'METRICS_LOG_INTERVAL': '0',
+        'MAX_IN_FLIGHT_LOOKUPS': str(args.in_flight)
+    }
+
+
+def run_cli(scanner: ACR122UNFCScanner, results: List[Dict[str, Any]]) -> TapPlayer:
+    """CLI Hauptschleife (ScannerCLI.run) - Ergebnisse über die Scanner-Ereignisse"""
+    def on_event(kind, data):
+        if kind == 'result':
+            results.append({'uid': data['uid'], 'at': time.perf_counter(), 'source': data['source']})
+    
+    scanner.add_event_listener(on_event)
+    thread = threading.Thread(target=ScannerCLI(scanner).run, daemon=True)
+    thread.start()
+    
+    player = wait_for_results(scanner.backend, results)
+    scanner.running = False
+    thread.join(timeout=5)
+    return player
+
+
+def run_engine(scanner: ACR122UNFCScanner, results: List[Dict[str, Any]], in_flight: int) -> TapPlayer:
+    """GUI-Engine (AsyncScanEngine) ohne Tk - Ergebnisse aus der Engine-Queue"""
+    engine = AsyncScanEngine(scanner, in_flight)
+    stop = threading.Event()
+    
+    def consume():
+        while not stop.is_set():
+            try:
+                kind, data = engine.results.get(timeout=0.1)
+            except Exception:
+                continue
+            # Mit Spulen-Record zeigt die GUI schon das 'tag' Ereignis an
+            if kind == 'tag':
+                results.append({'uid': data['uid'], 'at': time.perf_counter(), 'source': 'tag'})
+            elif kind == 'result' and not data['tag_shown']:
+                result = data['result']
+                source = 'mirror' if result.get('from_mirror') else 'cache' if result.get('cached') else 'api'
+                results.append({'uid': data['uid'], 'at': time.perf_counter(), 'source': source})
+    
+    consumer = threading.Thread(target=consume, daemon=True)
+    consumer.start()
+    engine.start()
+    
+    player = wait_for_results(scanner.backend, results)
+    engine.stop(wait=True)
+    stop.set()
+    consumer.join()
+    scanner.close()
+    return player
+
+
+def wait_for_results(backend: EmulatorBackend, results: List[Dict[str, Any]]) -> TapPlayer:
+    """Bis zum Ende des Skripts und danach auf ausstehende Ergebnisse warten"""
+    while backend.player is None:
+        time.sleep(0.01)  # Skript startet mit der Erfassung (backend.start)
+    player = backend.player
+    player.finished.wait()
+    
+    deadline = time.perf_counter() + DRAIN_TIMEOUT
+    while time.perf_counter() < deadline and len(results) < len(player.taps):
+        time.sleep(0.05)
+    return player
+
+
+def latencies(player: TapPlayer, results: List[Dict[str, Any]]) -> List[float]:
+    """Ergebnis dem letzten Auflegen derselben UID davor zuordnen"""
+    placed = {}
+    for tap in player.taps:
+        placed.setdefault(tap['uid'], []).append(tap['placed_at'])
+    
+    samples = []
+    for result in results:
+        times = placed.get(result['uid'], [])
+        index = bisect.bisect_right(times, result['at']) - 1
+        if index >= 0:
+            samples.append((result['at'] - times[index]) * 1000)
+    return samples
+
+
+def run_target(target: str, args, script: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Eine Variante (cli oder engine) mit frischem Reader, Server und Journal messen"""
+    server = FakeLookupServer(latency_ms=args.latency, jitter_ms=args.jitter,
+                              error_rate=args.error_rate, seed=args.seed).start()
+    reader_names = [f"ACS ACR122U PICC Interface {i}" for i in range(args.readers)]
+    backend = EmulatorBackend(reader_names, args.connect_ms, args.apdu_ms, script)
+    results = []
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        config = scanner_config(args, server, os.path.join(tmp, 'journal.db'))
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            scanner = ACR122UNFCScanner(server.url, 'benchmark', args.acquisition, config, backend=backend)
+            if target == 'engine':
+                scanner.start_journal()
+                scanner.start_coalescer()
+                scanner.connect_reader()
+            
+            cpu_started = time.process_time()
+            wall_started = time.perf_counter()
+            if target == 'cli':
+                player = run_cli(scanner, results)
+            else:
+                player = run_engine(scanner, results, args.in_flight)
+            wall = time.perf_counter() - wall_started
+            cpu = time.process_time() - cpu_started
+        
+        server.stop()
+    
+    server_stats = server.stats()
+    samples = sorted(latencies(player, results))
+    span = (results[-1]['at'] - player.taps[0]['placed_at']) if results and player.taps else 0.0
+    metrics = scanner.metrics
+    
+    return {
+        'target': target,
+        'taps': len(player.taps),
+        'results': len(results),
+        'from_tag': sum(1 for result in results if result['source'] == 'tag'),
+        'scans_per_sec': len(results) / span if span > 0 else 0.0,
+        'p50': percentile(samples, 0.50),
+        'p95': percentile(samples, 0.95),
+        'p99': percentile(samples, 0.99),
+        'max': samples[-1] if samples else 0.0,
+        'mean': statistics.fmean(samples) if samples else 0.0,
+        # CPU des Lookup-Ersatzes läuft im selben Prozess und wird abgezogen
+        'cpu_percent': max(0.0, cpu - server_stats['cpu_time']) / wall * 100 if wall else 0.0,
+        'requests': server_stats['requests'],
+        'http_p50': metrics.stage('http')['p50'],
+        'connect_p50': metrics.stage('card_connect')['p50']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-End Benchmark mit emuliertem Reader und Lookup-Ersatz")
+    parser.add_argument('--taps', type=int, default=100, help="Anzahl Taps im Skript")
+    parser.add_argument('--seed', type=int, default=42, help="Seed für Tap-Folge und Server")
+    parser.add_argument('--target', choices=('cli', 'engine', 'both'), default='both')
+    parser.add_argument('--acquisition', choices=('monitor', 'poll'), default='monitor')
+    parser.add_argument('--readers', type=int, default=1, help="Anzahl emulierter Reader")
+    parser.add_argument('--spools', type=int, default=0, help="Taps auf so viele Spulen verteilen (0 = jede neu)")
+    parser.add_argument('--gap', type=float, default=0.15, help="Mittlere Pause zwischen Taps (s)")
+    parser.add_argument('--dwell', type=float, default=0.3, help="Mittlere Verweildauer (s)")
+    parser.add_argument('--latency', type=float, default=20, help="Antwortzeit des Lookup-Ersatzes (ms)")
+    parser.add_argument('--jitter', type=float, default=5, help="Schwankung der Antwortzeit (ms)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Anteil HTTP 500 Antworten")
+    parser.add_argument('--connect-ms', type=float, default=15, help="Emulierte Connect-Dauer (ms)")
+    parser.add_argument('--apdu-ms', type=float, default=4, help="Emulierte Dauer pro APDU (ms)")
+    parser.add_argument('--batch-window', type=float, default=0, help="BATCH_WINDOW_MS für den Scanner")
+    parser.add_argument('--in-flight', type=int, default=4, help="MAX_IN_FLIGHT_LOOKUPS der Engine")
+    parser.add_argument('--tag-records', action='store_true', help="Spulen-Records lesen und schreiben")
+    args = parser.parse_args()
+    
+    script = build_tap_script(
+        args.taps, args.seed,
+        readers=[f"ACS ACR122U PICC Interface {i}" for i in range(args.readers)],
+        gap=(args.gap * 0.5, args.gap * 1.5),
+        dwell=(args.dwell * 0.5, args.dwell * 1.5),
+        spools=args.spools
+    )
+    
+    print("⏱️  Scan-Pipeline End-to-End (emulierter Reader + Lookup-Ersatz)")
+    print(f"   {args.taps} Taps, {args.readers} Reader, Erfassung {args.acquisition}, "
+          f"Lookup {args.latency:.0f}±{args.jitter:.0f} ms, Fehlerrate {args.error_rate:.0%}")
+    print("")
+    print(f"   {'Variante':<8} {'Ergebnisse':>11} {'Scans/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8} {'CPU %':>6} {'Requests':>9}")
+    
+    targets = ('cli', 'engine') if args.target == 'both' else (args.target,)
+    for target in targets:
+        stats = run_target(target, args, script)
+        print(f"   {stats['target']:<8} {stats['results']:>5}/{stats['taps']:<5} {stats['scans_per_sec']:>8.1f} "
+              f"{stats['p50']:>8.1f} {stats['p95']:>8.1f} {stats['p99']:>8.1f} {stats['max']:>8.1f} "
+              f"{stats['cpu_percent']:>6.1f} {stats['requests']:>9}")
+        if args.tag_records:
+            print(f"   {'':<8} davon {stats['from_tag']} direkt vom Tag")
+    
+    print("")
+    print("   Latenz = Auflegen des Tags bis Ergebnis; CPU ohne den Lookup-Ersatz")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,26 @@
 Build-Script für NFC Scanner EXE mit PyInstaller
 """
 
+import argparse
 import os
 import sys
 import subprocess
 import shutil
 from pathlib import Path
 
+# Module, die der Scanner nie braucht - PyInstaller zieht sie sonst über
+# Abhängigkeiten mit ins Bundle und jeder Start muss sie entpacken
+EXCLUDED_MODULES = [
+    'tkinter.test', 'unittest', 'doctest', 'pdb', 'pydoc', 'lib2to3',
+    'distutils', 'setuptools', 'pip', 'xmlrpc', 'PIL', 'numpy'
+]
+
+# Startzeit-Budget für den Import (ms) - Fenster bzw. Konsole sollen sofort da sein
+STARTUP_BUDGET_MS = {
+    'nfc_scanner_gui': 60,
+    'filament_scanner.cli': 200
+}
+
 def check_python():
     """Python Installation überprüfen"""
     try:
@@ -54,9 +68,9 @@ def create_icon():
     
     return False
 
-def build_exe():
+def build_exe(onedir: bool = False):
     """EXE mit PyInstaller erstellen"""
-    print("\n🔨 Erstelle GUI EXE mit PyInstaller...")
+    print(f"\n🔨 Erstelle GUI EXE mit PyInstaller ({'Ordner' if onedir else 'Einzeldatei'})...")
     
     script_path = "nfc_scanner_gui.py"
     
@@ -66,7 +80,9 @@ def build_exe():
     # PyInstaller Optionen für GUI
     cmd = [
         sys.executable, "-m", "PyInstaller",
-        "--onefile",  # Einzelne EXE-Datei
+        # Ordner-Build startet ohne Entpacken ins Temp-Verzeichnis (schneller),
+        # Einzeldatei ist bequemer zu verteilen
+        "--onedir" if onedir else "--onefile",
         "--windowed",  # GUI-Anwendung (kein Console-Fenster)
         "--name", "FilamentNFCScanner",  # EXE-Name
         "--icon", icon_param,  # Icon verwenden
@@ -88,8 +104,11 @@ def build_exe():
         "--hidden-import", "tkinter.scrolledtext",
         "--hidden-import", "threading",
         "--hidden-import", "webbrowser",
-        script_path
+        "--collect-submodules", "filament_scanner",  # Gemeinsamer Kern (teils erst bei Bedarf importiert)
     ]
+    for module in EXCLUDED_MODULES:
+        cmd += ["--exclude-module", module]
+    cmd.append(script_path)
     
     try:
         result = subprocess.run(cmd, check=True, capture_output=True, text=True)
@@ -101,7 +120,57 @@ def build_exe():
         print(f"Stderr: {e.stderr}")
         return False
 
-def create_portable_package():
+def import_times(module: str) -> dict:
+    """Import-Zeiten eines Moduls mit python -X importtime messen (ms, direkte Abhängigkeiten)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return {'total': None, 'children': [], 'error': result.stderr.strip().splitlines()[-1:]}
+    
+    # Zeilen: "import time: <selbst µs> | <kumuliert µs> | <Einrückung><Modul>";
+    # Abhängigkeiten stehen vor dem Modul, das sie importiert
+    children = []
+    for line in result.stderr.splitlines():
+        parts = line[len("import time:"):].split("|")
+        if not line.startswith("import time:") or len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        ms = int(parts[1]) / 1000
+        
+        if depth == 1:
+            children.append((name.strip(), ms))
+        elif depth == 0:
+            if name.strip() == module:
+                return {'total': ms, 'children': sorted(children, key=lambda item: item[1], reverse=True)}
+            children = []  # z.B. site beim Interpreter-Start
+    
+    return {'total': None, 'children': [], 'error': ['Modul nicht in der Ausgabe']}
+
+
+def startup_report(top: int = 8) -> str:
+    """Startzeit-Bericht: Importdauer der Einstiegsmodule und die teuersten Abhängigkeiten"""
+    lines = ["Startzeit-Bericht (python -X importtime)", ""]
+    
+    for module, budget in STARTUP_BUDGET_MS.items():
+        times = import_times(module)
+        if times['total'] is None:
+            lines.append(f"{module}: Import fehlgeschlagen {' '.join(times['error'])}")
+            lines.append("")
+            continue
+        
+        status = "✅" if times['total'] <= budget else "⚠️  über Budget"
+        lines.append(f"{module}: {times['total']:.1f} ms (Budget {budget} ms) {status}")
+        for name, ms in times['children'][:top]:
+            lines.append(f"   {ms:8.1f} ms  {name}")
+        lines.append("")
+    
+    return "\n".join(lines)
+
+
+def create_portable_package(onedir: bool = False):
     """Portable Paket mit Konfiguration erstellen"""
     print("\n📁 Erstelle portable Paket...")
     
@@ -109,20 +178,29 @@ def create_portable_package():
     package_dir = Path("filament_scanner_portable")
     package_dir.mkdir(exist_ok=True)
     
-    # EXE kopieren
-    exe_source = Path("dist/FilamentNFCScanner.exe")
-    if exe_source.exists():
-        shutil.copy2(exe_source, package_dir / "FilamentNFCScanner.exe")
-        print("✅ GUI EXE kopiert")
+    # EXE (bzw. Programmordner) kopieren
+    if onedir:
+        app_source = Path("dist/FilamentNFCScanner")
+        if app_source.exists():
+            shutil.copytree(app_source, package_dir, dirs_exist_ok=True)
+            print("✅ GUI Programmordner kopiert")
+        else:
+            print("❌ GUI Programmordner nicht gefunden")
+            return False
     else:
-        print("❌ GUI EXE nicht gefunden")
-        return False
+        exe_source = Path("dist/FilamentNFCScanner.exe")
+        if exe_source.exists():
+            shutil.copy2(exe_source, package_dir / "FilamentNFCScanner.exe")
+            print("✅ GUI EXE kopiert")
+        else:
+            print("❌ GUI EXE nicht gefunden")
+            return False
     
     # Konfigurationsdatei erstellen
     config_content = """# Filament NFC Scanner Konfiguration
 # Diese Datei wird automatisch geladen
 
-# API-Einstellungen
+# API-Einstellungen (mehrere Endpunkte kommagetrennt, z.B. http://192.168.1.10:8000,https://filament.neuhauser.cloud)
 API_URL=https://filament.neuhauser.cloud
 SCANNER_ID=acr122u_001
 
@@ -135,6 +213,122 @@ ENABLE_SOUND=1
 
 # Debug-Modus (1=an, 0=aus)  
 DEBUG_MODE=0
+
+# Logdatei (JSON-Zeilen, rotierend; leer = aus), Größe pro Datei in Bytes, Anzahl alter Dateien
+LOG_FILE=scanner.log
+LOG_MAX_BYTES=1048576
+LOG_BACKUP_COUNT=3
+# Gleiche Warnung/Fehler höchstens N-mal pro Fenster (Sekunden) ausgeben, Rest zusammenfassen
+LOG_RATE_LIMIT=5
+LOG_RATE_WINDOW=10
+
+# Tag-Erkennung: monitor = CardMonitor Events (empfohlen), poll = alte Polling-Schleife
+ACQUISITION_MODE=monitor
+
+# HTTP-Verbindung (Keep-Alive Pool, Wiederholungen, Timeouts in Sekunden)
+HTTP_POOL_SIZE=4
+HTTP_RETRIES=2
+HTTP_BACKOFF=0.3
+HTTP_CONNECT_TIMEOUT=3
+HTTP_READ_TIMEOUT=10
+
+# Circuit Breaker: nach N Fehlern oder N Antworten über BREAKER_SLO_MS in Folge sofort scheitern,
+# nach BREAKER_RESET Sekunden eine Probe senden (Wartezeit verdoppelt sich bis BREAKER_MAX_RESET)
+BREAKER_FAILURES=3
+BREAKER_SLOW_CALLS=3
+BREAKER_SLO_MS=2000
+BREAKER_RESET=10
+BREAKER_MAX_RESET=60
+
+# Mehrere Endpunkte in API_URL (kommagetrennt, z.B. LAN-Server,Cloud): unbenutzte alle N Sekunden nachmessen.
+# HEDGE_REQUESTS=1: braucht der schnellste länger als sein p95 (mind. HEDGE_MIN_DELAY_MS),
+# wird parallel der zweitschnellste gefragt - nur für reine Lesezugriffe (SCAN_LOG_UPLOAD=1)
+ENDPOINT_PROBE_INTERVAL=30
+HEDGE_REQUESTS=0
+HEDGE_MIN_DELAY_MS=25
+
+# Lokaler Lookup-Cache (Einträge, Gültigkeit in Sekunden, 0 = aus)
+CACHE_SIZE=512
+CACHE_TTL=300
+CACHE_NEGATIVE_TTL=30
+
+# Offline-Journal: Scans bei API-Ausfall speichern und nachreichen (leer = aus)
+JOURNAL_FILE=scan_journal.db
+JOURNAL_MAX_ENTRIES=10000
+JOURNAL_BATCH_SIZE=25
+JOURNAL_FLUSH_INTERVAL=5
+
+# Batch-Modus für Inventur: Lookups innerhalb des Fensters bündeln (0 = aus)
+BATCH_WINDOW_MS=0
+BATCH_MAX_SIZE=50
+
+# Scan-Protokoll getrennt vom Lookup: Lookups nur lesend, Scans aus dem Journal
+# gesammelt an nfc_scan_log.php (1=an, 0=Lookup protokolliert wie bisher; braucht JOURNAL_FILE)
+SCAN_LOG_UPLOAD=1
+# Scans pro Upload (höchstens 500, wie MAX_UPLOAD_SIZE des Servers)
+SCAN_LOG_BATCH_SIZE=100
+
+# Katalog-Spiegel: alle aktiven UID-Zuordnungen lokal halten (1=an, 0=aus),
+# Delta-Abgleich und kompletter Neuabgleich in Sekunden, älter als CATALOG_MAX_AGE → Lookup Service
+CATALOG_MIRROR=0
+CATALOG_SYNC_INTERVAL=30
+CATALOG_FULL_SYNC_INTERVAL=3600
+CATALOG_MAX_AGE=600
+
+# Änderungs-Stream (nfc_events.php): Cache und Katalog bei Änderungen in der Web-App
+# sofort anpassen (1=an, 0=aus) - erlaubt lange CACHE_TTL; Lese-Timeout in Sekunden
+CHANGE_STREAM=0
+CHANGE_STREAM_TIMEOUT=45
+
+# GUI: maximal gleichzeitig laufende Lookups
+MAX_IN_FLIGHT_LOOKUPS=4
+
+# GUI: Scan-Historie (SQLite), Einträge im Speicher, maximale Einträge auf Platte, Zeilen in der Tabelle
+HISTORY_FILE=scan_history.db
+HISTORY_MEMORY=500
+HISTORY_MAX_ENTRIES=100000
+HISTORY_WINDOW=200
+
+# Alle angeschlossenen Reader parallel betreiben (Scanner-ID wird um den Reader-Namen ergänzt)
+MULTI_READER=0
+
+# Reader-Überwachung: Prüfintervall und maximale Wartezeit zwischen Wiederverbindungen (Sekunden)
+READER_CHECK_INTERVAL=2
+READER_MAX_BACKOFF=30
+
+# APDU-Folge beim Auflegen eines Tags (UID, VERSION, READ:<Seite>), eine Verbindung pro Tap
+TAG_READ_SEQUENCE=UID,VERSION
+
+# Spulen-Daten als NDEF Record auf dem Tag lesen und sofort anzeigen (1=an, 0=aus)
+TAG_RECORDS=1
+# Tag nach dem Server-Abgleich bei Abweichungen neu beschreiben (1=an, 0=aus) - nur leere
+# NDEF-Tags oder Tags mit Spulen-Record, fremde Inhalte und gesperrte Tags bleiben unverändert
+TAG_WRITEBACK=0
+
+# Entprellung: Tag gilt erst nach dieser Zeit ohne Kontakt als entfernt (ms)
+PRESENCE_DEBOUNCE_MS=800
+# Dieselbe UID innerhalb dieser Zeit erneut aufgelegt löst keinen neuen Lookup aus (ms)
+TAP_COOLDOWN_MS=2000
+
+# Dienst-Modus (--daemon): lokaler HTTP Server mit /status und /events (SSE), Queue pro Abonnent
+DAEMON_HOST=127.0.0.1
+DAEMON_PORT=8766
+DAEMON_QUEUE_SIZE=100
+
+# Metriken: /metrics (Prometheus) auch ohne Dienst-Modus auf diesem Port (0=aus)
+METRICS_PORT=0
+# Zusammenfassung der Latenzen (p50/p95/p99) alle N Sekunden ausgeben (0=aus)
+METRICS_LOG_INTERVAL=60
+
+# Reader-Backend: pcsc = echte Reader über pyscard, emulator = emulierter ACR122U ohne Hardware
+READER_BACKEND=pcsc
+# Emulator: Reader-Namen (Komma-getrennt), Tap-Skript (JSON, leer = zufällige Folge mit EMULATOR_TAPS Taps)
+EMULATOR_READERS=ACS ACR122U PICC Interface 0
+EMULATOR_SCRIPT=
+EMULATOR_TAPS=20
+# Emulator: simulierte Dauer für Connect und pro APDU (ms)
+EMULATOR_CONNECT_MS=15
+EMULATOR_APDU_MS=4
 """
     
     with open(package_dir / "config.ini", "w", encoding="utf-8") as f:
@@ -212,6 +406,17 @@ def cleanup():
         print(f"   Gelöscht: {spec_file}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Filament NFC Scanner - EXE Builder")
+    parser.add_argument('--onedir', action='store_true',
+                        help="Programmordner statt Einzeldatei (kein Entpacken bei jedem Start)")
+    parser.add_argument('--startup-report', action='store_true',
+                        help="Nur den Startzeit-Bericht ausgeben, nichts bauen")
+    args = parser.parse_args()
+    
+    if args.startup_report:
+        print(startup_report())
+        return True
+    
     print("🏗️  Filament NFC Scanner - EXE Builder")
     print("=" * 50)
     
@@ -227,13 +432,19 @@ def main():
     create_icon()  # Nicht kritisch wenn fehlschlägt
         
     # Schritt 3: EXE erstellen
-    if not build_exe():
+    if not build_exe(args.onedir):
         return False
         
     # Schritt 4: Portable Paket erstellen
-    if not create_portable_package():
+    if not create_portable_package(args.onedir):
         return False
     
+    # Schritt 5: Startzeit messen und dem Paket beilegen
+    report = startup_report()
+    print("\n⏱️  " + report)
+    with open(Path("filament_scanner_portable") / "startup_report.txt", "w", encoding="utf-8") as f:
+        f.write(report + "\n")
+    
     print("\n🎉 GUI BUILD ERFOLGREICH!")
     print("=" * 50)
     print("Die portable GUI Scanner-Anwendung ist bereit:")
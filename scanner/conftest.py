@@ -0,0 +1 @@
+# Liegt im Scanner-Verzeichnis, damit pytest filament_scanner ohne Installation importiert
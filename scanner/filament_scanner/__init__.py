@@ -0,0 +1,17 @@
+"""
+Filament NFC Scanner - gemeinsamer Kern für CLI und GUI
+Import ohne Ausgaben und ohne tkinter - pyscard ist optional (reader_backend).
+Der Kern (requests, pyscard) wird erst beim ersten Zugriff geladen, damit
+leichte Module wie config oder audio_feedback den Start nicht bremsen.
+"""
+
+from .config import load_config
+
+__all__ = ['ACR122UNFCScanner', 'load_config']
+
+
+def __getattr__(name):
+    if name == 'ACR122UNFCScanner':
+        from .core import ACR122UNFCScanner
+        return ACR122UNFCScanner
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
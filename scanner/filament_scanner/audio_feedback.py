@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Akustische Rückmeldung für Scans
+Töne werden einmal als WAV vorberechnet und von einem eigenen Worker
+asynchron abgespielt - ein neuer Scan ersetzt einen noch wartenden oder
+laufenden Ton, Erfassung und GUI werden nie blockiert.
+"""
+
+import logging
+import math
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import wave
+from typing import Dict, List, Tuple
+
+try:
+    import winsound
+    WINSOUND_AVAILABLE = True
+except ImportError:
+    WINSOUND_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 22050
+FADE_MS = 5  # Ein-/Ausblenden gegen Knacken zwischen den Tönen
+
+# Tonfolgen (Frequenz Hz, Dauer ms) wie bisher mit winsound.Beep
+TONES: Dict[str, List[Tuple[int, int]]] = {
+    'success': [(1000, 200), (1200, 200)],
+    'unknown': [(800, 300), (600, 300), (400, 300)],
+}
+
+# Textausgabe ohne Soundausgabe (Linux/macOS)
+FALLBACK_TEXT = {
+    'success': "🔔 BEEP BEEP - Spool erkannt!",
+    'unknown': "🔔 BEEP BEEP BEEP - Unbekannter NFC Tag!",
+}
+
+
+def render_wav(notes: List[Tuple[int, int]], path: str, volume: float = 0.5):
+    """Tonfolge als 16-bit Mono WAV schreiben"""
+    fade = int(SAMPLE_RATE * FADE_MS / 1000)
+    frames = bytearray()
+    
+    for frequency, duration_ms in notes:
+        count = int(SAMPLE_RATE * duration_ms / 1000)
+        for i in range(count):
+            envelope = min(1.0, i / fade, (count - i) / fade) if fade else 1.0
+            sample = volume * envelope * math.sin(2 * math.pi * frequency * i / SAMPLE_RATE)
+            frames += struct.pack('<h', int(sample * 32767))
+    
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(bytes(frames))
+
+
+class AudioFeedback:
+    def __init__(self, enabled: bool = True, print_fallback: bool = True):
+        self.enabled = enabled
+        self.print_fallback = print_fallback
+        
+        # Nur der neueste Ton zählt: ein Platz statt einer Warteschlange
+        self.pending = None
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+        
+        self.sound_dir = None
+        self.sound_files = {}
+        self.played = 0
+        self.coalesced = 0
+    
+    def start(self):
+        """Worker starten (Töne werden im Worker vorberechnet)"""
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True, name="AudioFeedback")
+        self.thread.start()
+    
+    def play(self, name: str):
+        """Ton anfordern - kehrt sofort zurück, ein wartender Ton wird ersetzt"""
+        if not self.enabled:
+            return
+        if not self.running:
+            self.start()
+        
+        with self.condition:
+            if self.pending is not None:
+                self.coalesced += 1
+            self.pending = name
+            self.condition.notify()
+    
+    def render(self):
+        """Alle Tonfolgen einmalig als WAV Dateien vorberechnen"""
+        if not WINSOUND_AVAILABLE:
+            return
+        
+        self.sound_dir = tempfile.mkdtemp(prefix='filament_scanner_sounds_')
+        for name, notes in TONES.items():
+            path = os.path.join(self.sound_dir, f'{name}.wav')
+            try:
+                render_wav(notes, path)
+                self.sound_files[name] = path
+            except OSError as e:
+                logger.warning("⚠️  Ton '%s' konnte nicht erzeugt werden: %s", name, e)
+    
+    def run(self):
+        """Worker: wartet auf den jeweils neuesten Ton und spielt ihn asynchron ab"""
+        self.render()
+        
+        while True:
+            with self.condition:
+                while self.running and self.pending is None:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                name = self.pending
+                self.pending = None
+            
+            self.output(name)
+    
+    def output(self, name: str):
+        """Ton ausgeben - SND_ASYNC bricht einen noch laufenden Ton ab"""
+        path = self.sound_files.get(name)
+        if path is not None:
+            try:
+                winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC | winsound.SND_NODEFAULT)
+                self.played += 1
+                return
+            except RuntimeError:
+                pass
+        
+        if self.print_fallback and name in FALLBACK_TEXT:
+            logger.info("%s", FALLBACK_TEXT[name])
+    
+    def stop_sound(self):
+        """Laufenden Ton abbrechen"""
+        if WINSOUND_AVAILABLE:
+            try:
+                winsound.PlaySound(None, winsound.SND_PURGE)
+            except RuntimeError:
+                pass
+    
+    def close(self):
+        """Worker beenden und vorberechnete Töne löschen"""
+        with self.condition:
+            self.running = False
+            self.pending = None
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join(timeout=1)
+        
+        if self.sound_files:
+            self.stop_sound()
+        if self.sound_dir is not None:
+            shutil.rmtree(self.sound_dir, ignore_errors=True)
+            self.sound_dir = None
+            self.sound_files = {}
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Request-Coalescing für NFC Lookups
+UIDs, die innerhalb eines kurzen Fensters eintreffen, gehen als ein
+Batch-Request an nfc_lookup.php und werden danach wieder einzeln zugestellt
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional, Dict, Any, List, Callable
+
+# Obergrenze des Servers (MAX_BATCH_SIZE in public/nfc_lookup.php)
+MAX_BATCH_SIZE = 200
+
+
+class LookupCoalescer(threading.Thread):
+    def __init__(self, send_batch: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]],
+                 window: float = 0.05, max_batch: int = 50):
+        super().__init__(daemon=True, name="LookupCoalescer")
+        self.send_batch = send_batch
+        self.window = window
+        self.max_batch = max(1, min(max_batch, MAX_BATCH_SIZE))
+        self.requests = queue.Queue()
+        self.stop_event = threading.Event()
+        # Prüfen und Einreihen atomar zu stop() - sonst kann ein Scan nach dem letzten drain() landen
+        self.lock = threading.Lock()
+        
+        self.batches = 0
+        self.coalesced = 0
+    
+    def submit(self, nfc_uid: str, scanned_at: Optional[int] = None,
+               scanner_id: Optional[str] = None) -> Future:
+        """Lookup einreihen - das Ergebnis kommt über das Future"""
+        future = Future()
+        scan = {'nfc_uid': nfc_uid, 'scanned_at': scanned_at, 'scanner_id': scanner_id}
+        
+        with self.lock:
+            if not self.stop_event.is_set():
+                self.requests.put((scan, future))
+                return future
+        
+        future.set_result({'error': 'Scanner wird beendet'})
+        return future
+    
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                first = self.requests.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            
+            batch = [first]
+            deadline = time.monotonic() + self.window
+            
+            # Weitere UIDs bis Fensterende oder Batch-Obergrenze einsammeln
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            self.dispatch(batch)
+        
+        self.drain()
+    
+    def dispatch(self, batch: List[tuple]):
+        """Einen Batch senden und die Ergebnisse den einzelnen Scans zuordnen"""
+        scans = [scan for scan, _ in batch]
+        
+        try:
+            results = self.send_batch(scans)
+        except Exception as e:
+            results = [{'error': str(e)} for _ in batch]
+        
+        self.batches += 1
+        self.coalesced += len(batch)
+        
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+    
+    def drain(self):
+        """Wartende Lookups beim Beenden nicht hängen lassen"""
+        while True:
+            try:
+                _, future = self.requests.get_nowait()
+            except queue.Empty:
+                break
+            future.set_result({'error': 'Scanner wird beendet'})
+    
+    def stop(self):
+        with self.lock:
+            self.stop_event.set()
+        if self.is_alive():
+            self.join(timeout=5)
+        # Auch wenn der Thread nie lief oder noch hängt: niemand wartet ewig
+        self.drain()
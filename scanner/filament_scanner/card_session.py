@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Kartensitzung für ACR122U
+Hält eine Verbindung für die Verweildauer des Tags offen und sendet eine
+konfigurierbare APDU-Folge (UID, GET_VERSION, Seiten lesen) am Stück
+"""
+
+import logging
+import threading
+import time
+from typing import Optional, Dict, Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Get UID Command für ISO14443 Type A (NTAG)
+GET_UID = [0xFF, 0xCA, 0x00, 0x00, 0x00]
+
+# NTAG GET_VERSION (0x60) über ACR122U Pass-Through (PN533 InCommunicateThru)
+GET_VERSION = [0xFF, 0x00, 0x00, 0x00, 0x03, 0xD4, 0x42, 0x60]
+
+# Speichergröße aus GET_VERSION → NTAG Typ
+NTAG_STORAGE_SIZES = {
+    0x0F: ("NTAG213", 144),
+    0x11: ("NTAG215", 504),
+    0x13: ("NTAG216", 888),
+}
+
+# Standard-Folge beim Auflegen eines Tags
+DEFAULT_SEQUENCE = "UID,VERSION"
+
+
+def read_pages_apdu(page: int) -> List[int]:
+    """READ BINARY: 16 Bytes (4 NTAG Seiten) ab Seite lesen"""
+    return [0xFF, 0xB0, 0x00, page & 0xFF, 0x10]
+
+
+def parse_sequence(sequence: str) -> List[Tuple[str, List[int]]]:
+    """APDU-Folge aus der Konfiguration lesen, z.B. "UID,VERSION,READ:4,READ:8" """
+    steps = []
+    
+    for token in sequence.split(','):
+        token = token.strip().upper()
+        if not token:
+            continue
+        if token == 'UID':
+            steps.append(('UID', GET_UID))
+        elif token == 'VERSION':
+            steps.append(('VERSION', GET_VERSION))
+        elif token.startswith('READ:'):
+            try:
+                page = int(token.split(':', 1)[1], 0)
+            except ValueError:
+                logger.warning("⚠️  Ungültiger Schritt in TAG_READ_SEQUENCE: %s", token)
+                continue
+            steps.append((f'READ:{page}', read_pages_apdu(page)))
+        else:
+            logger.warning("⚠️  Unbekannter Schritt in TAG_READ_SEQUENCE: %s", token)
+    
+    # Ohne UID kein Lookup - UID immer zuerst lesen
+    if not steps or steps[0][0] != 'UID':
+        steps = [('UID', GET_UID)] + [step for step in steps if step[0] != 'UID']
+    
+    return steps
+
+
+def parse_version(data: List[int]) -> Optional[Dict[str, Any]]:
+    """Antwort von GET_VERSION auswerten (D5 43 Status + 8 Bytes Version)"""
+    if len(data) >= 11 and data[0] == 0xD5 and data[1] == 0x43 and data[2] == 0x00:
+        data = data[3:]
+    if len(data) < 8:
+        return None
+    
+    tag_type, user_bytes = NTAG_STORAGE_SIZES.get(data[6], (f"Unbekannt (0x{data[6]:02X})", None))
+    return {
+        'vendor': data[1],
+        'product_type': data[2],
+        'storage_size': data[6],
+        'tag_type': tag_type,
+        'user_bytes': user_bytes,
+        'raw': ''.join(f'{byte:02X}' for byte in data[:8])
+    }
+
+
+class CardSession:
+    def __init__(self, connection, reader: str = ''):
+        self.connection = connection
+        self.reader = reader
+        self.uid = None
+        self.lock = threading.Lock()
+        self.connected = False
+        self.timings = []  # [{'step', 'ms', 'sw'}]
+        self.connect_ms = 0.0
+    
+    def open(self):
+        """Verbindung zur Karte herstellen"""
+        started = time.perf_counter()
+        self.connection.connect()
+        self.connect_ms = (time.perf_counter() - started) * 1000
+        self.connected = True
+    
+    def transmit(self, apdu: List[int], label: str = 'APDU') -> Tuple[List[int], int, int]:
+        """APDU über die offene Verbindung senden und Dauer festhalten"""
+        with self.lock:
+            if not self.connected:
+                raise RuntimeError("Kartensitzung ist geschlossen")
+            
+            started = time.perf_counter()
+            data, sw1, sw2 = self.connection.transmit(apdu)
+            self.timings.append({
+                'step': label,
+                'ms': (time.perf_counter() - started) * 1000,
+                'sw': f'{sw1:02X}{sw2:02X}'
+            })
+            return data, sw1, sw2
+    
+    def run_sequence(self, steps: List[Tuple[str, List[int]]]) -> Dict[str, Any]:
+        """APDU-Folge am Stück senden - liefert den strukturierten Tag-Datensatz"""
+        started = time.perf_counter()
+        record = {
+            'uid': None,
+            'reader': self.reader,
+            'version': None,
+            'tag_type': None,
+            'pages': {}
+        }
+        
+        for label, apdu in steps:
+            try:
+                data, sw1, sw2 = self.transmit(apdu, label)
+            except Exception as e:
+                self.timings.append({'step': label, 'ms': 0.0, 'sw': 'ERR', 'error': str(e)})
+                if label == 'UID':
+                    break
+                continue
+            
+            if (sw1, sw2) != (0x90, 0x00):
+                if label == 'UID':
+                    break
+                continue
+            
+            if label == 'UID':
+                record['uid'] = ''.join(f'{byte:02X}' for byte in data)
+                self.uid = record['uid']
+            elif label == 'VERSION':
+                record['version'] = parse_version(data)
+                if record['version']:
+                    record['tag_type'] = record['version']['tag_type']
+            elif label.startswith('READ:'):
+                record['pages'][int(label.split(':', 1)[1])] = ''.join(f'{byte:02X}' for byte in data)
+        
+        record['timings'] = list(self.timings)
+        record['connect_ms'] = self.connect_ms
+        record['total_ms'] = self.connect_ms + (time.perf_counter() - started) * 1000
+        return record
+    
+    def timing_summary(self) -> str:
+        """Kurzfassung der Zeiten, z.B. "connect 12.0 ms | UID 8.1 ms | VERSION 9.4 ms" """
+        parts = [f"connect {self.connect_ms:.1f} ms"]
+        parts += [f"{timing['step']} {timing['ms']:.1f} ms" for timing in self.timings]
+        return ' | '.join(parts)
+    
+    def close(self):
+        """Verbindung trennen (Tag wurde entfernt)"""
+        with self.lock:
+            if not self.connected:
+                return
+            self.connected = False
+            try:
+                self.connection.disconnect()
+            except Exception:
+                pass
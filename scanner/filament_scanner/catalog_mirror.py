@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Lokaler Spiegel des UID → Spule Katalogs (nfc_catalog.php)
+Beim Start komplett geladen, danach per Delta-Abgleich über einen Cursor
+aktuell gehalten - Lookups werden ohne Netzwerk aus dem Speicher beantwortet.
+"""
+
+import logging
+import threading
+import time
+from typing import Optional, Dict, Any, List, Callable
+
+from .lookup_cache import normalize_uid
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogMirror:
+    def __init__(self, fetch: Callable[[Optional[str]], Optional[Dict[str, Any]]],
+                 full_sync_interval: float = 3600.0, max_age: float = 600.0):
+        self.fetch = fetch
+        self.full_sync_interval = full_sync_interval
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.sync_lock = threading.Lock()
+        
+        self.entries = {}  # uid -> Lookup-Ergebnis wie nfc_lookup.php
+        self.by_spool = {}  # str(spool_id) -> {uid, ...}
+        self.cursor = None
+        self.total = None  # aktive Zuordnungen laut Server
+        self.synced_at = None  # monotonic, letzter erfolgreicher Abgleich
+        self.full_synced_at = None
+        
+        self.hits = 0
+        self.misses = 0
+        self.full_syncs = 0
+        self.delta_syncs = 0
+        self.sync_errors = 0
+        self.last_sync_ms = 0.0
+        self.last_sync_rows = 0
+    
+    @property
+    def ready(self) -> bool:
+        return self.synced_at is not None
+    
+    def staleness(self) -> Optional[float]:
+        """Sekunden seit dem letzten erfolgreichen Abgleich (None = nie abgeglichen)"""
+        if self.synced_at is None:
+            return None
+        return time.monotonic() - self.synced_at
+    
+    def lookup(self, nfc_uid: str) -> Optional[Dict[str, Any]]:
+        """Spule zur UID aus dem Spiegel - None bei Fehlgriff oder zu altem Spiegel"""
+        staleness = self.staleness()
+        if staleness is None or (self.max_age > 0 and staleness > self.max_age):
+            return None
+        
+        key = normalize_uid(nfc_uid)
+        with self.lock:
+            result = self.entries.get(key)
+            if result is None:
+                # Neu zugeordnete Tags kennt erst der nächste Abgleich
+                self.misses += 1
+                return None
+            self.hits += 1
+            return result
+    
+    def sync(self, full: bool = False) -> bool:
+        """Katalog abgleichen - komplett beim ersten Mal, nach full_sync_interval oder bei Abweichung"""
+        with self.sync_lock:
+            if self.cursor is None or self.full_synced_at is None:
+                full = True
+            elif self.full_sync_interval > 0 and time.monotonic() - self.full_synced_at >= self.full_sync_interval:
+                full = True
+            
+            if not self.pull(full):
+                return False
+            
+            # Gelöschte Zuordnungen kommen in keinem Delta vor - an der Anzahl erkennen
+            if not full and self.total is not None and len(self.entries) != self.total:
+                logger.info("🔄 Katalog weicht ab (%s lokal, %s Server) - kompletter Abgleich",
+                            len(self.entries), self.total)
+                return self.pull(True)
+            return True
+    
+    def pull(self, full: bool) -> bool:
+        started = time.perf_counter()
+        data = self.fetch(None if full else self.cursor)
+        if data is None:
+            self.sync_errors += 1
+            return False
+        
+        entries = data['entries']
+        with self.lock:
+            if full:
+                self.entries = {}
+                self.by_spool = {}
+            for entry in entries:
+                self.apply(entry)
+        
+        now = time.monotonic()
+        self.cursor = data['cursor']
+        self.total = data.get('total')
+        self.synced_at = now
+        self.last_sync_ms = (time.perf_counter() - started) * 1000
+        self.last_sync_rows = len(entries)
+        if full:
+            self.full_synced_at = now
+            self.full_syncs += 1
+            logger.info("📚 Katalog geladen: %s UIDs in %.0f ms", len(self.entries), self.last_sync_ms)
+        else:
+            self.delta_syncs += 1
+            if entries:
+                logger.debug("Katalog-Delta: %s Zeilen in %.0f ms", len(entries), self.last_sync_ms)
+        return True
+    
+    def apply(self, entry: Dict[str, Any]):
+        """Eine Katalogzeile übernehmen oder (inaktive Spule) entfernen - Aufrufer hält self.lock"""
+        key = normalize_uid(entry['nfc_uid'])
+        self.remove(key)
+        if not entry.get('active', True):
+            return
+        
+        spool = entry['spool']
+        self.entries[key] = {
+            'found': True,
+            'spool': spool,
+            'nfc_info': entry['nfc_info']
+        }
+        self.by_spool.setdefault(str(spool['id']), set()).add(key)
+    
+    def remove(self, key: str):
+        """UID aus Spiegel und Spulen-Index entfernen - Aufrufer hält self.lock"""
+        old = self.entries.pop(key, None)
+        if old is None:
+            return
+        spool_id = str(old['spool']['id'])
+        uids = self.by_spool.get(spool_id)
+        if uids is not None:
+            uids.discard(key)
+            if not uids:
+                del self.by_spool[spool_id]
+    
+    def update(self, entries: List[Dict[str, Any]]):
+        """Katalogzeilen außerhalb des Abgleichs übernehmen (z.B. aus dem Änderungs-Stream)"""
+        with self.lock:
+            for entry in entries:
+                self.apply(entry)
+    
+    def remove_uid(self, nfc_uid: str):
+        with self.lock:
+            self.remove(normalize_uid(nfc_uid))
+    
+    def remove_spool(self, spool_id) -> int:
+        """Alle UIDs einer Spule entfernen - liefert die Anzahl"""
+        with self.lock:
+            keys = list(self.by_spool.get(str(spool_id), ()))
+            for key in keys:
+                self.remove(key)
+        return len(keys)
+    
+    def invalidate(self):
+        """Nächsten Abgleich komplett durchführen (Änderungen sind verloren gegangen)"""
+        self.full_synced_at = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Größe, Abgleichsdauer, Zeilen und Alter des Spiegels"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            staleness = self.staleness()
+            return {
+                'size': len(self.entries),
+                'spools': len(self.by_spool),
+                'ready': self.ready,
+                'cursor': self.cursor,
+                'staleness': round(staleness, 1) if staleness is not None else None,
+                'last_sync_ms': round(self.last_sync_ms, 1),
+                'last_sync_rows': self.last_sync_rows,
+                'full_syncs': self.full_syncs,
+                'delta_syncs': self.delta_syncs,
+                'sync_errors': self.sync_errors,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+class CatalogSyncer(threading.Thread):
+    """Hintergrund-Thread: Katalog beim Start laden und periodisch per Delta abgleichen"""
+    
+    def __init__(self, mirror: CatalogMirror, interval: float = 30.0, max_interval: float = 300.0,
+                 on_sync: Optional[Callable[[CatalogMirror], None]] = None):
+        super().__init__(daemon=True, name="CatalogSyncer")
+        self.mirror = mirror
+        self.interval = interval
+        self.max_interval = max_interval
+        self.on_sync = on_sync
+        self.stop_event = threading.Event()
+        self.wake_event = threading.Event()
+    
+    def run(self):
+        delay = self.interval
+        
+        while not self.stop_event.is_set():
+            if self.mirror.sync():
+                delay = self.interval
+                if self.on_sync is not None:
+                    self.on_sync(self.mirror)
+            else:
+                # Backoff solange der Katalog nicht abrufbar ist
+                delay = min(delay * 2, self.max_interval)
+            
+            self.wake_event.wait(delay)
+            self.wake_event.clear()
+    
+    def wake(self):
+        """Sofort abgleichen"""
+        self.wake_event.set()
+    
+    def stop(self):
+        self.stop_event.set()
+        self.wake_event.set()
+        self.join(timeout=5)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Änderungs-Stream vom Server (nfc_events.php, Server-Sent Events)
+Eine dauerhafte Verbindung meldet Spulen-Änderungen und UID-Zuordnungen,
+damit Cache und Katalog-Spiegel sofort angepasst werden. Nach einem Abbruch
+wird mit Last-Event-ID an der letzten Stelle fortgesetzt. Die Verbindung
+öffnet der LookupClient, damit Circuit Breaker und Failover auch hier gelten.
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Optional, Dict, Any, Callable, Iterable, Iterator
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+def iter_sse(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """SSE Zeilen zu Ereignissen {'id', 'event', 'data'} zusammensetzen - 'retry' kommt einzeln"""
+    event_id = None
+    kind = None
+    data = []
+    
+    for line in lines:
+        if not line:
+            # Leerzeile schließt ein Ereignis ab
+            if data:
+                yield {'id': event_id, 'event': kind or 'message', 'data': '\n'.join(data)}
+            event_id = None
+            kind = None
+            data = []
+            continue
+        if line.startswith(':'):
+            continue  # Kommentar / Heartbeat
+        
+        field, _, value = line.partition(':')
+        if value.startswith(' '):
+            value = value[1:]
+        
+        if field == 'data':
+            data.append(value)
+        elif field == 'event':
+            kind = value
+        elif field == 'id':
+            event_id = value
+        elif field == 'retry' and value.isdigit():
+            yield {'retry': int(value)}
+
+
+class ChangeStream(threading.Thread):
+    """Hintergrund-Thread: Stream offen halten und Ereignisse an on_event(art, daten) geben"""
+    
+    def __init__(self, connect: Callable[..., Optional[requests.Response]], on_event: Callable[[str, Dict[str, Any]], None],
+                 headers: Optional[Dict[str, str]] = None, connect_timeout: float = 3.0,
+                 read_timeout: float = 45.0, retry: float = 2.0, max_retry: float = 60.0):
+        super().__init__(daemon=True, name="ChangeStream")
+        self.connect = connect  # connect(session, headers, timeout) - None wenn alle Endpunkte gesperrt
+        self.on_event = on_event
+        self.timeout = (connect_timeout, read_timeout)
+        self.retry = retry
+        self.max_retry = max_retry
+        self.stop_event = threading.Event()
+        
+        # Eigene Session - der Stream belegt sonst dauerhaft eine Verbindung aus dem Lookup-Pool
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        self.response = None
+        
+        self.last_event_id = None
+        self.connected = False
+        self.connects = 0
+        self.events = 0
+        self.errors = 0
+        self.blocked = 0
+        self.connected_since = None
+    
+    def run(self):
+        delay = self.retry
+        
+        while not self.stop_event.is_set():
+            try:
+                self.listen()
+                delay = self.retry
+            except Exception as e:
+                # Auch das Schließen der Antwort durch stop() landet hier
+                if self.stop_event.is_set():
+                    break
+                self.errors += 1
+                logger.warning("⚠️  Änderungs-Stream unterbrochen: %s", e)
+                delay = min(delay * 2, self.max_retry)
+            finally:
+                self.connected = False
+                self.response = None
+            
+            self.stop_event.wait(delay)
+        
+        self.session.close()
+    
+    def listen(self):
+        """Eine Verbindung lesen, bis der Server sie beendet"""
+        headers = {'Accept': 'text/event-stream'}
+        if self.last_event_id is not None:
+            headers['Last-Event-ID'] = self.last_event_id
+        
+        response = self.connect(self.session, headers, self.timeout)
+        if response is None:
+            # Alle Endpunkte gesperrt - nach der Wartezeit erneut versuchen
+            self.blocked += 1
+            return
+        
+        with response:
+            if response.status_code != 200:
+                raise requests.HTTPError(f"HTTP {response.status_code}")
+            
+            self.response = response
+            response.encoding = 'utf-8'
+            self.connected = True
+            self.connected_since = time.time()
+            self.connects += 1
+            # Der Server beendet den Stream regelmäßig - Fortsetzungen nur im Debug-Log
+            if self.connects == 1:
+                logger.info("📡 Änderungs-Stream verbunden")
+            else:
+                logger.debug("Änderungs-Stream fortgesetzt ab Ereignis %s", self.last_event_id)
+            
+            for event in iter_sse(response.iter_lines(chunk_size=None, decode_unicode=True)):
+                if self.stop_event.is_set():
+                    return
+                if 'retry' in event:
+                    self.retry = event['retry'] / 1000
+                    continue
+                if event['id'] is not None:
+                    self.last_event_id = event['id']
+                if event['event'] == 'ready':
+                    continue
+                
+                self.events += 1
+                try:
+                    self.on_event(event['event'], json.loads(event['data']))
+                except Exception as e:
+                    logger.warning("⚠️  Änderung %s nicht übernommen: %s", event['event'], e)
+    
+    def stop(self):
+        self.stop_event.set()
+        response = self.response
+        if response is not None:
+            # Blockierendes Lesen beenden
+            response.close()
+        self.join(timeout=5)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'connected': self.connected,
+            'connected_since': self.connected_since,
+            'last_event_id': self.last_event_id,
+            'connects': self.connects,
+            'events': self.events,
+            'errors': self.errors,
+            'blocked': self.blocked
+        }
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Circuit Breaker für den Lookup Service
+Nach mehreren Fehlern oder zu langsamen Antworten in Folge öffnet der
+Breaker: Lookups scheitern sofort statt auf den Timeout zu warten. Nach
+einer Wartezeit lässt er einzelne Probe-Requests durch (half-open) und
+schließt wieder, sobald eine Probe rechtzeitig beantwortet wird.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Any, Callable
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Zahlenwerte für die Prometheus Gauge
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 3, slow_threshold: int = 3, slo_ms: float = 2000.0,
+                 reset_timeout: float = 10.0, max_reset_timeout: float = 60.0, name: str = 'Lookup Service'):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.slow_threshold = slow_threshold  # 0 = Latenz nicht auswerten
+        self.slo_ms = slo_ms
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.listeners = []  # listener(vorher, nachher)
+        # Reentrant: Abnehmer dürfen beim Zustandswechsel stats() abfragen
+        self.lock = threading.RLock()
+        
+        self.state = CLOSED
+        self.failures = 0  # in Folge
+        self.slow_calls = 0  # in Folge
+        self.open_until = 0.0
+        self.current_timeout = reset_timeout
+        self.probe_in_flight = False
+        self.opened_at = None
+        
+        self.trips = 0
+        self.rejected = 0
+        self.probes = 0
+    
+    def add_listener(self, listener: Callable[[str, str], None]):
+        """Abnehmer für Zustandswechsel registrieren - muss schnell zurückkehren"""
+        self.listeners.append(listener)
+    
+    def allow(self) -> bool:
+        """Darf ein Request raus? Offen: nein - nach Ablauf der Wartezeit genau eine Probe"""
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+            
+            if self.state == OPEN and time.monotonic() >= self.open_until:
+                self._transition(HALF_OPEN)
+            
+            if self.state == HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                self.probes += 1
+                return True
+            
+            self.rejected += 1
+            return False
+    
+    def record_success(self, duration_ms: float):
+        """Antwort erhalten - zu langsame Antworten zählen wie halbe Fehler"""
+        with self.lock:
+            slow = self.slow_threshold > 0 and duration_ms > self.slo_ms
+            self.failures = 0
+            
+            if self.state == HALF_OPEN:
+                self.probe_in_flight = False
+                if slow:
+                    self._trip(f"Probe zu langsam ({duration_ms:.0f} ms)")
+                else:
+                    self.slow_calls = 0
+                    self.current_timeout = self.reset_timeout
+                    self._transition(CLOSED)
+                return
+            
+            if not slow:
+                self.slow_calls = 0
+                return
+            
+            self.slow_calls += 1
+            if self.state == CLOSED and self.slow_calls >= self.slow_threshold:
+                self._trip(f"{self.slow_calls} Antworten über {self.slo_ms:.0f} ms")
+    
+    def record_failure(self):
+        """Netzwerk- oder Serverfehler"""
+        with self.lock:
+            self.failures += 1
+            
+            if self.state == HALF_OPEN:
+                self.probe_in_flight = False
+                # Wartezeit bis zur nächsten Probe verdoppeln
+                self.current_timeout = min(self.current_timeout * 2, self.max_reset_timeout)
+                self._trip("Probe fehlgeschlagen")
+            elif self.state == CLOSED and self.failures >= self.failure_threshold:
+                self._trip(f"{self.failures} Fehler in Folge")
+    
+    def _trip(self, reason: str):
+        """Öffnen (Lock muss gehalten werden)"""
+        self.open_until = time.monotonic() + self.current_timeout
+        self.failures = 0
+        self.slow_calls = 0
+        if self.state == CLOSED:
+            self.trips += 1
+            self.opened_at = time.time()
+            logger.warning("⛔ %s gesperrt: %s - nächster Versuch in %.0fs", self.name, reason, self.current_timeout)
+        self._transition(OPEN)
+    
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        previous = self.state
+        self.state = state
+        if state == CLOSED:
+            self.opened_at = None
+            logger.info("✅ %s wieder erreichbar", self.name)
+        for listener in self.listeners:
+            try:
+                listener(previous, state)
+            except Exception as e:
+                logger.warning("⚠️  Circuit Breaker Abnehmer fehlgeschlagen: %s", e)
+    
+    def retry_in(self) -> float:
+        """Sekunden bis zur nächsten Probe (0 = jetzt möglich)"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.open_until - time.monotonic())
+    
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'state': self.state,
+                'retry_in': round(self.retry_in(), 1),
+                'open_since': self.opened_at,
+                'trips': self.trips,
+                'rejected': self.rejected,
+                'probes': self.probes,
+                'consecutive_failures': self.failures,
+                'consecutive_slow': self.slow_calls
+            }
+
+
+class CircuitProber(threading.Thread):
+    """Hintergrund-Thread: fällige Proben auch ohne Scans senden - probe() entscheidet, was fällig ist"""
+    
+    def __init__(self, probe: Callable[[], bool], interval: float = 1.0):
+        super().__init__(daemon=True, name="CircuitProber")
+        self.probe = probe
+        self.interval = interval
+        self.stop_event = threading.Event()
+    
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            self.probe()
+    
+    def stop(self):
+        self.stop_event.set()
+        self.join(timeout=5)
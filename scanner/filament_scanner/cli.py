@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Kommandozeilen-Oberfläche des Scanners
+Hauptschleife, Simulation ohne Hardware und Ausgabe der Scan-Ergebnisse -
+die eigentliche Arbeit erledigt der gemeinsame Kern (core.py).
+"""
+
+import argparse
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any
+
+from .config import load_config, config_int
+from .core import ACR122UNFCScanner, POLL_INTERVAL
+from .logging_setup import setup_logging, LOGGER_NAME
+
+# Fester Name: bei python -m filament_scanner.cli wäre __name__ '__main__' und
+# läge außerhalb des von setup_logging konfigurierten Logger-Baums
+logger = logging.getLogger(f"{LOGGER_NAME}.cli")
+
+
+class ScannerCLI:
+    def __init__(self, scanner: ACR122UNFCScanner, log_pipeline=None, daemon: bool = False):
+        self.scanner = scanner
+        self.metrics = scanner.metrics
+        self.log_pipeline = log_pipeline
+        # Dienst-Modus: kein stdin (systemd, Docker) - nie nach Eingaben fragen
+        self.daemon = daemon
+        self.stop_event = threading.Event()
+        
+        # Abgleich getaggter Scans: ein Worker pro Reader, damit Schreibzugriffe
+        # nie parallel auf demselben Reader laufen und Tap-Serien keine Threads anhäufen
+        self.reconcilers = {}  # Reader -> Executor
+        self.reconcile_taps = {}  # UID -> Scan-Nummer des neuesten Abgleichs
+        self.reconcile_lock = threading.Lock()
+    
+    def handle_scan_result(self, result: Dict[str, Any], nfc_uid: str):
+        """Scan-Ergebnis verarbeiten und anzeigen"""
+        with self.metrics.span('cli_render'):
+            self.print_scan_result(result, nfc_uid)
+    
+    def print_scan_result(self, result: Dict[str, Any], nfc_uid: str):
+        """Spulen-Box bzw. Hinweis für unbekannte Tags ausgeben und Ton anfordern"""
+        # Eine Meldung pro Ergebnis - die Box erscheint am Stück und die
+        # Scan-Schleife wartet nicht auf die Konsole
+        if result.get('found'):
+            spool = result.get('spool', {})
+            if result.get('from_tag'):
+                source = ' (Tag)'
+            elif result.get('from_mirror'):
+                source = ' (Katalog)'
+            elif result.get('stale'):
+                source = ' (Cache, offline)'
+            elif result.get('cached'):
+                source = ' (Cache)'
+            else:
+                source = ''
+            weight = f"{spool.get('remaining_weight', 0)}g / {spool.get('total_weight', 0)}g"
+            logger.info("\n".join([
+                f"🎯 SPOOL GEFUNDEN!{source}",
+                f"   ╭─────────────────────────────────────╮",
+                f"   │ ID: {spool.get('id', 'N/A'):<30} │",
+                f"   │ Material: {spool.get('material', 'N/A'):<24} │",
+                f"   │ Gewicht: {weight:<25} │",
+                f"   │ Standort: {spool.get('location', 'Nicht angegeben'):<24} │",
+                f"   ╰─────────────────────────────────────╯"
+            ]))
+            
+            # Erfolgreicher Scan - freundlicher Ton
+            self.scanner.audio.play('success')
+        
+        else:
+            logger.info("❓ UNBEKANNTE NFC UID: %s\n"
+                        "   Spool nicht in der Datenbank gefunden\n"
+                        "   → Registrieren Sie den Tag über die Web-App", nfc_uid)
+            
+            # Unbekannter Tag - fragender Ton
+            self.scanner.audio.play('unknown')
+    
+    def schedule_reconcile(self, nfc_uid: str, reader: str, tag: Dict[str, Any], scan_number: int):
+        """Abgleich im Worker des Readers einreihen - ältere Abgleiche derselben UID entfallen"""
+        with self.reconcile_lock:
+            self.reconcile_taps[nfc_uid] = scan_number
+            executor = self.reconcilers.get(reader)
+            if executor is None:
+                executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='Reconcile')
+                self.reconcilers[reader] = executor
+        executor.submit(self.reconcile_in_background, nfc_uid, reader, tag, scan_number)
+    
+    def stop_reconcilers(self):
+        """Eingereihte Abgleiche abarbeiten (Scans landen noch im Journal)"""
+        with self.reconcile_lock:
+            executors = list(self.reconcilers.values())
+            self.reconcilers.clear()
+        for executor in executors:
+            executor.shutdown(wait=True)
+    
+    def reconcile_in_background(self, nfc_uid: str, reader: str, tag: Dict[str, Any], scan_number: int):
+        """Scan protokollieren und Tag-Daten mit dem Server abgleichen"""
+        scanner = self.scanner
+        try:
+            result = scanner.process_scan(nfc_uid, reader)
+        finally:
+            with self.reconcile_lock:
+                superseded = self.reconcile_taps.get(nfc_uid) != scan_number
+                if not superseded:
+                    del self.reconcile_taps[nfc_uid]
+        
+        if superseded:
+            # Ein späterer Tap derselben UID gleicht ab - Scan ist protokolliert
+            return
+        
+        if 'error' in result:
+            if result.get('queued'):
+                logger.info("📦 Scan %s im Journal gespeichert - wird nachgereicht", nfc_uid)
+            return
+        
+        if not result.get('found'):
+            logger.warning("⚠️  Tag %s trägt Spulen-Daten, ist auf dem Server aber keiner Spule zugeordnet", nfc_uid)
+            return
+        
+        reconcile = scanner.reconcile_tag(nfc_uid, reader, tag, result)
+        scanner.emit('reconciled', {'uid': nfc_uid, 'reader': reader, 'changed': reconcile['changed'],
+                                    'written': reconcile['written'], 'result': result})
+        if reconcile['changed']:
+            logger.info("🔄 Server-Daten für %s weichen vom Tag ab: %s", nfc_uid, ', '.join(reconcile['changed']))
+            self.handle_scan_result(result, nfc_uid)
+    
+    def handle_tap(self, event: Dict[str, Any], scan_number: int):
+        """Aufgelegten Tag verarbeiten: Tag-Daten oder Lookup anzeigen"""
+        scanner = self.scanner
+        nfc_uid = event['uid']
+        reader = event['reader']
+        
+        if scanner.reader_manager is not None:
+            logger.info("📡 Scan #%s - UID: %s (%s)", scan_number, nfc_uid, reader)
+        else:
+            logger.info("📡 Scan #%s - UID: %s", scan_number, nfc_uid)
+        
+        detected_at = event.get('time', time.perf_counter())
+        scanner.emit('scan', {'uid': nfc_uid, 'reader': reader, 'number': scan_number, 'time': time.time()})
+        
+        # Spulen-Record vom Tag sofort anzeigen, Server-Abgleich im Hintergrund
+        tag = event.get('tag')
+        tag_result = scanner.tag_result(tag)
+        if tag_result is not None:
+            self.handle_scan_result(tag_result, nfc_uid)
+            scanner.emit_result(nfc_uid, reader, scan_number, tag_result, detected_at, detected_at)
+            self.schedule_reconcile(nfc_uid, reader, tag, scan_number)
+            logger.info("")
+            return
+        
+        # Journal + Lookup (Cache oder API)
+        lookup_started = time.perf_counter()
+        result = scanner.process_scan(nfc_uid, reader)
+        scanner.emit_result(nfc_uid, reader, scan_number, result, detected_at, lookup_started)
+        
+        # Abweichende oder fehlende Spulen-Records schreiben (nur mit TAG_WRITEBACK=1 auf leere bzw. eigene Tags)
+        if tag is not None:
+            scanner.reconcile_tag(nfc_uid, reader, tag, result)
+        
+        # Ergebnis verarbeiten
+        if 'error' not in result:
+            self.handle_scan_result(result, nfc_uid)
+        else:
+            logger.error("❌ API Fehler: %s", result.get('error', 'Unbekannt'))
+            if result.get('queued'):
+                logger.info("📦 Scan im Journal gespeichert - wird nachgereicht")
+        
+        logger.info("")  # Leerzeile für bessere Lesbarkeit
+    
+    def run(self):
+        """Hauptschleife des ACR122U Scanners"""
+        scanner = self.scanner
+        logger.info("🚀 ACR122U NFC Scanner für Windows startet...")
+        logger.info("   API Base URL: %s", ', '.join(
+            endpoint.base_url for endpoint in scanner.lookup_client.endpoints.endpoints
+        ))
+        logger.info("   NFC Lookup: %s/nfc_lookup.php", scanner.api_url_base)
+        logger.info("   Scanner ID: %s", scanner.scanner_id)
+        logger.info("   Drücken Sie Ctrl+C zum Beenden")
+        logger.info("")
+        
+        if not scanner.backend.available:
+            logger.error("❌ pyscard Bibliothek nicht verfügbar")
+            logger.info("   Installieren Sie mit: pip install pyscard")
+            logger.info("   Simulation wird gestartet...")
+            self.run_simulation()
+            return
+        
+        if not scanner.connect_reader():
+            logger.error("❌ Kein Reader verfügbar")
+            logger.info("")
+            logger.info("💡 Problemlösung:")
+            logger.info("   1. ACR122U USB-Kabel überprüfen")
+            logger.info("   2. Treiber von https://www.acs.com.hk installieren")
+            logger.info("   3. Andere Programme schließen die den Reader verwenden")
+            logger.info("   4. Reader an anderen USB-Port anschließen")
+            logger.info("")
+            logger.info("⏳ Warte auf Reader - die Verbindung wird automatisch hergestellt")
+        
+        # Reader-Ausfälle werden im Hintergrund erkannt und behoben
+        scanner.start_supervisor()
+        
+        scanner.running = True
+        scanner.scan_count = 0
+        scanner.start_warm_up()
+        scanner.start_journal()
+        scanner.start_catalog()
+        scanner.start_change_stream()
+        scanner.start_breaker_probe()
+        scanner.start_coalescer()
+        scanner.start_metrics_reporter()
+        use_events = scanner.start_acquisition()
+        
+        logger.info("👁️  Bereit zum Scannen - halten Sie NFC Tags an den Reader...")
+        logger.info("")
+        
+        try:
+            while scanner.running:
+                # Auf NFC Tag warten (Event oder Poll) - nur bestätigte Auflegen/Entfernen
+                for event in scanner.acquire_taps(use_events):
+                    if event['type'] == 'inserted':
+                        scanner.scan_count += 1
+                        self.handle_tap(event, scanner.scan_count)
+                    else:
+                        logger.info("📱 NFC Tag entfernt - bereit für nächsten Scan...")
+                        scanner.emit('removed', {'uid': event['uid'], 'reader': event['reader']})
+                
+                if not use_events:
+                    # Kurze Pause um CPU zu schonen
+                    time.sleep(POLL_INTERVAL)
+        except KeyboardInterrupt:
+            logger.info("\n🛑 Scanner wird beendet...")
+        finally:
+            scanner.running = False
+            reader_stats = scanner.reader_stats()
+            scanner.stop_acquisition()
+            self.stop_reconcilers()
+            scanner.close()
+            logger.info("📊 Gesamt Scans: %s", scanner.scan_count)
+            presence = scanner.presence.stats()
+            if presence['duplicates'] or presence['flaps'] or presence['cooldown_suppressed']:
+                logger.info("📊 Unterdrückt: %s Duplikate, %s Aussetzer, %s erneute Scans in der Sperrzeit",
+                            presence['duplicates'], presence['flaps'], presence['cooldown_suppressed'])
+            scanner.print_cache_stats()
+            if self.metrics.counter('scans'):
+                logger.info("📈 %s", self.metrics.summary_line())
+            if reader_stats['reconnects']:
+                logger.info("📊 Reader: %s Wiederverbindungen, %.1fs Ausfall",
+                            reader_stats['reconnects'], reader_stats['total_downtime'])
+    
+    def run_simulation(self):
+        """Simulation für Tests ohne Hardware - im Dienst-Modus nur weiterlaufen"""
+        scanner = self.scanner
+        if self.daemon:
+            logger.warning("⚠️  Dienst-Modus ohne Reader - keine Scans, /status bleibt erreichbar")
+        else:
+            logger.info("🔄 SIMULATIONSMODUS")
+            logger.info("   Geben Sie NFC UIDs manuell ein zum Testen:")
+        logger.info("")
+        
+        scanner.start_warm_up()
+        scanner.start_journal()
+        scanner.start_catalog()
+        scanner.start_change_stream()
+        scanner.start_breaker_probe()
+        
+        try:
+            if self.daemon:
+                # Journal und Abgleich laufen im Hintergrund weiter
+                while not self.stop_event.wait(1.0):
+                    pass
+                return
+            
+            while True:
+                # Ausgabe des letzten Scans abwarten, sonst steht die Eingabeaufforderung davor
+                if self.log_pipeline is not None:
+                    self.log_pipeline.flush()
+                try:
+                    nfc_uid = input("NFC UID eingeben (oder 'quit'): ").strip().upper()
+                except EOFError:
+                    # stdin geschlossen oder nicht vorhanden - wie 'quit'
+                    break
+                
+                if nfc_uid.lower() in ['quit', 'exit', 'q', '']:
+                    break
+                
+                if nfc_uid:
+                    # Wie ein echter Tap verarbeiten (inkl. Ereignisse für den Dienst-Modus)
+                    scanner.scan_count += 1
+                    self.handle_tap({'uid': nfc_uid, 'reader': 'Simulation', 'time': time.perf_counter()},
+                                    scanner.scan_count)
+        
+        except KeyboardInterrupt:
+            logger.info("\n🛑 Simulation beendet")
+        finally:
+            self.stop_reconcilers()
+            scanner.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Filament NFC Scanner (ACR122U)")
+    parser.add_argument('--daemon', action='store_true',
+                        help="Dienst-Modus: /status und /events (SSE) über lokalen HTTP Server")
+    parser.add_argument('--port', type=int, help="Port für den Dienst-Modus (Standard: DAEMON_PORT)")
+    args = parser.parse_args()
+    
+    # Konfiguration laden
+    config = load_config()
+    
+    API_URL = config['API_URL']
+    SCANNER_ID = config['SCANNER_ID']
+    
+    print("=" * 50)
+    print("  🏷️  FILAMENT NFC SCANNER - ACR122U")
+    print("=" * 50)
+    print(f"  API: {API_URL}")
+    print(f"  Scanner ID: {SCANNER_ID}")
+    print(f"  Erfassung: {config['ACQUISITION_MODE']}")
+    if args.daemon:
+        print("  Modus: Dienst (headless)")
+    print("=" * 50)
+    print("")
+    
+    # Ab hier nur noch über die Log-Queue (Konsole + LOG_FILE)
+    log_pipeline = setup_logging(config)
+    
+    # Scanner erstellen und starten
+    scanner = ACR122UNFCScanner(API_URL, SCANNER_ID, config['ACQUISITION_MODE'], config)
+    
+    service = None
+    metrics_port = config_int(config, 'METRICS_PORT', 0)
+    if args.daemon or metrics_port > 0:
+        # Ohne Dienst-Modus nur für /metrics (Prometheus Scrape)
+        from .scan_service import ScanService
+        if args.daemon:
+            port = args.port if args.port is not None else config_int(config, 'DAEMON_PORT', 8766)
+        else:
+            port = metrics_port
+        service = ScanService(
+            scanner,
+            config['DAEMON_HOST'],
+            port,
+            config_int(config, 'DAEMON_QUEUE_SIZE', 100)
+        )
+        service.start()
+    
+    try:
+        ScannerCLI(scanner, log_pipeline, daemon=args.daemon).run()
+    finally:
+        if service is not None:
+            service.stop()
+        log_pipeline.stop()
+
+if __name__ == "__main__":
+    main()
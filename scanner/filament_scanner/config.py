@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Konfiguration für CLI und GUI
+Standardwerte aller Schlüssel und einfacher Key=Value Parser für config.ini
+"""
+
+import logging
+import os
+from typing import Dict
+
+from .card_session import DEFAULT_SEQUENCE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_FILE = 'config.ini'
+
+DEFAULT_CONFIG = {
+    'API_URL': 'http://localhost:8000',
+    'SCANNER_ID': 'acr122u_001',
+    'ENABLE_SOUND': '1',
+    'DEBUG_MODE': '0',
+    'LOG_FILE': 'scanner.log',
+    'LOG_MAX_BYTES': '1048576',
+    'LOG_BACKUP_COUNT': '3',
+    'LOG_RATE_LIMIT': '5',
+    'LOG_RATE_WINDOW': '10',
+    'ACQUISITION_MODE': 'monitor',
+    'HTTP_POOL_SIZE': '4',
+    'HTTP_RETRIES': '2',
+    'HTTP_BACKOFF': '0.3',
+    'HTTP_CONNECT_TIMEOUT': '3',
+    'HTTP_READ_TIMEOUT': '10',
+    'BREAKER_FAILURES': '3',
+    'BREAKER_SLOW_CALLS': '3',
+    'BREAKER_SLO_MS': '2000',
+    'BREAKER_RESET': '10',
+    'BREAKER_MAX_RESET': '60',
+    'ENDPOINT_PROBE_INTERVAL': '30',
+    'HEDGE_REQUESTS': '0',
+    'HEDGE_MIN_DELAY_MS': '25',
+    'CACHE_SIZE': '512',
+    'CACHE_TTL': '300',
+    'CACHE_NEGATIVE_TTL': '30',
+    'JOURNAL_FILE': 'scan_journal.db',
+    'JOURNAL_MAX_ENTRIES': '10000',
+    'JOURNAL_BATCH_SIZE': '25',
+    'JOURNAL_FLUSH_INTERVAL': '5',
+    'BATCH_WINDOW_MS': '0',
+    'BATCH_MAX_SIZE': '50',
+    'SCAN_LOG_UPLOAD': '1',
+    'SCAN_LOG_BATCH_SIZE': '100',
+    'CATALOG_MIRROR': '0',
+    'CATALOG_SYNC_INTERVAL': '30',
+    'CATALOG_FULL_SYNC_INTERVAL': '3600',
+    'CATALOG_MAX_AGE': '600',
+    'CHANGE_STREAM': '0',
+    'CHANGE_STREAM_TIMEOUT': '45',
+    'MAX_IN_FLIGHT_LOOKUPS': '4',
+    'MULTI_READER': '0',
+    'READER_CHECK_INTERVAL': '2',
+    'READER_MAX_BACKOFF': '30',
+    'TAG_READ_SEQUENCE': DEFAULT_SEQUENCE,
+    'TAG_RECORDS': '1',
+    'TAG_WRITEBACK': '0',
+    'PRESENCE_DEBOUNCE_MS': '800',
+    'TAP_COOLDOWN_MS': '2000',
+    'DAEMON_HOST': '127.0.0.1',
+    'DAEMON_PORT': '8766',
+    'DAEMON_QUEUE_SIZE': '100',
+    'READER_BACKEND': 'pcsc',
+    'EMULATOR_READERS': 'ACS ACR122U PICC Interface 0',
+    'EMULATOR_SCRIPT': '',
+    'EMULATOR_TAPS': '20',
+    'EMULATOR_CONNECT_MS': '15',
+    'EMULATOR_APDU_MS': '4',
+    'METRICS_PORT': '0',
+    'METRICS_LOG_INTERVAL': '60',
+    'HISTORY_FILE': 'scan_history.db',
+    'HISTORY_MEMORY': '500',
+    'HISTORY_MAX_ENTRIES': '100000',
+    'HISTORY_WINDOW': '200'
+}
+
+
+def load_config(config_file: str = DEFAULT_CONFIG_FILE, verbose: bool = True) -> Dict[str, str]:
+    """Konfiguration aus config.ini laden - fehlende Schlüssel mit Standardwerten"""
+    config = dict(DEFAULT_CONFIG)
+    
+    if os.path.exists(config_file):
+        try:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+            
+            # Einfache Key=Value Parser
+            for line in content.split('\n'):
+                line = line.strip()
+                if line and not line.startswith('#') and '=' in line:
+                    key, value = line.split('=', 1)
+                    config[key.strip()] = value.strip()
+            
+            if verbose:
+                print(f"✅ Konfiguration geladen aus {config_file}")
+        except Exception as e:
+            if verbose:
+                print(f"⚠️  Konfigurationsfehler: {e}, verwende Standard-Werte")
+    elif verbose:
+        print(f"ℹ️  Keine config.ini gefunden, verwende Standard-Konfiguration")
+    
+    return config
+
+
+def config_int(config: Dict[str, str], key: str, default: int) -> int:
+    """Ganzzahl aus der Konfiguration lesen"""
+    try:
+        return int(config.get(key, default))
+    except (TypeError, ValueError):
+        logger.warning("⚠️  Ungültiger Wert für %s (%r), verwende %s", key, config.get(key), default)
+        return default
+
+
+def config_float(config: Dict[str, str], key: str, default: float) -> float:
+    """Kommazahl aus der Konfiguration lesen"""
+    try:
+        return float(config.get(key, default))
+    except (TypeError, ValueError):
+        logger.warning("⚠️  Ungültiger Wert für %s (%r), verwende %s", key, config.get(key), default)
+        return default
@@ -0,0 +1,1028 @@
+#!/usr/bin/env python3
+"""
+Scanner-Kern für CLI und GUI mit ACR122U
+Reader-Backend, Lookup-Client, Cache, Journal und Ereignis-Bus - ohne
+Ausgabe beim Import, damit beide Oberflächen denselben Kern verwenden.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Optional, Dict, Any, List, Tuple
+
+from .batch_lookup import LookupCoalescer, MAX_BATCH_SIZE
+from .catalog_mirror import CatalogMirror, CatalogSyncer
+from .change_stream import ChangeStream
+from .circuit_breaker import CircuitProber, CLOSED as CIRCUIT_CLOSED
+from .card_session import CardSession, GET_UID, DEFAULT_SEQUENCE, parse_sequence
+from .audio_feedback import AudioFeedback
+from .config import config_int, config_float
+from .events import EventBus
+from .lookup_cache import LookupCache
+from .logging_setup import SCAN_LOGGER_NAME
+from .lookup_client import LookupClient, MAX_SCAN_LOG_SIZE
+from .metrics import MetricsRegistry, MetricsReporter
+from .presence import PresenceTracker
+from .reader_backend import create_backend, CardObserver, CardRequestTimeoutException, NoCardException
+from .reader_health import ReaderSupervisor
+from .reader_manager import ReaderManager, reader_scanner_id
+from .scan_journal import ScanJournal, JournalFlusher
+from .tag_record import read_spool_record, write_spool_record, writeback_blocker, changed_fields, tag_lookup_result
+
+logger = logging.getLogger(__name__)
+scan_logger = logging.getLogger(SCAN_LOGGER_NAME)
+
+# Pause zwischen zwei Abfragen im Polling-Fallback (Sekunden)
+POLL_INTERVAL = 0.3
+
+# Erfassungsmodi: 'monitor' = CardMonitor Events (Standard), 'poll' = CardRequest Schleife
+ACQUISITION_MODES = ('monitor', 'poll')
+
+
+class NFCCardObserver(CardObserver):
+    """Karten-Events des CardMonitor in die Event-Queue des Scanners schieben"""
+
+    def __init__(self, scanner: 'ACR122UNFCScanner'):
+        super().__init__()
+        self.scanner = scanner
+
+    def update(self, observable, actions):
+        added_cards, removed_cards = actions
+
+        for card in added_cards:
+            if not self.scanner.is_own_reader(card.reader):
+                continue
+            # Tag direkt im Monitor-Thread lesen, solange er sicher aufliegt;
+            # die Verbindung bleibt bis zum Entfernen offen
+            tag = self.scanner.open_card_session(card)
+            self.scanner.card_events.put({
+                'type': 'inserted',
+                'uid': tag['uid'] if tag else None,
+                'reader': str(card.reader),
+                'time': time.perf_counter(),
+                'tag': tag
+            })
+
+        for card in removed_cards:
+            if not self.scanner.is_own_reader(card.reader):
+                continue
+            self.scanner.close_card_session(card.reader)
+            self.scanner.card_events.put({
+                'type': 'removed',
+                'uid': None,
+                'reader': str(card.reader),
+                'time': time.perf_counter()
+            })
+
+
+class ACR122UNFCScanner:
+    def __init__(self, api_url: str, scanner_id: str = "acr122u_001", acquisition_mode: str = "monitor",
+                 config: Optional[Dict[str, str]] = None, backend=None):
+        self.scanner_id = scanner_id
+        self.running = False
+        self.reader = None
+        self.connection = None
+        
+        # Event-basierte Erkennung (CardMonitor) mit Polling als Fallback
+        self.acquisition_mode = acquisition_mode if acquisition_mode in ACQUISITION_MODES else 'monitor'
+        self.card_events = queue.Queue()
+        self.card_monitor = None
+        self.card_observer = None
+        
+        # Offene Kartensitzungen pro Reader und APDU-Folge beim Auflegen
+        config = config or {}
+        self.debug = config.get('DEBUG_MODE', '0') == '1'
+        self.tag_sequence = parse_sequence(config.get('TAG_READ_SEQUENCE', DEFAULT_SEQUENCE))
+        self.card_sessions = {}
+        self.card_sessions_lock = threading.Lock()
+        
+        # Spulen-Record direkt vom Tag anzeigen, Server-Abgleich im Hintergrund
+        self.tag_records = config.get('TAG_RECORDS', '1') == '1'
+        # Aus per Default: beschrieben werden nur leere Tags oder solche mit eigenem Spulen-Record
+        self.tag_writeback = config.get('TAG_WRITEBACK', '0') == '1'
+        
+        # Entprellung: ein Lookup pro physischem Auflegen
+        self.presence = PresenceTracker(
+            config_float(config, 'PRESENCE_DEBOUNCE_MS', 800) / 1000,
+            config_float(config, 'TAP_COOLDOWN_MS', 2000) / 1000
+        )
+        
+        # Zeitspannen pro Stufe und Zähler (/metrics, periodische Zusammenfassung)
+        self.metrics = MetricsRegistry()
+        self.metrics_log_interval = config_float(config, 'METRICS_LOG_INTERVAL', 60)
+        self.metrics_reporter = None
+        
+        # Abnehmer für Scan-Ereignisse (z.B. Dienst-Modus mit SSE Stream)
+        self.events = EventBus()
+        self.scan_count = 0
+        self.started_at = time.time()
+        
+        # Töne laufen in eigenem Worker und blockieren die Hauptschleife nicht
+        self.audio = AudioFeedback(config.get('ENABLE_SOUND', '1') == '1')
+        
+        # PC/SC Reader oder Emulator (READER_BACKEND)
+        self.backend = backend if backend is not None else create_backend(config)
+        
+        # Mehrere Reader parallel (Reader-Name wird Teil der Scanner-ID)
+        self.multi_reader = config.get('MULTI_READER', '0') == '1'
+        self.reader_manager = None
+        
+        # Reader-Überwachung mit automatischer Wiederverbindung
+        self.reader_check_interval = config_float(config, 'READER_CHECK_INTERVAL', 2.0)
+        self.reader_max_backoff = config_float(config, 'READER_MAX_BACKOFF', 30.0)
+        self.supervisor = None
+        self.acquisition_active = False
+        self.reconnect_lock = threading.Lock()
+        
+        # Lookup Service über eine gemeinsame Keep-Alive Session
+        self.lookup_client = LookupClient(api_url, scanner_id, config, self.metrics)
+        
+        # Lokaler UID → Spule Cache vor dem Lookup Service
+        self.cache = LookupCache(
+            max_size=config_int(config, 'CACHE_SIZE', 512),
+            ttl=config_float(config, 'CACHE_TTL', 300.0),
+            negative_ttl=config_float(config, 'CACHE_NEGATIVE_TTL', 30.0)
+        )
+        
+        # Katalog-Spiegel: alle aktiven UID-Zuordnungen lokal (CATALOG_MIRROR=1)
+        self.catalog = None
+        self.catalog_syncer = None
+        self.catalog_sync_interval = config_float(config, 'CATALOG_SYNC_INTERVAL', 30.0)
+        if config.get('CATALOG_MIRROR', '0') == '1':
+            self.catalog = CatalogMirror(
+                self.lookup_client.fetch_catalog,
+                full_sync_interval=config_float(config, 'CATALOG_FULL_SYNC_INTERVAL', 3600.0),
+                max_age=config_float(config, 'CATALOG_MAX_AGE', 600.0)
+            )
+        
+        # Änderungs-Stream: Cache und Katalog bei Änderungen auf dem Server sofort anpassen
+        self.change_stream_enabled = config.get('CHANGE_STREAM', '0') == '1'
+        self.change_stream_timeout = config_float(config, 'CHANGE_STREAM_TIMEOUT', 45.0)
+        self.change_stream = None
+        
+        # Offline-Journal: jeder Scan wird vor dem Lookup festgehalten
+        self.journal_file = config.get('JOURNAL_FILE', 'scan_journal.db')
+        self.journal_max_entries = config_int(config, 'JOURNAL_MAX_ENTRIES', 10000)
+        # Nachgereicht wird per Batch-Lookup - Obergrenze wie MAX_BATCH_SIZE in nfc_lookup.php
+        self.journal_batch_size = max(1, min(config_int(config, 'JOURNAL_BATCH_SIZE', 25), MAX_BATCH_SIZE))
+        self.journal_flush_interval = config_float(config, 'JOURNAL_FLUSH_INTERVAL', 5.0)
+        self.journal = None
+        self.journal_flusher = None
+        
+        # Getrenntes Scan-Protokoll: Lookups nur lesend, Journal-Einträge gehen gesammelt an nfc_scan_log.php
+        self.scan_log_upload = config.get('SCAN_LOG_UPLOAD', '1') == '1'
+        self.scan_log_batch_size = max(1, min(config_int(config, 'SCAN_LOG_BATCH_SIZE', 100), MAX_SCAN_LOG_SIZE))
+        
+        # Batch-Modus: Lookups innerhalb eines Zeitfensters zu einem Request bündeln
+        self.batch_window = config_float(config, 'BATCH_WINDOW_MS', 0.0) / 1000.0
+        self.batch_max_size = max(1, min(config_int(config, 'BATCH_MAX_SIZE', 50), MAX_BATCH_SIZE))
+        # Länger wartet ein Scan nicht auf sein Batch-Ergebnis (Fenster plus zwei Request-Timeouts)
+        self.batch_timeout = self.batch_window + 2 * sum(self.lookup_client.http_timeout)
+        self.coalescer = None
+        
+        # Momentanwerte werden erst beim Export gelesen
+        self.metrics.gauge('journal_pending', lambda: self.journal.pending_count() if self.journal is not None else 0)
+        self.metrics.gauge('cache_size', lambda: self.cache.stats()['size'])
+        self.metrics.gauge('api_online', lambda: int(self.lookup_client.api_online))
+        self.metrics.gauge('change_stream_connected',
+                           lambda: int(self.change_stream is not None and self.change_stream.connected))
+        if self.catalog is not None:
+            self.metrics.gauge('catalog_size', lambda: len(self.catalog.entries))
+            self.metrics.gauge('catalog_staleness_seconds', lambda: self.catalog.staleness() or 0)
+        
+        # Circuit Breaker des Lookup Service: Journal nach Erholung nachreichen, offene Probe im Hintergrund
+        self.lookup_client.endpoints.add_listener(self.on_circuit_change)
+        self.circuit_prober = None
+    
+    def find_acr122u_reader(self) -> Optional[str]:
+        """ACR122U Reader finden"""
+        try:
+            available_readers = self.backend.readers()
+            
+            logger.info("🔍 Verfügbare Reader: %s", len(available_readers))
+            for i, reader in enumerate(available_readers):
+                logger.info("   %s. %s", i+1, reader)
+                
+                # ACR122U Reader identifizieren
+                reader_name = str(reader).lower()
+                if any(keyword in reader_name for keyword in ['acr122', 'acr 122', 'nfc']):
+                    logger.info("✅ ACR122U gefunden: %s", reader)
+                    return reader
+            
+            # Falls kein ACR122U spezifisch gefunden, ersten Reader verwenden
+            if available_readers:
+                logger.warning("⚠️  Kein ACR122U spezifisch gefunden, verwende ersten Reader: %s", available_readers[0])
+                return available_readers[0]
+            
+            logger.error("❌ Keine Smart Card Reader gefunden")
+            return None
+            
+        except Exception as e:
+            logger.error("❌ Fehler beim Suchen der Reader: %s", e)
+            return None
+    
+    def connect_reader(self) -> bool:
+        """Verbindung zum ACR122U herstellen"""
+        if self.multi_reader:
+            return self.connect_all_readers()
+        
+        try:
+            self.reader = self.find_acr122u_reader()
+            if not self.reader:
+                return False
+            
+            logger.info("🔗 Verbinde mit Reader: %s", self.reader)
+            return True
+            
+        except Exception as e:
+            logger.error("❌ Fehler beim Verbinden: %s", e)
+            return False
+    
+    def connect_all_readers(self) -> bool:
+        """Alle NFC Reader über den Reader-Manager betreiben"""
+        if self.reader_manager is None:
+            self.reader_manager = ReaderManager(self, POLL_INTERVAL)
+            count = self.reader_manager.start()
+        else:
+            count = len(self.reader_manager.reader_names())
+        
+        if count:
+            logger.info("🔗 %s Reader aktiv", count)
+            return True
+        
+        if self.reader_manager.reader_monitor is not None:
+            logger.info("⏳ Noch kein Reader angeschlossen - warte auf Hot-Plug...")
+            return True
+        
+        logger.error("❌ Keine Smart Card Reader gefunden")
+        return False
+    
+    def read_nfc_uid(self, reader=None) -> Optional[str]:
+        """NFC UID vom NTAG lesen (Polling-Fallback)"""
+        reader = reader or self.reader
+        if not reader:
+            return None
+        
+        try:
+            # Warten auf Karte (Card Request mit Timeout)
+            started = time.perf_counter()
+            cardservice = self.backend.wait_for_card(reader, timeout=1)
+            card_found = time.perf_counter()
+            
+            # Verbindung zur Karte herstellen
+            cardservice.connection.connect()
+            connected = time.perf_counter()
+            try:
+                nfc_uid = self.transmit_get_uid(cardservice.connection)
+            finally:
+                cardservice.connection.disconnect()
+            
+            if nfc_uid:
+                self.metrics.observe('card_wait', (card_found - started) * 1000)
+                self.metrics.observe('card_connect', (connected - card_found) * 1000)
+                self.metrics.observe('apdu', (time.perf_counter() - connected) * 1000, {'step': 'UID'})
+            return nfc_uid
+                
+        except CardRequestTimeoutException:
+            # Normal - kein Tag vorhanden
+            return None
+        except NoCardException:
+            # Normal - kein Tag vorhanden  
+            return None
+        except Exception as e:
+            if "sharing violation" not in str(e).lower() and "timeout" not in str(e).lower():
+                logger.error("❌ Fehler beim Lesen: %s", e)
+            return None
+    
+    def open_card_session(self, card) -> Optional[Dict[str, Any]]:
+        """Kartensitzung öffnen und APDU-Folge senden - liefert den Tag-Datensatz
+        
+        Die Verbindung bleibt offen, bis der Tag entfernt wird, damit weitere
+        APDUs (z.B. NDEF lesen/schreiben) ohne neuen Connect auskommen.
+        """
+        reader = str(card.reader)
+        self.close_card_session(reader)
+        
+        try:
+            session = CardSession(card.createConnection(), reader)
+            session.open()
+        except NoCardException:
+            # Tag wurde schon wieder entfernt
+            return None
+        except Exception as e:
+            if "sharing violation" not in str(e).lower():
+                logger.error("❌ Fehler beim Lesen: %s", e)
+            return None
+        
+        tag = session.run_sequence(self.tag_sequence)
+        
+        if tag['uid'] is None:
+            failed = tag['timings'][0]['sw'] if tag['timings'] else '----'
+            logger.error("❌ Fehler beim Lesen der UID: SW=%s", failed)
+            session.close()
+            return None
+        
+        # Spulen-Record über dieselbe Verbindung lesen
+        tag['record'] = None
+        if self.tag_records:
+            try:
+                tag['record'] = read_spool_record(session)
+            except Exception as e:
+                logger.warning("⚠️  Spulen-Record nicht lesbar: %s", e)
+        
+        with self.card_sessions_lock:
+            self.card_sessions[reader] = session
+        
+        self.metrics.observe('card_connect', session.connect_ms)
+        for timing in session.timings:
+            self.metrics.observe('apdu', timing['ms'], {'step': timing['step'].split(':')[0]})
+        
+        logger.debug("📱 NTAG UID: %s", tag['uid'])
+        if tag['tag_type']:
+            logger.debug("   Typ: %s", tag['tag_type'])
+        else:
+            self.detect_ntag_type(len(tag['uid']))
+        if tag['record']:
+            logger.debug("   💾 Spulen-Record auf Tag (Rev. %s)", tag['record']['revision'])
+        if self.debug:
+            logger.debug("   ⏱️  %s", session.timing_summary())
+        
+        return tag
+    
+    def tag_result(self, tag: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Lookup-Ergebnis aus dem Spulen-Record des Tags (None wenn keiner gelesen)"""
+        if not tag or not tag.get('record'):
+            return None
+        return tag_lookup_result(tag['record'], tag['uid'])
+    
+    def reconcile_tag(self, nfc_uid: str, reader: str, tag: Optional[Dict[str, Any]],
+                      result: Dict[str, Any]) -> Dict[str, Any]:
+        """Server-Ergebnis mit dem Spulen-Record vergleichen und den Tag bei Abweichung neu schreiben"""
+        reconcile = {'changed': [], 'written': False, 'blocked': None}
+        
+        # Ohne Server-Antwort bleibt der Tag maßgeblich
+        if not tag or 'error' in result or not result.get('found'):
+            return reconcile
+        
+        record = tag.get('record')
+        server_spool = result.get('spool', {})
+        if record is None:
+            reconcile['changed'] = ['record']
+        else:
+            reconcile['changed'] = changed_fields(record['spool'], server_spool)
+        
+        if not reconcile['changed'] or not self.tag_writeback:
+            return reconcile
+        
+        # Nur schreiben, solange derselbe Tag noch aufliegt
+        session = self.card_session(reader)
+        if session is None or session.uid != nfc_uid:
+            return reconcile
+        
+        revision = record['revision'] + 1 if record else 1
+        version = tag.get('version') or {}
+        try:
+            # Ohne eigenen Record nur auf leere, nicht gesperrte Tags schreiben
+            blocker = writeback_blocker(session, record is not None, version.get('user_bytes'))
+            if blocker is not None:
+                logger.debug("Spulen-Record nicht geschrieben: %s", blocker)
+                reconcile['blocked'] = blocker
+                return reconcile
+            reconcile['written'] = write_spool_record(session, server_spool, revision, version.get('user_bytes'))
+        except Exception as e:
+            logger.warning("⚠️  Spulen-Record nicht geschrieben: %s", e)
+        
+        if reconcile['written']:
+            tag['record'] = {'revision': revision, 'spool': dict(server_spool)}
+            logger.info("✏️  Spulen-Record auf Tag aktualisiert (Rev. %s: %s)",
+                        revision, ', '.join(reconcile['changed']))
+        
+        return reconcile
+    
+    def card_session(self, reader) -> Optional[CardSession]:
+        """Offene Kartensitzung eines Readers (None wenn kein Tag aufliegt)"""
+        with self.card_sessions_lock:
+            return self.card_sessions.get(str(reader))
+    
+    def close_card_session(self, reader):
+        """Kartensitzung eines Readers schließen"""
+        with self.card_sessions_lock:
+            session = self.card_sessions.pop(str(reader), None)
+        if session is not None:
+            session.close()
+    
+    def close_all_card_sessions(self):
+        with self.card_sessions_lock:
+            sessions = list(self.card_sessions.values())
+            self.card_sessions.clear()
+        for session in sessions:
+            session.close()
+    
+    def transmit_get_uid(self, connection) -> Optional[str]:
+        """GET_UID über eine bestehende Kartenverbindung senden"""
+        response, sw1, sw2 = connection.transmit(GET_UID)
+        
+        if sw1 == 0x90 and sw2 == 0x00:  # Success
+            uid = ''.join(f'{byte:02X}' for byte in response)
+            logger.debug("📱 NTAG UID: %s", uid)
+            
+            # Optional: NTAG Typ bestimmen
+            self.detect_ntag_type(len(uid))
+            return uid
+        
+        logger.error("❌ Fehler beim Lesen der UID: SW1=%02X SW2=%02X", sw1, sw2)
+        return None
+    
+    def is_own_reader(self, reader) -> bool:
+        """Prüfen ob ein Karten-Event von unserem Reader stammt"""
+        if self.reader_manager is not None:
+            return self.reader_manager.is_active(reader)
+        return self.reader is not None and str(reader) == str(self.reader)
+    
+    def scanner_id_for(self, reader=None) -> str:
+        """Scanner-ID eines Scans - im Multi-Reader Betrieb inklusive Reader-Name"""
+        if self.reader_manager is not None and reader:
+            return reader_scanner_id(self.scanner_id, reader)
+        return self.scanner_id
+    
+    def start_card_monitor(self) -> bool:
+        """CardMonitor starten - Insert/Remove Events landen in self.card_events"""
+        if self.card_observer is not None:
+            return True
+        
+        try:
+            # Alte Events eines vorherigen Laufs verwerfen
+            self.card_events = queue.Queue()
+            self.card_monitor = self.backend.card_monitor()
+            self.card_observer = NFCCardObserver(self)
+            self.card_monitor.addObserver(self.card_observer)
+            logger.info("⚡ Event-Modus aktiv (CardMonitor)")
+            return True
+        except Exception as e:
+            logger.warning("⚠️  CardMonitor nicht verfügbar: %s", e)
+            self.card_monitor = None
+            self.card_observer = None
+            return False
+    
+    def stop_card_monitor(self):
+        """CardMonitor Observer abmelden und offene Kartensitzungen schließen"""
+        if self.card_monitor is not None and self.card_observer is not None:
+            try:
+                self.card_monitor.deleteObserver(self.card_observer)
+            except Exception:
+                pass
+        self.card_monitor = None
+        self.card_observer = None
+        self.close_all_card_sessions()
+    
+    def wait_for_card_event(self, timeout: float = 0.5) -> Optional[Dict[str, Any]]:
+        """Auf das nächste Insert/Remove Event warten"""
+        try:
+            return self.card_events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+    
+    def start_acquisition(self) -> bool:
+        """Erfassung starten - liefert True wenn die Tag-Events über die Queue kommen"""
+        self.acquisition_active = True
+        use_events = False
+        
+        if self.acquisition_mode == 'monitor':
+            use_events = self.start_card_monitor()
+            if not use_events:
+                logger.warning("⚠️  Fallback auf Polling-Modus")
+        
+        if not use_events and self.reader_manager is not None:
+            # Ein Polling-Thread pro Reader speist die Event-Queue
+            self.reader_manager.start_polling()
+            use_events = True
+        
+        # Emulator: Tap-Skript abspielen, sobald die Erfassung läuft
+        self.backend.start()
+        return use_events
+    
+    def stop_acquisition(self):
+        """CardMonitor bzw. Polling-Threads beenden"""
+        self.acquisition_active = False
+        self.stop_card_monitor()
+        if self.reader_manager is not None:
+            self.reader_manager.stop_polling()
+    
+    def card_monitor_alive(self) -> bool:
+        """CardMonitor Thread läuft noch (beendet sich z.B. wenn der PC/SC Dienst wegfällt)"""
+        if self.card_monitor is None:
+            return True
+        try:
+            thread = getattr(self.card_monitor, 'rmthread', None)
+            return thread is None or thread.is_alive()
+        except Exception:
+            return False
+    
+    def reader_healthy(self) -> Tuple[bool, str]:
+        """Reader-Zustand prüfen - liefert (ok, Grund)"""
+        try:
+            available = [str(reader) for reader in self.backend.readers()]
+        except Exception as e:
+            return False, f"PC/SC Dienst nicht erreichbar ({e})"
+        
+        if self.reader_manager is not None:
+            if not available:
+                return False, "keine Reader angeschlossen"
+            if not self.reader_manager.monitor_alive():
+                return False, "Reader-Überwachung beendet"
+        elif self.reader is None:
+            return False, "kein Reader verbunden"
+        elif str(self.reader) not in available:
+            return False, "Reader abgezogen"
+        
+        if not self.card_monitor_alive():
+            return False, "CardMonitor beendet"
+        
+        return True, ''
+    
+    def reconnect_reader(self) -> bool:
+        """Reader neu aufbauen und eine laufende Erfassung neu starten"""
+        with self.reconnect_lock:
+            was_active = self.acquisition_active
+            old_readers = [str(self.reader)] if self.reader else []
+            
+            # Abgemeldeter letzter Observer setzt den CardMonitor von pyscard zurück
+            self.stop_card_monitor()
+            
+            if self.reader_manager is not None:
+                old_readers = self.reader_manager.reader_names()
+                self.reader_manager.stop()
+                self.reader_manager = None
+                connected = self.connect_all_readers() and bool(self.reader_manager.reader_names())
+            else:
+                self.reader = self.find_acr122u_reader()
+                connected = self.reader is not None
+            
+            if was_active:
+                self.start_acquisition()
+            
+            # Aufliegende Tags gelten nach dem Ausfall als entfernt
+            for reader in old_readers:
+                self.card_events.put({
+                    'type': 'removed',
+                    'uid': None,
+                    'reader': reader,
+                    'time': time.perf_counter()
+                })
+            
+            return connected
+    
+    def start_supervisor(self) -> bool:
+        """Reader-Überwachung starten"""
+        if not self.backend.available or self.supervisor is not None:
+            return self.supervisor is not None
+        
+        self.supervisor = ReaderSupervisor(self, self.reader_check_interval, self.reader_max_backoff)
+        self.supervisor.start()
+        return True
+    
+    def stop_supervisor(self):
+        if self.supervisor is not None:
+            self.supervisor.stop()
+            self.supervisor = None
+    
+    def reader_stats(self) -> Dict[str, Any]:
+        """Wiederverbindungen und Ausfallzeit des Readers"""
+        if self.supervisor is None:
+            return {'state': 'ok' if self.reader or self.reader_manager else 'down',
+                    'disconnects': 0, 'reconnects': 0,
+                    'current_downtime': 0.0, 'total_downtime': 0.0, 'last_error': None}
+        return self.supervisor.stats()
+    
+    def acquire(self, use_events: bool) -> Optional[Dict[str, Any]]:
+        """Nächstes Tag-Ereignis holen
+        
+        Liefert {'type': 'inserted'|'removed', 'uid': ..., 'reader': ...} oder
+        None wenn sich nichts getan hat. Im Polling-Modus wird jede Abfrage
+        ohne Tag als 'removed' gemeldet (wie bisher).
+        """
+        if use_events:
+            return self.wait_for_card_event(timeout=0.5)
+        
+        nfc_uid = self.read_nfc_uid()
+        return {
+            'type': 'inserted' if nfc_uid else 'removed',
+            'uid': nfc_uid,
+            'reader': str(self.reader),
+            'time': time.perf_counter()
+        }
+    
+    def acquire_taps(self, use_events: bool) -> List[Dict[str, Any]]:
+        """Bestätigte Tag-Ereignisse holen - entprellt, ohne Duplikate und Aussetzer
+        
+        Ein Aussetzer beim Polling (None bei Sharing Violation o.ä.) gilt erst
+        nach PRESENCE_DEBOUNCE_MS als Entfernen; dieselbe UID innerhalb von
+        TAP_COOLDOWN_MS erneut aufgelegt löst keinen weiteren Lookup aus.
+        """
+        return self.presence.update(self.acquire(use_events))
+    
+    def detect_ntag_type(self, uid_hex_length: int):
+        """NTAG Typ anhand UID-Länge bestimmen"""
+        uid_bytes = uid_hex_length // 2
+        
+        if uid_bytes == 7:
+            tag_type = "NTAG213 (180 bytes)"
+        elif uid_bytes == 10:
+            tag_type = "NTAG215/216 (540/944 bytes)"
+        else:
+            tag_type = f"Unbekannt ({uid_bytes} bytes UID)"
+            
+        logger.debug("   Typ: %s", tag_type)
+    
+    @property
+    def api_url_base(self) -> str:
+        return self.lookup_client.api_url_base
+    
+    @property
+    def api_online(self) -> bool:
+        return self.lookup_client.api_online
+    
+    def start_coalescer(self) -> bool:
+        """Request-Coalescing starten (nur wenn BATCH_WINDOW_MS > 0)"""
+        if self.coalescer is not None or self.batch_window <= 0:
+            return self.coalescer is not None
+        
+        self.coalescer = LookupCoalescer(self.lookup_client.lookup_batch, self.batch_window, self.batch_max_size)
+        self.coalescer.start()
+        logger.info("📦 Batch-Modus aktiv (%.0f ms Fenster, max. %s UIDs)",
+                    self.batch_window * 1000, self.batch_max_size)
+        return True
+    
+    def stop_coalescer(self):
+        if self.coalescer is not None:
+            self.coalescer.stop()
+            self.coalescer = None
+    
+    def lookup_spool(self, nfc_uid: str, scanned_at: Optional[int] = None,
+                     scanner_id: Optional[str] = None) -> Dict[str, Any]:
+        """Spule zur UID finden - zuerst im Katalog-Spiegel und Cache, sonst über den Lookup Service"""
+        if self.catalog is not None:
+            mirrored = self.catalog.lookup(nfc_uid)
+            if mirrored is not None:
+                self.metrics.inc('catalog_hits')
+                return dict(mirrored, from_mirror=True)
+            self.metrics.inc('catalog_misses')
+        
+        cached = self.cache.get(nfc_uid)
+        if cached is not None:
+            self.metrics.inc('cache_hits')
+            return dict(cached, cached=True)
+        self.metrics.inc('cache_misses')
+        
+        # Bei offenem Circuit Breaker scheitert der Lookup sofort statt nach dem Timeout
+        if self.coalescer is not None:
+            try:
+                result = self.coalescer.submit(nfc_uid, scanned_at, scanner_id).result(timeout=self.batch_timeout)
+            except FutureTimeoutError:
+                self.metrics.inc('lookup_errors', labels={'kind': 'timeout'})
+                result = {'error': 'Zeitüberschreitung beim Batch-Lookup'}
+        else:
+            result = self.lookup_client.lookup(nfc_uid, scanner_id, scanned_at)
+        
+        if 'error' in result and not 400 <= result.get('status', 0) < 500:
+            # Server nicht erreichbar: lieber den letzten bekannten Stand als gar nichts
+            stale = self.cache.get_stale(nfc_uid)
+            if stale is not None:
+                self.metrics.inc('cache_stale_hits')
+                return dict(stale, cached=True, stale=True)
+            return result
+        
+        self.cache.put(nfc_uid, result)
+        return result
+    
+    def process_scan(self, nfc_uid: str, reader=None) -> Dict[str, Any]:
+        """Scan verarbeiten: sofort ins Journal schreiben, dann Lookup"""
+        scanned_at = int(time.time())
+        scanner_id = self.scanner_id_for(reader)
+        journal_id = None
+        self.metrics.inc('scans')
+        
+        if self.journal is not None:
+            # Gehört bis zum Ende des Lookups diesem Scan - der Flusher lässt ihn aus
+            journal_id = self.journal.append(nfc_uid, scanner_id, scanned_at, claimed=True)
+        
+        try:
+            result = self.lookup_spool(nfc_uid, scanned_at, scanner_id)
+        except Exception:
+            if journal_id is not None:
+                self.journal.release([journal_id])
+            raise
+        
+        if journal_id is not None:
+            # Nur abschließen, wenn der Lookup Service den Scan selbst protokolliert hat -
+            # Antworten aus Cache oder Katalog-Spiegel reicht der Flusher nach
+            logged = not (result.get('cached') or result.get('from_mirror'))
+            if 'error' not in result and self.lookup_client.log_scans and logged:
+                self.journal.complete([journal_id])
+            else:
+                if 'error' in result:
+                    # Wird vom Flusher nachgereicht
+                    result['queued'] = True
+                # Sonst bleibt der Scan bis zum nächsten gesammelten Upload im Journal
+                self.journal.release([journal_id])
+        
+        return result
+    
+    def start_journal(self) -> bool:
+        """Offline-Journal öffnen und Flusher starten"""
+        if self.journal is not None or not self.journal_file:
+            return self.journal is not None
+        
+        try:
+            self.journal = ScanJournal(self.journal_file, self.journal_max_entries)
+        except Exception as e:
+            logger.warning("⚠️  Scan-Journal nicht verfügbar: %s", e)
+            return False
+        
+        pending = self.journal.pending_count()
+        if pending:
+            logger.info("📦 %s Scans im Journal warten auf Zustellung", pending)
+        
+        # Das Journal ist der lokale Puffer für das Scan-Protokoll
+        if self.scan_log_upload:
+            self.lookup_client.log_scans = False
+        
+        self.journal_flusher = JournalFlusher(
+            self.journal,
+            self.replay_scans,
+            interval=self.journal_flush_interval,
+            batch_size=self.scan_log_batch_size if self.scan_log_upload else self.journal_batch_size
+        )
+        self.journal_flusher.start()
+        return True
+    
+    def stop_journal(self):
+        """Flusher stoppen und Journal schließen"""
+        if self.journal_flusher is not None:
+            self.journal_flusher.stop()
+            self.journal_flusher = None
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        # Ohne lokalen Puffer muss der Lookup wieder protokollieren
+        self.lookup_client.log_scans = True
+    
+    def replay_scans(self, entries: List[Dict[str, Any]]) -> List[int]:
+        """Journal-Einträge als ein Batch nachreichen - liefert die IDs der zugestellten Scans"""
+        if not self.lookup_client.log_scans:
+            # Fire-and-forget: ein Request pro Batch, kein Lookup
+            uploaded = self.lookup_client.upload_scan_log(entries)
+            if uploaded or not self.lookup_client.log_scans:
+                return [entry['id'] for entry in entries[:uploaded]]
+            # Server ohne nfc_scan_log.php - wie bisher über Lookups nachreichen
+        
+        delivered = []
+        results = self.lookup_client.lookup_batch(entries)
+        
+        for entry, result in zip(entries, results):
+            if 'error' not in result:
+                self.cache.put(entry['nfc_uid'], result)
+            elif not 400 <= result.get('status', 0) < 500:
+                # Netzwerk- oder Serverfehler: später erneut versuchen
+                break
+            
+            # Zugestellt (oder vom Server dauerhaft abgelehnt)
+            delivered.append(entry['id'])
+        
+        return delivered
+    
+    def start_catalog(self) -> bool:
+        """Katalog im Hintergrund laden und periodisch abgleichen (nur mit CATALOG_MIRROR=1)"""
+        if self.catalog is None or self.catalog_syncer is not None:
+            return self.catalog_syncer is not None
+        
+        self.catalog_syncer = CatalogSyncer(
+            self.catalog,
+            interval=self.catalog_sync_interval,
+            on_sync=lambda catalog: self.metrics.observe('catalog_sync', catalog.last_sync_ms)
+        )
+        self.catalog_syncer.start()
+        return True
+    
+    def stop_catalog(self):
+        if self.catalog_syncer is not None:
+            self.catalog_syncer.stop()
+            self.catalog_syncer = None
+    
+    def start_change_stream(self) -> bool:
+        """Änderungs-Stream vom Server abonnieren (nur mit CHANGE_STREAM=1)"""
+        if not self.change_stream_enabled or self.change_stream is not None:
+            return self.change_stream is not None
+        
+        self.change_stream = ChangeStream(
+            self.lookup_client.open_change_stream,
+            self.apply_change,
+            headers={'User-Agent': f'ACR122U-Scanner/{self.scanner_id}'},
+            connect_timeout=self.lookup_client.http_timeout[0],
+            read_timeout=self.change_stream_timeout
+        )
+        self.change_stream.start()
+        return True
+    
+    def stop_change_stream(self):
+        if self.change_stream is not None:
+            self.change_stream.stop()
+            self.change_stream = None
+    
+    def apply_change(self, kind: str, data: Dict[str, Any]):
+        """Änderung vom Server in Cache und Katalog-Spiegel übernehmen"""
+        self.metrics.inc('change_events', labels={'kind': kind})
+        
+        if kind == 'spool':
+            entries = data.get('entries') or []
+            if data.get('active') and entries:
+                # Restgewicht, Standort usw. an Ort und Stelle ersetzen
+                self.cache.patch_spool(data['spool_id'], entries[0]['spool'])
+                if self.catalog is not None:
+                    self.catalog.update(entries)
+            else:
+                # Deaktiviert oder gelöscht
+                self.cache.invalidate_spool(data['spool_id'])
+                if self.catalog is not None:
+                    self.catalog.remove_spool(data['spool_id'])
+        
+        elif kind in ('bind', 'unbind'):
+            entry = data.get('entry') if kind == 'bind' else None
+            if entry is not None:
+                # Ersetzt auch ein negativ gecachtes "unbekannt" für frisch registrierte Tags
+                self.cache.put(data['nfc_uid'], {'found': True, 'spool': entry['spool'], 'nfc_info': entry['nfc_info']})
+                if self.catalog is not None:
+                    self.catalog.update([entry])
+            else:
+                self.cache.invalidate(data['nfc_uid'])
+                if self.catalog is not None:
+                    self.catalog.remove_uid(data['nfc_uid'])
+        
+        elif kind == 'reset':
+            # Server kennt die verpassten Ereignisse nicht mehr - alles neu laden
+            logger.info("🔄 Änderungs-Stream zurückgesetzt - Cache geleert")
+            self.cache.clear()
+            if self.catalog is not None:
+                self.catalog.invalidate()
+                if self.catalog_syncer is not None:
+                    self.catalog_syncer.wake()
+        
+        else:
+            return
+        
+        logger.debug("Änderung %s: Spule %s %s", kind, data.get('spool_id'), data.get('nfc_uid') or '')
+        if self.events:
+            self.emit('changed', {'kind': kind, 'spool_id': data.get('spool_id'), 'nfc_uid': data.get('nfc_uid')})
+    
+    def on_circuit_change(self, previous: str, state: str):
+        """Zustandswechsel des Circuit Breakers: Journal nach der Erholung sofort nachreichen"""
+        if state == CIRCUIT_CLOSED and self.journal_flusher is not None:
+            self.journal_flusher.wake()
+        if self.events:
+            self.emit('circuit', self.lookup_client.endpoints.stats())
+    
+    def start_breaker_probe(self) -> bool:
+        """Gesperrte und unbenutzte Endpunkte im Hintergrund prüfen - auch wenn gerade niemand scannt"""
+        if self.circuit_prober is not None:
+            return True
+        self.circuit_prober = CircuitProber(self.lookup_client.probe)
+        self.circuit_prober.start()
+        return True
+    
+    def stop_breaker_probe(self):
+        if self.circuit_prober is not None:
+            self.circuit_prober.stop()
+            self.circuit_prober = None
+    
+    def start_warm_up(self):
+        """Warm-up im Hintergrund starten"""
+        threading.Thread(target=self.lookup_client.warm_up, daemon=True).start()
+    
+    def print_cache_stats(self):
+        """Cache-Statistik ausgeben"""
+        stats = self.cache.stats()
+        if stats['hits'] or stats['misses']:
+            logger.info("📊 Cache: %s Treffer / %s Fehlgriffe (%.0f%%), %s Einträge",
+                        stats['hits'], stats['misses'], stats['hit_rate'] * 100, stats['size'])
+        if self.catalog is not None:
+            stats = self.catalog.stats()
+            logger.info("📊 Katalog: %s UIDs, %s Treffer / %s Fehlgriffe, %s Deltas, %s Fehler",
+                        stats['size'], stats['hits'], stats['misses'], stats['delta_syncs'], stats['sync_errors'])
+    
+    def start_metrics_reporter(self) -> bool:
+        """Periodische Zusammenfassung der Metriken starten (METRICS_LOG_INTERVAL=0 → aus)"""
+        if self.metrics_reporter is not None or self.metrics_log_interval <= 0:
+            return False
+        self.metrics_reporter = MetricsReporter(self.metrics, self.metrics_log_interval)
+        self.metrics_reporter.start()
+        return True
+    
+    def stop_metrics_reporter(self):
+        if self.metrics_reporter is not None:
+            self.metrics_reporter.stop()
+            self.metrics_reporter = None
+    
+    def close(self):
+        """Überwachung, Reader-Manager, Coalescer, Journal, Katalog, Stream, Probe, Töne und HTTP Verbindungen schließen"""
+        self.stop_supervisor()
+        if self.reader_manager is not None:
+            self.reader_manager.stop()
+            self.reader_manager = None
+        self.stop_coalescer()
+        self.stop_journal()
+        self.stop_catalog()
+        self.stop_change_stream()
+        self.stop_breaker_probe()
+        self.stop_metrics_reporter()
+        self.backend.stop()
+        self.audio.close()
+        self.lookup_client.close()
+    
+    def add_event_listener(self, listener):
+        """Abnehmer für Scan-Ereignisse registrieren: listener(art, daten)"""
+        self.events.subscribe(listener)
+    
+    def remove_event_listener(self, listener):
+        self.events.unsubscribe(listener)
+    
+    def emit(self, kind: str, data: Dict[str, Any]):
+        self.events.emit(kind, data)
+    
+    def status(self) -> Dict[str, Any]:
+        """Zustand für den Dienst-Modus (/status)"""
+        if self.reader_manager is not None:
+            readers = self.reader_manager.reader_names()
+        else:
+            readers = [str(self.reader)] if self.reader else []
+        
+        return {
+            'scanner_id': self.scanner_id,
+            'api_url': self.api_url_base,
+            'api_online': self.api_online,
+            'running': self.running,
+            'uptime': time.time() - self.started_at,
+            'scan_count': self.scan_count,
+            'readers': readers,
+            'reader_health': self.reader_stats(),
+            'presence': self.presence.stats(),
+            'cache': self.cache.stats(),
+            'catalog': self.catalog.stats() if self.catalog is not None else None,
+            'change_stream': self.change_stream.stats() if self.change_stream is not None else None,
+            'circuit': self.lookup_client.endpoints.stats(),
+            'journal_pending': self.journal.pending_count() if self.journal is not None else 0,
+            'scan_log': 'lookup' if self.lookup_client.log_scans else 'batched'
+        }
+    
+    def emit_result(self, nfc_uid: str, reader: str, scan_number: int, result: Dict[str, Any],
+                    detected_at: float, lookup_started: float):
+        """Ergebnis als Scan-Record protokollieren und als Ereignis mit Quelle und Zeiten (ms) weitergeben"""
+        now = time.perf_counter()
+        self.metrics.observe('scan_to_result', (now - detected_at) * 1000)
+        if not self.events and not scan_logger.isEnabledFor(logging.INFO):
+            return
+        
+        if result.get('from_tag'):
+            source = 'tag'
+        elif result.get('from_mirror'):
+            source = 'mirror'
+        elif result.get('stale'):
+            source = 'stale'
+        elif result.get('cached'):
+            source = 'cache'
+        elif result.get('queued'):
+            source = 'journal'
+        else:
+            source = 'api'
+        
+        timings = {
+            'lookup_ms': round((now - lookup_started) * 1000, 1),
+            'scan_to_result_ms': round((now - detected_at) * 1000, 1)
+        }
+        
+        # Strukturierter Scan-Record (nur Logdatei, JSON)
+        scan_logger.info("Scan %s: %s", nfc_uid, source, extra={'scan': {
+            'uid': nfc_uid,
+            'reader': reader,
+            'scanner_id': self.scanner_id_for(reader),
+            'number': scan_number,
+            'source': source,
+            'found': bool(result.get('found')),
+            'spool_id': result.get('spool', {}).get('id') if result.get('found') else None,
+            'error': result.get('error'),
+            'queued': bool(result.get('queued')),
+            **timings
+        }})
+        
+        if not self.events:
+            return
+        
+        self.emit('result', {
+            'uid': nfc_uid,
+            'reader': reader,
+            'number': scan_number,
+            'source': source,
+            'result': result,
+            'timings': timings
+        })
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Mehrere Lookup-Endpunkte (z.B. LAN-Server und Cloud)
+Pro Endpunkt werden Latenz und Fehlerquote als gleitender Mittelwert (EWMA)
+geführt; Requests gehen an den schnellsten Endpunkt mit geschlossenem
+Circuit Breaker. Das p95 der letzten Antworten bestimmt, wann ein
+abgesicherter zweiter Request (Hedging) gestartet wird.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Optional, Dict, Any, List, Callable
+
+from .circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+# Gewicht neuer Messwerte im gleitenden Mittel
+EWMA_ALPHA = 0.2
+# Fehlerquote verteuert einen Endpunkt: 50% Fehler → dreifache Latenz
+ERROR_PENALTY = 4.0
+# Antworten für das p95 - darunter kein Hedging
+LATENCY_SAMPLES = 100
+MIN_SAMPLES = 20
+
+
+def parse_api_urls(api_url: str) -> List[str]:
+    """API_URL kann eine kommagetrennte Liste sein - Reihenfolge = Vorzug bei Gleichstand"""
+    urls = [url.strip().rstrip('/') for url in api_url.split(',')]
+    return [url for url in urls if url]
+
+
+class Endpoint:
+    def __init__(self, base_url: str, breaker: CircuitBreaker):
+        self.base_url = base_url
+        self.breaker = breaker
+        self.lock = threading.Lock()
+        
+        self.latency_ms = None  # EWMA, None = noch nicht gemessen
+        self.error_rate = 0.0  # EWMA
+        self.samples = deque(maxlen=LATENCY_SAMPLES)
+        self.last_used = 0.0
+        
+        self.requests = 0
+        self.errors = 0
+    
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path}"
+    
+    def record(self, duration_ms: Optional[float], ok: bool):
+        """Antwort verbuchen - Server-Fehler und Netzwerkfehler gehen in Fehlerquote und Breaker
+        
+        duration_ms=None: Dauer nicht vergleichbar (z.B. voller Katalog) - nur Erfolg zählt
+        """
+        with self.lock:
+            self.requests += 1
+            self.last_used = time.monotonic()
+            self.error_rate += EWMA_ALPHA * ((0.0 if ok else 1.0) - self.error_rate)
+            if ok and duration_ms is not None:
+                self.samples.append(duration_ms)
+                if self.latency_ms is None:
+                    self.latency_ms = duration_ms
+                else:
+                    self.latency_ms += EWMA_ALPHA * (duration_ms - self.latency_ms)
+            elif not ok:
+                self.errors += 1
+        
+        if ok:
+            self.breaker.record_success(duration_ms or 0.0)
+        else:
+            self.breaker.record_failure()
+    
+    def score(self) -> float:
+        """Erwartete Antwortzeit inklusive Fehlerrisiko (kleiner ist besser)"""
+        return (self.latency_ms or 0.0) * (1 + ERROR_PENALTY * self.error_rate)
+    
+    def p95(self) -> Optional[float]:
+        """p95 der letzten Antworten - None solange zu wenige Messwerte"""
+        with self.lock:
+            if len(self.samples) < MIN_SAMPLES:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'url': self.base_url,
+            'latency_ms': round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            'p95_ms': self.p95(),
+            'error_rate': round(self.error_rate, 3),
+            'requests': self.requests,
+            'errors': self.errors,
+            'circuit': self.breaker.stats()
+        }
+
+
+class EndpointPool:
+    def __init__(self, urls: List[str], make_breaker: Callable[[str], CircuitBreaker]):
+        if not urls:
+            raise ValueError("Keine API_URL konfiguriert")
+        # Bei mehreren Endpunkten nennen die Meldungen des Breakers die URL
+        self.endpoints = [
+            Endpoint(url, make_breaker(url if len(urls) > 1 else 'Lookup Service'))
+            for url in urls
+        ]
+    
+    def __len__(self) -> int:
+        return len(self.endpoints)
+    
+    def ranked(self) -> List[Endpoint]:
+        """Gemessene Endpunkte nach Score, ungemessene danach in Konfigurationsreihenfolge"""
+        return sorted(
+            self.endpoints,
+            key=lambda endpoint: (endpoint.latency_ms is None, endpoint.score())
+        )
+    
+    def choose(self) -> List[Endpoint]:
+        """Endpunkte für einen Request, bester zuerst - leer wenn alle gesperrt sind"""
+        ranked = self.ranked()
+        healthy = [endpoint for endpoint in ranked if endpoint.breaker.state == CLOSED]
+        if healthy:
+            return healthy
+        
+        # Alle gesperrt: ein fälliger Endpunkt darf mit diesem Request seine Probe machen
+        for endpoint in ranked:
+            if endpoint.breaker.allow():
+                return [endpoint]
+        return []
+    
+    @property
+    def preferred(self) -> Endpoint:
+        """Aktuell bevorzugter Endpunkt (auch wenn gesperrt)"""
+        ranked = self.ranked()
+        for endpoint in ranked:
+            if endpoint.breaker.state == CLOSED:
+                return endpoint
+        return ranked[0]
+    
+    def due_for_probe(self, idle_interval: float) -> List[Endpoint]:
+        """Gesperrte Endpunkte nach Ablauf der Wartezeit; bei mehreren auch länger unbenutzte"""
+        now = time.monotonic()
+        due = []
+        for endpoint in self.endpoints:
+            if endpoint.breaker.state == OPEN:
+                if endpoint.breaker.retry_in() <= 0:
+                    due.append(endpoint)
+            elif (len(self.endpoints) > 1 and endpoint.breaker.state == CLOSED
+                  and now - endpoint.last_used >= idle_interval):
+                # Sonst bleibt die Messung eines gerade nicht genutzten Endpunkts stehen
+                due.append(endpoint)
+        return due
+    
+    @property
+    def state(self) -> str:
+        """Gesamtzustand: erreichbar solange irgendein Endpunkt geschlossen ist"""
+        states = {endpoint.breaker.state for endpoint in self.endpoints}
+        if CLOSED in states:
+            return CLOSED
+        if HALF_OPEN in states:
+            return HALF_OPEN
+        return OPEN
+    
+    def retry_in(self) -> float:
+        """Sekunden bis zur nächsten Probe eines Endpunkts"""
+        return min(endpoint.breaker.retry_in() for endpoint in self.endpoints)
+    
+    def add_listener(self, listener: Callable[[str, str], None]):
+        """Abnehmer für Zustandswechsel aller Endpunkte"""
+        for endpoint in self.endpoints:
+            endpoint.breaker.add_listener(listener)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'retry_in': round(self.retry_in(), 1),
+            'preferred': self.preferred.base_url,
+            'endpoints': [endpoint.stats() for endpoint in self.endpoints]
+        }
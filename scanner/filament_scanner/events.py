@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Ereignis-Bus des Scanners
+Scan-Ereignisse (scan, result, reconciled, removed) an beliebige Abnehmer
+verteilen - Dienst-Modus, Benchmarks oder eigene Erweiterungen.
+"""
+
+import logging
+import threading
+from typing import Dict, Any, Callable
+
+logger = logging.getLogger(__name__)
+
+Listener = Callable[[str, Dict[str, Any]], None]
+
+
+class EventBus:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.listeners = []
+    
+    def subscribe(self, listener: Listener):
+        """Abnehmer registrieren: listener(art, daten)"""
+        with self.lock:
+            self.listeners.append(listener)
+    
+    def unsubscribe(self, listener: Listener):
+        with self.lock:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
+    
+    def __bool__(self) -> bool:
+        return bool(self.listeners)
+    
+    def emit(self, kind: str, data: Dict[str, Any]):
+        """Ereignis an alle Abnehmer weitergeben - Fehler dort stören den Scan nicht"""
+        with self.lock:
+            listeners = list(self.listeners)
+        
+        for listener in listeners:
+            try:
+                listener(kind, data)
+            except Exception as e:
+                logger.warning("⚠️  Ereignis-Abnehmer fehlgeschlagen: %s", e)
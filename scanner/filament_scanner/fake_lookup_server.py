@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Lokaler Ersatz für nfc_lookup.php, nfc_scan_log.php, nfc_catalog.php und nfc_events.php
+Beantwortet Einzel- und Batch-Lookups im Format des echten Endpoints mit
+einstellbarer Latenz und Fehlerrate - für Tests und Benchmarks ohne
+Webserver und Datenbank. UIDs mit Präfix FF sind unbekannt; der Katalog
+enthält catalog_size zugeordnete UIDs (04000001, 04000002, ...).
+Änderungen über change_catalog() und update_spool() erscheinen im Stream.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qsl
+from typing import Optional, Dict, Any
+
+# Wie MAX_BATCH_SIZE in nfc_lookup.php und MAX_UPLOAD_SIZE in nfc_scan_log.php
+MAX_BATCH_SIZE = 200
+MAX_UPLOAD_SIZE = 500
+
+# Wie HEARTBEAT_INTERVAL und STREAM_DURATION in nfc_events.php
+HEARTBEAT_INTERVAL = 15
+STREAM_DURATION = 55
+
+UNKNOWN_PREFIX = 'FF'
+
+MATERIALS = ['PLA', 'PETG', 'ABS', 'ASA', 'TPU', 'PLA+']
+COLORS = ['Schwarz', 'Weiß', 'Rot', 'Blau', 'Grau', 'Orange']
+
+
+def fake_spool(nfc_uid: str) -> Optional[Dict[str, Any]]:
+    """Deterministische Spule zur UID (None für unbekannte UIDs)"""
+    nfc_uid = nfc_uid.upper()
+    if nfc_uid.startswith(UNKNOWN_PREFIX):
+        return None
+    
+    seed = zlib.crc32(nfc_uid.encode('ascii'))
+    spool_id = seed % 100000 + 1
+    return {
+        'id': spool_id,
+        'uuid': f"{seed:08x}-0000-4000-8000-{spool_id:012x}",
+        'material': MATERIALS[seed % len(MATERIALS)],
+        'filament_type': MATERIALS[seed % len(MATERIALS)],
+        'color_name': COLORS[(seed >> 8) % len(COLORS)],
+        'total_weight': 1000.0,
+        'remaining_weight': float((seed >> 4) % 1000),
+        'location': f"Regal {(seed >> 12) % 8 + 1}",
+        'created_at': '2024-01-01 00:00:00'
+    }
+
+
+def catalog_uid(index: int) -> str:
+    """UID Nummer index (ab 1) im simulierten Katalog"""
+    return f"04{index:06X}"
+
+
+def lookup_result(scan: Dict[str, Any], scanner_id: str) -> Dict[str, Any]:
+    """Antwort für einen Scan wie buildLookupResult() in nfc_lookup.php"""
+    nfc_uid = str(scan['nfc_uid']).strip()
+    timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(scan.get('timestamp') or time.time()))
+    spool = fake_spool(nfc_uid)
+    
+    if spool is None:
+        return {
+            'found': False,
+            'message': 'no_spool_found',
+            'nfc_uid': nfc_uid,
+            'scanner_id': scan.get('scanner_id') or scanner_id,
+            'timestamp': timestamp
+        }
+    
+    return {
+        'found': True,
+        'spool': spool,
+        'nfc_info': {
+            'nfc_uid': nfc_uid.upper(),
+            'tag_type': 'NTAG213',
+            'tag_position': 'core',
+            'is_primary': True
+        },
+        'scanner_id': scan.get('scanner_id') or scanner_id,
+        'timestamp': timestamp
+    }
+
+
+class FakeLookupHandler(BaseHTTPRequestHandler):
+    # Keep-Alive wie hinter einem echten Webserver
+    protocol_version = 'HTTP/1.1'
+    server_version = "FakeLookup/1.0"
+    
+    def do_OPTIONS(self):
+        self.send_json(None, 200)
+    
+    def do_GET(self):
+        server = self.server.lookup
+        path, _, query = self.path.partition('?')
+        if path == '/nfc_events.php':
+            return self.stream_events(server)
+        
+        params = dict(parse_qsl(query))
+        if path == '/nfc_lookup.php':
+            # Lesender Lookup ohne Protokoll
+            cpu_started = time.thread_time()
+            server.wait()
+            status, body = server.handle({'nfc_uid': params.get('nfc_uid'),
+                                          'scanner_id': params.get('scanner_id'), 'log': False})
+            server.count_cpu(time.thread_time() - cpu_started)
+            return self.send_json(body, status)
+        if path != '/nfc_catalog.php':
+            return self.send_json({'error': 'not_found'}, 404)
+        
+        server.wait()
+        status, body = server.handle_catalog(params.get('since'))
+        self.send_json(body, status)
+    
+    def do_POST(self):
+        server = self.server.lookup
+        cpu_started = time.thread_time()
+        
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            data = json.loads(self.rfile.read(length) or b'null')
+        except ValueError:
+            data = None
+        
+        path = self.path.split('?', 1)[0]
+        if path not in ('/nfc_lookup.php', '/nfc_scan_log.php'):
+            return self.send_json({'error': 'not_found'}, 404)
+        
+        server.wait()
+        if path == '/nfc_scan_log.php' and not server.scan_log:
+            return self.send_json({'error': 'Method not allowed'}, 405)
+        if path == '/nfc_scan_log.php':
+            status, body = server.handle_scan_log(data)
+        else:
+            status, body = server.handle(data)
+        server.count_cpu(time.thread_time() - cpu_started)
+        self.send_json(body, status)
+    
+    def stream_events(self, server: 'FakeLookupServer'):
+        """Änderungen als Server-Sent Events (chunked wie PHP mit flush())"""
+        last_event_id = self.headers.get('Last-Event-ID', '')
+        last_event_id = int(last_event_id) if last_event_id.isdigit() else None
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        
+        try:
+            for chunk in server.iter_events(last_event_id):
+                data = chunk.encode('utf-8')
+                self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except OSError:
+            pass  # Client hat die Verbindung beendet
+        self.close_connection = True
+    
+    def send_json(self, data: Optional[Dict[str, Any]], status: int = 200):
+        body = json.dumps(data).encode('utf-8') if data is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeLookupServer:
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency_ms: float = 20, jitter_ms: float = 5,
+                 error_rate: float = 0.0, seed: Optional[int] = None, catalog_size: int = 0,
+                 stream_duration: float = STREAM_DURATION):
+        self.host = host
+        self.port = port
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.scan_log = True  # False: Server ohne nfc_scan_log.php (ältere Installation)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.httpd = None
+        self.thread = None
+        
+        # Katalog: UID -> [Version der letzten Änderung, aktiv]; der Cursor ist die Version
+        self.catalog_version = 1
+        self.catalog = {catalog_uid(index): [1, True] for index in range(1, catalog_size + 1)}
+        self.spool_changes = {}  # UID -> geänderte Spulen-Felder
+        
+        # Änderungs-Ereignisse wie nfc_change_events: {'id', 'event', 'data'}
+        self.change_events = []
+        self.changed = threading.Condition(self.lock)
+        self.stream_duration = stream_duration
+        
+        self.requests = 0
+        self.scans = 0
+        self.logged = 0  # Zeilen in nfc_scan_log (Lookup oder gesammelter Upload)
+        self.uploads = 0
+        self.batches = 0
+        self.errors = 0
+        self.cpu_time = 0.0  # CPU der Handler (wird beim Benchmark abgezogen)
+    
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+    
+    def start(self) -> 'FakeLookupServer':
+        self.httpd = ThreadingHTTPServer((self.host, self.port), FakeLookupHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.lookup = self
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True, name="FakeLookupServer")
+        self.thread.start()
+        return self
+    
+    def stop(self):
+        with self.changed:
+            self.changed.notify_all()
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+    
+    def wait(self):
+        """Datenbank-/Netzwerklatenz simulieren"""
+        with self.lock:
+            delay = self.latency + self.rng.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+    
+    def handle(self, data: Any):
+        """Request wie nfc_lookup.php beantworten - liefert (Status, Body)"""
+        with self.lock:
+            self.requests += 1
+            fail = self.rng.random() < self.error_rate
+        
+        if fail:
+            with self.lock:
+                self.errors += 1
+            return 500, {'error': 'Database error', 'message': 'simulierter Fehler'}
+        
+        if isinstance(data, dict) and 'scans' in data:
+            scans = data['scans']
+            if not isinstance(scans, list) or not scans:
+                return 400, {'error': 'scans must be a non-empty array'}
+            if len(scans) > MAX_BATCH_SIZE:
+                return 400, {'error': f'Too many scans in batch (max {MAX_BATCH_SIZE})'}
+        elif isinstance(data, dict) and data.get('nfc_uid'):
+            scans = [data]
+        else:
+            return 400, {'error': 'nfc_uid is required'}
+        
+        for index, scan in enumerate(scans):
+            if not isinstance(scan, dict) or not isinstance(scan.get('nfc_uid'), str) or not scan['nfc_uid']:
+                return 400, {'error': f'nfc_uid is required (scan {index})'}
+        
+        scanner_id = data.get('scanner_id') or 'unknown'
+        results = [self.with_changes(lookup_result(scan, scanner_id)) for scan in scans]
+        
+        with self.lock:
+            self.scans += len(scans)
+            if 'scans' in data:
+                self.batches += 1
+            if data.get('log') is not False:
+                self.logged += len(scans)
+        
+        return 200, {'results': results} if 'scans' in data else results[0]
+    
+    def handle_scan_log(self, data: Any):
+        """Gesammelte Scans wie nfc_scan_log.php annehmen - liefert (Status, Body)"""
+        with self.lock:
+            self.requests += 1
+            fail = self.rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        if fail:
+            return 500, {'error': 'Database error', 'message': 'simulierter Fehler'}
+        
+        scans = data.get('scans') if isinstance(data, dict) else None
+        if not isinstance(scans, list) or not scans:
+            return 400, {'error': 'scans must be a non-empty array'}
+        if len(scans) > MAX_UPLOAD_SIZE:
+            return 400, {'error': f'Too many scans in upload (max {MAX_UPLOAD_SIZE})'}
+        for index, scan in enumerate(scans):
+            if not isinstance(scan, dict) or not isinstance(scan.get('nfc_uid'), str) or not scan['nfc_uid']:
+                return 400, {'error': f'nfc_uid is required (scan {index})'}
+        
+        with self.lock:
+            self.logged += len(scans)
+            self.uploads += 1
+        return 200, {'accepted': len(scans)}
+    
+    def handle_catalog(self, since: Optional[str]):
+        """Katalog wie nfc_catalog.php - komplett oder Änderungen seit dem Cursor"""
+        with self.lock:
+            self.requests += 1
+            if since is not None and not since.isdigit():
+                return 400, {'error': 'since must be a cursor returned by this endpoint'}
+            
+            cursor = self.catalog_version
+            entries = []
+            for nfc_uid, (version, active) in self.catalog.items():
+                if since is None and not active or since is not None and version < int(since):
+                    continue
+                entries.append(self.catalog_entry(nfc_uid, active))
+            total = sum(1 for _, active in self.catalog.values() if active)
+        
+        return 200, {'full': since is None, 'cursor': str(cursor + 1), 'total': total, 'entries': entries}
+    
+    def with_changes(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Geänderte Spulen-Felder in ein Lookup-Ergebnis übernehmen"""
+        changes = self.spool_changes.get(result.get('nfc_info', {}).get('nfc_uid'))
+        if changes:
+            result['spool'] = dict(result['spool'], **changes)
+        return result
+    
+    def catalog_entry(self, nfc_uid: str, active: bool = True) -> Dict[str, Any]:
+        """Katalogzeile wie nfc_catalog.php - Aufrufer hält self.lock"""
+        result = self.with_changes(lookup_result({'nfc_uid': nfc_uid}, 'catalog'))
+        return {'nfc_uid': nfc_uid, 'active': active, 'spool': result['spool'], 'nfc_info': result['nfc_info']}
+    
+    def publish(self, kind: str, data: Dict[str, Any]):
+        """Ereignis für nfc_events.php festhalten - Aufrufer hält self.lock"""
+        self.change_events.append({'id': len(self.change_events) + 1, 'event': kind, 'data': data})
+        self.changed.notify_all()
+    
+    def change_catalog(self, nfc_uid: str, active: Optional[bool] = True):
+        """UID zuordnen (True), Spule deaktivieren (False) oder Zuordnung löschen (None)"""
+        nfc_uid = nfc_uid.upper()
+        spool_id = fake_spool(nfc_uid)['id']
+        with self.lock:
+            self.catalog_version += 1
+            if active is None:
+                self.catalog.pop(nfc_uid, None)
+                self.publish('unbind', {'spool_id': spool_id, 'nfc_uid': nfc_uid})
+            else:
+                self.catalog[nfc_uid] = [self.catalog_version, active]
+                if active:
+                    self.publish('bind', {'spool_id': spool_id, 'nfc_uid': nfc_uid,
+                                          'entry': self.catalog_entry(nfc_uid)})
+                else:
+                    self.publish('spool', {'spool_id': spool_id, 'active': False, 'entries': []})
+    
+    def update_spool(self, nfc_uid: str, **fields):
+        """Spulen-Felder ändern (z.B. remaining_weight) wie in der Web-App"""
+        nfc_uid = nfc_uid.upper()
+        with self.lock:
+            self.catalog_version += 1
+            self.spool_changes[nfc_uid] = dict(self.spool_changes.get(nfc_uid, {}), **fields)
+            active = self.catalog.get(nfc_uid, [0, True])[1]
+            self.catalog[nfc_uid] = [self.catalog_version, active]
+            entry = self.catalog_entry(nfc_uid, active)
+            self.publish('spool', {'spool_id': entry['spool']['id'], 'active': active, 'entries': [entry]})
+    
+    def iter_events(self, last_event_id: Optional[int]):
+        """SSE Text für einen Stream - endet nach stream_duration oder beim Stoppen"""
+        started = time.monotonic()
+        with self.lock:
+            latest = len(self.change_events)
+        
+        if last_event_id is None:
+            last_event_id = latest
+        elif last_event_id > latest:
+            last_event_id = latest
+            yield self.format_event(last_event_id, 'reset', {'reason': 'events_unavailable'})
+        
+        yield "retry: 2000\n" + self.format_event(last_event_id, 'ready', {'last_event_id': last_event_id})
+        last_sent = time.monotonic()
+        
+        while self.httpd is not None and time.monotonic() - started < self.stream_duration:
+            with self.changed:
+                if len(self.change_events) <= last_event_id:
+                    self.changed.wait(0.5)
+                pending = self.change_events[last_event_id:]
+            
+            for event in pending:
+                last_event_id = event['id']
+                yield self.format_event(event['id'], event['event'], event['data'])
+                last_sent = time.monotonic()
+            
+            if time.monotonic() - last_sent >= HEARTBEAT_INTERVAL:
+                yield ": ping\n\n"
+                last_sent = time.monotonic()
+    
+    @staticmethod
+    def format_event(event_id: int, kind: str, data: Dict[str, Any]) -> str:
+        return f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(data)}\n\n"
+    
+    def count_cpu(self, seconds: float):
+        with self.lock:
+            self.cpu_time += seconds
+    
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'scans': self.scans,
+                'logged': self.logged,
+                'uploads': self.uploads,
+                'batches': self.batches,
+                'errors': self.errors,
+                'cpu_time': self.cpu_time
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lokaler Ersatz für nfc_lookup.php")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=20, help="Antwortzeit in ms")
+    parser.add_argument('--jitter', type=float, default=5, help="Schwankung der Antwortzeit in ms")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Anteil der Requests mit HTTP 500")
+    parser.add_argument('--catalog-size', type=int, default=0, help="Zugeordnete UIDs für nfc_catalog.php")
+    args = parser.parse_args()
+    
+    server = FakeLookupServer(args.host, args.port, args.latency, args.jitter, args.error_rate,
+                              catalog_size=args.catalog_size).start()
+    print(f"🧪 Lookup-Ersatz läuft: {server.url}/nfc_lookup.php (API_URL={server.url})")
+    print("   UIDs mit Präfix FF sind unbekannt - Ctrl+C zum Beenden")
+    
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stats = server.stats()
+        print(f"\n📊 {stats['requests']} Requests, {stats['scans']} Scans, {stats['batches']} Batches, "
+              f"{stats['errors']} Fehler")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Logging für CLI und GUI
+Die Scan-Schleife schreibt nur in eine Queue; ein Listener-Thread bedient
+Konsole und rotierende Logdatei (eine JSON-Zeile pro Eintrag). Gleiche
+Warnungen und Fehler werden pro Zeitfenster begrenzt und zusammengefasst.
+"""
+
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from typing import Optional, Dict, Any, List, Tuple
+
+from .config import config_int, config_float
+
+LOGGER_NAME = 'filament_scanner'
+
+# Scan-Records landen nur in der Datei, die Konsole zeigt das Ergebnis selbst
+SCAN_LOGGER_NAME = 'filament_scanner.scans'
+
+# Obergrenze für Zählerfenster mit wechselnden Meldungstexten
+MAX_RATE_BUCKETS = 1000
+
+
+class JsonFormatter(logging.Formatter):
+    """Eine JSON-Zeile pro Eintrag - Scan-Records mit ihren Feldern unter 'scan'"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 3),
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'msg': record.getMessage()
+        }
+        scan = getattr(record, 'scan', None)
+        if scan is not None:
+            entry['scan'] = scan
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """Gleiche Meldung (Vorlage) höchstens burst-mal pro Fenster durchlassen, den Rest zählen"""
+    
+    def __init__(self, burst: int = 5, window: float = 10.0, min_level: int = logging.WARNING):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.min_level = min_level
+        self.lock = threading.Lock()
+        self.buckets = {}  # (Logger, Level, Vorlage) -> [Fensterbeginn, durchgelassen, unterdrückt]
+        self.suppressed_total = 0
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.min_level or self.burst <= 0:
+            return True
+        
+        # Vorlage statt fertigem Text: "Fehler beim Lesen: %s" zählt für alle Ausnahmen gemeinsam
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None or now - bucket[0] >= self.window:
+                suppressed = bucket[2] if bucket is not None else 0
+                if bucket is None and len(self.buckets) >= MAX_RATE_BUCKETS:
+                    self.prune(now)
+                self.buckets[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                    record.msg = f"{record.msg} (+{suppressed}× in {self.window:g}s unterdrückt)"
+                return True
+            
+            if bucket[1] < self.burst:
+                bucket[1] += 1
+                return True
+            
+            bucket[2] += 1
+            self.suppressed_total += 1
+            return False
+    
+    def prune(self, now: float):
+        """Abgelaufene Fenster ohne unterdrückte Meldungen vergessen"""
+        for key in [key for key, bucket in self.buckets.items() if now - bucket[0] >= self.window and not bucket[2]]:
+            del self.buckets[key]
+    
+    def drain(self) -> List[Tuple[str, int, str, int]]:
+        """Noch nicht gemeldete Unterdrückungen abholen: (Logger, Level, Vorlage, Anzahl)"""
+        with self.lock:
+            pending = [(name, level, msg, bucket[2]) for (name, level, msg), bucket in self.buckets.items() if bucket[2]]
+            for bucket in self.buckets.values():
+                bucket[2] = 0
+        return pending
+
+
+class LogPipeline:
+    def __init__(self, level: int = logging.INFO, console: bool = True, log_file: Optional[str] = None,
+                 max_bytes: int = 1048576, backup_count: int = 3, burst: int = 5, window: float = 10.0):
+        self.level = level
+        self.console = console
+        self.log_file = log_file
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        
+        self.queue = queue.Queue()
+        self.rate_filter = RateLimitFilter(burst, window)
+        self.queue_handler = None
+        self.listener = None
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, str], console: bool = True) -> 'LogPipeline':
+        """Pipeline laut Konfiguration - DEBUG_MODE=1 schaltet Debug-Meldungen ein"""
+        return cls(
+            level=logging.DEBUG if config.get('DEBUG_MODE', '0') == '1' else logging.INFO,
+            console=console,
+            log_file=config.get('LOG_FILE', 'scanner.log').strip() or None,
+            max_bytes=max(0, config_int(config, 'LOG_MAX_BYTES', 1048576)),
+            backup_count=max(0, config_int(config, 'LOG_BACKUP_COUNT', 3)),
+            burst=config_int(config, 'LOG_RATE_LIMIT', 5),
+            window=config_float(config, 'LOG_RATE_WINDOW', 10.0)
+        )
+    
+    def handlers(self) -> List[logging.Handler]:
+        handlers = []
+        
+        # Ohne Konsole (z.B. --windowed EXE) ist sys.stdout None
+        if self.console and sys.stdout is not None:
+            console = logging.StreamHandler(sys.stdout)
+            console.setFormatter(logging.Formatter('%(message)s'))
+            console.addFilter(lambda record: not hasattr(record, 'scan'))
+            handlers.append(console)
+        
+        if self.log_file:
+            try:
+                file_handler = logging.handlers.RotatingFileHandler(
+                    self.log_file,
+                    maxBytes=self.max_bytes,
+                    backupCount=self.backup_count,
+                    encoding='utf-8',
+                    delay=True
+                )
+                file_handler.setFormatter(JsonFormatter())
+                # Leerzeilen gliedern nur die Konsole
+                file_handler.addFilter(lambda record: record.msg != '')
+                handlers.append(file_handler)
+            except OSError as e:
+                print(f"⚠️  Logdatei {self.log_file} nicht verfügbar: {e}")
+        
+        return handlers
+    
+    def start(self) -> bool:
+        """Queue-Handler am Paket-Logger anmelden und Listener-Thread starten"""
+        if self.listener is not None:
+            return False
+        
+        self.queue_handler = logging.handlers.QueueHandler(self.queue)
+        self.queue_handler.addFilter(self.rate_filter)
+        
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.setLevel(self.level)
+        logger.addHandler(self.queue_handler)
+        logger.propagate = False
+        
+        self.listener = logging.handlers.QueueListener(self.queue, *self.handlers(), respect_handler_level=True)
+        self.listener.start()
+        return True
+    
+    def flush(self):
+        """Warten, bis alle Einträge der Queue geschrieben sind"""
+        if self.listener is not None:
+            self.queue.join()
+    
+    def stop(self):
+        """Unterdrückte Meldungen zusammenfassen, Queue leeren und Handler schließen"""
+        if self.listener is None:
+            return
+        
+        logger = logging.getLogger(LOGGER_NAME)
+        for name, level, msg, count in self.rate_filter.drain():
+            logger.log(level, "%s meldete %d× erneut: %s", name, count, msg)
+        
+        logger.removeHandler(self.queue_handler)
+        logger.propagate = True
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+        self.listener = None
+        self.queue_handler = None
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'queued': self.queue.qsize(),
+            'suppressed': self.rate_filter.suppressed_total,
+            'log_file': self.log_file
+        }
+
+
+def setup_logging(config: Dict[str, str], console: bool = True) -> LogPipeline:
+    """Logging für eine Oberfläche einrichten - stop() beim Beenden aufrufen"""
+    pipeline = LogPipeline.from_config(config, console)
+    pipeline.start()
+    return pipeline
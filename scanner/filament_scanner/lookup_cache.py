@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Lokaler Lookup-Cache für NFC UID → Spule
+LRU-Verdrängung, TTL pro Eintrag und Negativ-Caching für unbekannte Tags.
+Abgelaufene Einträge bleiben bis zur Verdrängung als Notreserve erhalten,
+falls der Lookup Service ausfällt.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+
+def normalize_uid(nfc_uid: str) -> str:
+    """UID vereinheitlichen: Großbuchstaben ohne Leer- und Trennzeichen"""
+    return ''.join(ch for ch in nfc_uid.strip().upper() if ch not in ' :-')
+
+
+class LookupCache:
+    def __init__(self, max_size: int = 512, ttl: float = 300.0, negative_ttl: float = 30.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.entries = OrderedDict()  # uid -> (expires_at, result)
+        self.lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+    
+    def get(self, nfc_uid: str) -> Optional[Dict[str, Any]]:
+        """Gecachtes Lookup-Ergebnis holen (None bei Fehlgriff oder abgelaufen)"""
+        if not self.enabled:
+            return None
+        
+        key = normalize_uid(nfc_uid)
+        now = time.monotonic()
+        
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            expires_at, result = entry
+            if expires_at <= now:
+                # Nicht löschen - get_stale() braucht ihn noch, falls der Server ausfällt
+                self.misses += 1
+                return None
+            
+            # Als zuletzt benutzt markieren
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return result
+    
+    def put(self, nfc_uid: str, result: Dict[str, Any]):
+        """Lookup-Ergebnis speichern - Fehlerantworten werden nie gecacht"""
+        if not self.enabled or 'error' in result:
+            return
+        
+        ttl = self.ttl if result.get('found') else self.negative_ttl
+        if ttl <= 0:
+            return
+        
+        key = normalize_uid(nfc_uid)
+        
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, result)
+            self.entries.move_to_end(key)
+            
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+    
+    def get_stale(self, nfc_uid: str) -> Optional[Dict[str, Any]]:
+        """Gefundene Spule auch nach Ablauf der TTL liefern (nur wenn der Server nicht erreichbar ist)"""
+        if not self.enabled:
+            return None
+        
+        with self.lock:
+            entry = self.entries.get(normalize_uid(nfc_uid))
+            if entry is None or not entry[1].get('found'):
+                return None
+            return entry[1]
+    
+    def invalidate(self, nfc_uid: str):
+        """Einzelnen Eintrag entfernen"""
+        with self.lock:
+            self.entries.pop(normalize_uid(nfc_uid), None)
+    
+    def patch_spool(self, spool_id, spool: Dict[str, Any]) -> int:
+        """Spulen-Daten aller Einträge dieser Spule ersetzen (Restlaufzeit bleibt) - liefert die Anzahl"""
+        patched = 0
+        with self.lock:
+            for key, (expires_at, result) in self.entries.items():
+                if result.get('found') and str(result.get('spool', {}).get('id')) == str(spool_id):
+                    self.entries[key] = (expires_at, dict(result, spool=spool))
+                    patched += 1
+        return patched
+    
+    def invalidate_spool(self, spool_id) -> int:
+        """Alle Einträge dieser Spule entfernen - liefert die Anzahl"""
+        with self.lock:
+            keys = [
+                key for key, (_, result) in self.entries.items()
+                if result.get('found') and str(result.get('spool', {}).get('id')) == str(spool_id)
+            ]
+            for key in keys:
+                del self.entries[key]
+        return len(keys)
+    
+    def clear(self):
+        """Alle Einträge entfernen"""
+        with self.lock:
+            self.entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Trefferquote und Füllstand"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
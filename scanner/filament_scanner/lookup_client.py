@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""
+Client für den NFC Lookup Service (nfc_lookup.php)
+Eine Keep-Alive Session mit Connection-Pool und Retry-Policy für alle
+Lookups, Einzel- und Batch-Requests, Erreichbarkeit des Servers. Mit
+log_scans=False sind Lookups reine Lesezugriffe und das Scan-Protokoll
+geht gesammelt an nfc_scan_log.php. Ein Circuit Breaker lässt Requests bei
+ausgefallenem oder überlastetem Server sofort scheitern. API_URL darf
+mehrere Endpunkte enthalten - jeder Request geht an den schnellsten
+erreichbaren, optional abgesichert durch einen zweiten (Hedging).
+"""
+
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from typing import Optional, Dict, Any, List, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .circuit_breaker import CircuitBreaker, CLOSED, OPEN, STATE_VALUES
+from .config import config_int, config_float
+from .endpoint_pool import Endpoint, EndpointPool, parse_api_urls
+from .metrics import MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+# Obergrenze des Servers (MAX_UPLOAD_SIZE in public/nfc_scan_log.php)
+MAX_SCAN_LOG_SIZE = 500
+
+
+def create_http_session(config: Dict[str, str]) -> requests.Session:
+    """HTTP Session mit Connection-Pool, Keep-Alive und Retry-Policy erstellen"""
+    pool_size = max(1, config_int(config, 'HTTP_POOL_SIZE', 4))
+    retries = max(0, config_int(config, 'HTTP_RETRIES', 2))
+    
+    # Nur Verbindungsfehler und Gateway-Fehler wiederholen - ein Read-Timeout
+    # kann bedeuten, dass der Scan serverseitig schon protokolliert wurde
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=0,
+        status=retries,
+        backoff_factor=config_float(config, 'HTTP_BACKOFF', 0.3),
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(['GET', 'POST', 'OPTIONS']),
+        raise_on_status=False
+    )
+    
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({'Connection': 'keep-alive'})
+    return session
+
+
+class LookupClient:
+    def __init__(self, api_url: str, scanner_id: str, config: Optional[Dict[str, str]] = None,
+                 metrics: Optional[MetricsRegistry] = None):
+        config = config or {}
+        self.scanner_id = scanner_id
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        
+        # Eine Keep-Alive Session für alle Lookups (CLI und GUI)
+        self.http_timeout = (
+            config_float(config, 'HTTP_CONNECT_TIMEOUT', 3.0),
+            config_float(config, 'HTTP_READ_TIMEOUT', 10.0)
+        )
+        self.session = create_http_session(config)
+        self.session.headers.update({'User-Agent': f'ACR122U-Scanner/{self.scanner_id}'})
+        
+        # Ein Circuit Breaker pro Endpunkt: nach Fehlern oder SLO-Verletzungen in Folge
+        # sofort scheitern bzw. zum nächsten Endpunkt statt auf Timeouts zu warten
+        def make_breaker(name: str) -> CircuitBreaker:
+            return CircuitBreaker(
+                failure_threshold=config_int(config, 'BREAKER_FAILURES', 3),
+                slow_threshold=config_int(config, 'BREAKER_SLOW_CALLS', 3),
+                slo_ms=config_float(config, 'BREAKER_SLO_MS', 2000.0),
+                reset_timeout=config_float(config, 'BREAKER_RESET', 10.0),
+                max_reset_timeout=config_float(config, 'BREAKER_MAX_RESET', 60.0),
+                name=name
+            )
+        
+        self.endpoints = EndpointPool(parse_api_urls(api_url), make_breaker)
+        self.endpoints.add_listener(
+            lambda previous, state: self.metrics.inc('circuit_transitions', labels={'state': state})
+        )
+        self.metrics.gauge('circuit_state', lambda: STATE_VALUES[self.endpoints.state])
+        self.metrics.gauge('endpoints_available', lambda: sum(
+            1 for endpoint in self.endpoints.endpoints if endpoint.breaker.state == CLOSED
+        ))
+        # Unbenutzte Endpunkte in diesem Abstand (s) nachmessen, damit die Rangfolge aktuell bleibt
+        self.probe_interval = config_float(config, 'ENDPOINT_PROBE_INTERVAL', 30.0)
+        
+        # Hedging: braucht der beste Endpunkt länger als sein p95, parallel den zweitbesten fragen
+        self.hedge_min_delay = config_float(config, 'HEDGE_MIN_DELAY_MS', 25.0) / 1000
+        self.executor = None
+        if config.get('HEDGE_REQUESTS', '0') == '1' and len(self.endpoints) > 1:
+            self.executor = ThreadPoolExecutor(
+                max_workers=2 * max(1, config_int(config, 'HTTP_POOL_SIZE', 4)),
+                thread_name_prefix='Hedge'
+            )
+        
+        self.batch_supported = True
+        self.scan_log_max_size = MAX_SCAN_LOG_SIZE
+        
+        # True: nfc_lookup.php protokolliert jeden Lookup selbst (alter Server)
+        self.log_scans = True
+    
+    @property
+    def api_url_base(self) -> str:
+        """Basis-URL des aktuell bevorzugten Endpunkts"""
+        return self.endpoints.preferred.base_url
+    
+    @property
+    def api_online(self) -> bool:
+        """Erreichbar, solange nicht alle Breaker offen sind"""
+        return self.endpoints.state != OPEN
+    
+    def _fast_fail(self, count: int = 1) -> Dict[str, Any]:
+        """Antwort für vom Breaker abgewiesene Requests"""
+        self.metrics.inc('circuit_fast_fails', count)
+        return {
+            'error': f'Lookup Service gesperrt (nächster Versuch in {self.endpoints.retry_in():.0f}s)',
+            'offline': True
+        }
+    
+    def _send(self, endpoint: Endpoint, method: str, path: str, timed: bool = True,
+              session: Optional[requests.Session] = None, **kwargs) -> requests.Response:
+        """Ein Request an einen Endpunkt - Latenz und Fehler gehen in dessen Statistik und Breaker
+        
+        timed=False: Antwortzeit nicht mit Lookups vergleichbar, zählt nicht für Latenz und SLO
+        """
+        labels = {'endpoint': endpoint.base_url}
+        kwargs.setdefault('timeout', self.http_timeout)
+        started = time.perf_counter()
+        try:
+            response = (session or self.session).request(method, endpoint.url(path), **kwargs)
+        except requests.RequestException:
+            endpoint.record(0.0, ok=False)
+            self.metrics.inc('endpoint_errors', labels=labels)
+            raise
+        
+        # Server-Fehler wie Ausfall behandeln, Client-Fehler nicht
+        duration_ms = (time.perf_counter() - started) * 1000
+        ok = response.status_code < 500
+        endpoint.record(duration_ms if timed else None, ok)
+        if timed:
+            self.metrics.observe('endpoint', duration_ms, labels)
+        if not ok:
+            self.metrics.inc('endpoint_errors', labels=labels)
+        return response
+    
+    def _request(self, method: str, path: str, idempotent: bool = True, hedge: bool = False,
+                 **kwargs) -> Optional[requests.Response]:
+        """Request an den schnellsten erreichbaren Endpunkt, bei Ausfall an den nächsten - None wenn alle gesperrt"""
+        endpoints = self.endpoints.choose()
+        if not endpoints:
+            return None
+        
+        if hedge and self.executor is not None and len(endpoints) > 1:
+            p95 = endpoints[0].p95()
+            if p95 is not None:
+                delay = max(p95 / 1000, self.hedge_min_delay)
+                return self._hedged(endpoints[0], endpoints[1], delay, method, path, **kwargs)
+        
+        for position, endpoint in enumerate(endpoints):
+            last = position == len(endpoints) - 1
+            try:
+                response = self._send(endpoint, method, path, **kwargs)
+                if response.status_code < 500 or last or not idempotent:
+                    return response
+                response.close()
+            except requests.ConnectionError:
+                # Verbindung abgelehnt oder abgebrochen - darf auch ein protokollierender Request woanders hin
+                if last:
+                    raise
+            except requests.RequestException:
+                # Read-Timeout: der Server hat den Scan eventuell schon protokolliert
+                if last or not idempotent:
+                    raise
+            
+            self.metrics.inc('endpoint_failovers')
+            logger.debug("Endpunkt %s ausgefallen - weiter mit dem nächsten", endpoint.base_url)
+    
+    def _hedged(self, primary: Endpoint, secondary: Endpoint, delay: float, method: str, path: str,
+                **kwargs) -> requests.Response:
+        """Zweiten Request an den nächstbesten Endpunkt, wenn der erste länger als delay braucht - der schnellere gewinnt"""
+        first = self.executor.submit(self._send, primary, method, path, **kwargs)
+        done, _ = wait([first], timeout=delay)
+        if done and self._usable(first):
+            return first.result()
+        
+        self.metrics.inc('hedged_requests')
+        second = self.executor.submit(self._send, secondary, method, path, **kwargs)
+        
+        winner = None
+        for future in as_completed([first, second]):
+            if self._usable(future):
+                winner = future
+                break
+        
+        if winner is None:
+            # Beide gescheitert: lieber eine Fehlerantwort als eine Exception
+            for future in (first, second):
+                if future.exception() is None:
+                    return future.result()
+            raise first.exception()
+        
+        # Verlierer verwerfen: noch nicht gestartet → abbrechen, sonst Verbindung nach Ende freigeben
+        loser = second if winner is first else first
+        if not loser.cancel():
+            loser.add_done_callback(self._discard)
+        if winner is second:
+            self.metrics.inc('hedge_wins')
+        return winner.result()
+    
+    @staticmethod
+    def _usable(future: Future) -> bool:
+        return future.exception() is None and future.result().status_code < 500
+    
+    @staticmethod
+    def _discard(future: Future):
+        if not future.cancelled() and future.exception() is None:
+            future.result().close()
+    
+    def use_server_logging(self, reason: str):
+        """Zurück zum Protokollieren im Lookup (Server ohne getrenntes Scan-Protokoll)"""
+        if not self.log_scans:
+            logger.warning("⚠️  %s - Scans werden wieder beim Lookup protokolliert", reason)
+            self.log_scans = True
+    
+    def lookup(self, nfc_uid: str, scanner_id: Optional[str] = None,
+               scanned_at: Optional[int] = None) -> Dict[str, Any]:
+        """NFC UID über direkten NFC Lookup Service"""
+        try:
+            data = {
+                'nfc_uid': nfc_uid,
+                'scanner_id': scanner_id or self.scanner_id,
+                'timestamp': scanned_at or int(time.time()),
+                'reader_type': 'ACR122U'
+            }
+            
+            # Gepoolte Keep-Alive Verbindung statt neuem TCP/TLS Handshake pro Scan
+            self.metrics.inc('lookups')
+            with self.metrics.span('http'):
+                if self.log_scans:
+                    # Protokolliert serverseitig - nie doppelt senden
+                    response = self._request('POST', 'nfc_lookup.php', idempotent=False, json=data)
+                else:
+                    # Reiner Lesezugriff - das Protokoll kommt später gesammelt, Hedging ist gefahrlos
+                    response = self._request(
+                        'GET', 'nfc_lookup.php', hedge=True,
+                        params={'nfc_uid': nfc_uid, 'scanner_id': data['scanner_id']}
+                    )
+            
+            if response is None:
+                return self._fast_fail()
+            
+            if response.status_code == 405 and not self.log_scans:
+                self.use_server_logging("Lookup Service kennt keine Lesezugriffe (GET)")
+                return self.lookup(nfc_uid, scanner_id, scanned_at)
+            
+            if response.status_code == 200:
+                with self.metrics.span('json_decode'):
+                    result = response.json()
+                return result
+            else:
+                self.metrics.inc('lookup_errors', labels={'kind': 'http'})
+                logger.error("❌ API Fehler: %s - %s", response.status_code, response.text[:200])
+                return {'error': f'HTTP {response.status_code}', 'status': response.status_code}
+        
+        except requests.RequestException as e:
+            self.metrics.inc('lookup_errors', labels={'kind': 'network'})
+            logger.error("❌ Netzwerk Fehler: %s", e)
+            return {'error': str(e)}
+    
+    def lookup_batch(self, scans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Mehrere Scans in einem Request nachschlagen - Ergebnisse in gleicher Reihenfolge"""
+        if not self.batch_supported:
+            return [
+                self.lookup(scan['nfc_uid'], scan.get('scanner_id'), scan.get('scanned_at'))
+                for scan in scans
+            ]
+        
+        now = int(time.time())
+        data = {
+            'scanner_id': self.scanner_id,
+            'reader_type': 'ACR122U',
+            'scans': [
+                {
+                    'nfc_uid': scan['nfc_uid'],
+                    'scanner_id': scan.get('scanner_id') or self.scanner_id,
+                    'timestamp': scan.get('scanned_at') or now
+                }
+                for scan in scans
+            ]
+        }
+        if not self.log_scans:
+            data['log'] = False
+        
+        try:
+            self.metrics.inc('lookups', len(scans))
+            with self.metrics.span('http_batch'):
+                response = self._request('POST', 'nfc_lookup.php', idempotent=not self.log_scans, json=data)
+            if response is None:
+                failed = self._fast_fail(len(scans))
+                return [dict(failed) for _ in scans]
+            
+            if response.status_code == 200:
+                results = response.json().get('results')
+                if isinstance(results, list) and len(results) == len(scans):
+                    return results
+                return [{'error': 'Ungültige Batch-Antwort'} for _ in scans]
+            
+            if response.status_code == 400 and response.json().get('error') == 'nfc_uid is required':
+                # Älterer Server ohne Batch-Unterstützung
+                logger.warning("⚠️  Lookup Service unterstützt keine Batches - einzelne Requests")
+                self.batch_supported = False
+                return self.lookup_batch(scans)
+            
+            self.metrics.inc('lookup_errors', len(scans), {'kind': 'http'})
+            logger.error("❌ API Fehler: %s - %s", response.status_code, response.text[:200])
+            return [{'error': f'HTTP {response.status_code}', 'status': response.status_code} for _ in scans]
+        
+        except ValueError:
+            self.metrics.inc('lookup_errors', len(scans), {'kind': 'json'})
+            return [{'error': 'Ungültige JSON Antwort'} for _ in scans]
+        except requests.RequestException as e:
+            self.metrics.inc('lookup_errors', len(scans), {'kind': 'network'})
+            logger.error("❌ Netzwerk Fehler: %s", e)
+            return [{'error': str(e)} for _ in scans]
+    
+    def upload_scan_log(self, scans: List[Dict[str, Any]]) -> int:
+        """Scans gesammelt an nfc_scan_log.php senden - liefert wie viele vom Anfang der Liste erledigt sind
+        
+        Erledigt heißt zugestellt oder vom Server dauerhaft abgelehnt; der Rest
+        bleibt im Journal. Zu große Uploads werden geteilt statt verworfen.
+        """
+        done = 0
+        while done < len(scans):
+            chunk = scans[done:done + self.scan_log_max_size]
+            status = self._upload_scan_log_chunk(chunk)
+            if status is None and len(chunk) > 1:
+                # Server mit kleinerer Obergrenze - halbieren und erneut
+                self.scan_log_max_size = max(1, len(chunk) // 2)
+                logger.warning("⚠️  Scan-Protokoll zu groß - Uploads mit höchstens %s Scans", self.scan_log_max_size)
+                continue
+            if not status:
+                break
+            done += len(chunk)
+        return done
+    
+    def _upload_scan_log_chunk(self, scans: List[Dict[str, Any]]) -> Optional[bool]:
+        """Ein Upload - True erledigt, False später erneut versuchen, None zu groß für den Server"""
+        now = int(time.time())
+        data = {
+            'scanner_id': self.scanner_id,
+            'scans': [
+                {
+                    'nfc_uid': scan['nfc_uid'],
+                    'scanner_id': scan.get('scanner_id') or self.scanner_id,
+                    'timestamp': scan.get('scanned_at') or now
+                }
+                for scan in scans
+            ]
+        }
+        
+        try:
+            self.metrics.inc('scan_log_uploads')
+            with self.metrics.span('http_scan_log'):
+                response = self._request('POST', 'nfc_scan_log.php', idempotent=False, json=data)
+            if response is None:
+                # Bleibt im Journal und geht nach der Erholung raus
+                self.metrics.inc('circuit_fast_fails')
+                return False
+            
+            if response.status_code == 200:
+                self.metrics.inc('scan_log_scans', len(scans))
+                return True
+            
+            if response.status_code in (404, 405):
+                self.use_server_logging("Server ohne nfc_scan_log.php")
+            elif response.status_code == 400:
+                if self.upload_too_large(response):
+                    self.metrics.inc('scan_log_errors', labels={'kind': 'too_large'})
+                    return None
+                # Erneutes Senden hilft nicht - verwerfen statt das Journal zu blockieren
+                logger.warning("⚠️  Scan-Protokoll abgelehnt, %s Scans verworfen: %s", len(scans), response.text[:200])
+                self.metrics.inc('scan_log_errors', labels={'kind': 'rejected'})
+                return True
+            else:
+                logger.warning("⚠️  Scan-Protokoll nicht angenommen: %s - %s",
+                               response.status_code, response.text[:200])
+            self.metrics.inc('scan_log_errors', labels={'kind': 'http'})
+            return False
+        
+        except requests.RequestException as e:
+            self.metrics.inc('scan_log_errors', labels={'kind': 'network'})
+            logger.warning("⚠️  Scan-Protokoll nicht gesendet: %s", e)
+            return False
+    
+    @staticmethod
+    def upload_too_large(response: requests.Response) -> bool:
+        """400 wegen Größe ('Too many scans ...') - kein dauerhafter Fehler der Scans selbst"""
+        try:
+            error = response.json().get('error', '')
+        except ValueError:
+            return False
+        return isinstance(error, str) and error.startswith('Too many scans')
+    
+    def fetch_catalog(self, since: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Katalog komplett (since=None) oder Änderungen seit dem Cursor laden - None bei Fehler"""
+        params = {'since': since} if since else None
+        try:
+            # Der volle Katalog kann groß sein - Lesezeit großzügiger als beim Lookup
+            response = self._request(
+                'GET', 'nfc_catalog.php', timed=False, params=params,
+                timeout=(self.http_timeout[0], self.http_timeout[1] * 3)
+            )
+            if response is None:
+                self.metrics.inc('circuit_fast_fails')
+                logger.debug("Katalog-Abgleich übersprungen - Lookup Service gesperrt")
+                return None
+            
+            if response.status_code != 200:
+                logger.warning("⚠️  Katalog nicht verfügbar: HTTP %s", response.status_code)
+                return None
+            
+            data = response.json()
+            if not isinstance(data.get('entries'), list) or not data.get('cursor'):
+                logger.warning("⚠️  Ungültige Katalog-Antwort")
+                return None
+            return data
+        
+        except ValueError:
+            logger.warning("⚠️  Ungültige Katalog-Antwort")
+            return None
+        except requests.RequestException as e:
+            logger.warning("⚠️  Katalog-Abgleich fehlgeschlagen: %s", e)
+            return None
+    
+    def open_change_stream(self, session: requests.Session, headers: Dict[str, str],
+                           timeout: Tuple[float, float]) -> Optional[requests.Response]:
+        """nfc_events.php über Breaker und Failover öffnen - None wenn alle Endpunkte gesperrt"""
+        return self._request(
+            'GET', 'nfc_events.php', timed=False, session=session,
+            headers=headers, stream=True, timeout=timeout
+        )
+    
+    def warm_up(self) -> bool:
+        """Verbindungen zu allen Endpunkten vorab aufbauen und erste Latenz messen, damit der erste Scan nicht der langsame ist"""
+        reachable = False
+        for endpoint in self.endpoints.endpoints:
+            try:
+                # OPTIONS beantwortet nfc_lookup.php ohne Datenbankzugriff
+                self._send(endpoint, 'OPTIONS', 'nfc_lookup.php')
+                reachable = True
+            except requests.RequestException as e:
+                logger.warning("⚠️  Warm-up %s fehlgeschlagen: %s", endpoint.base_url, e)
+        return reachable
+    
+    def probe(self) -> bool:
+        """Fällige Endpunkte prüfen (Lesezugriff auf eine unbekannte UID) - True wenn einer geantwortet hat"""
+        healthy = False
+        for endpoint in self.endpoints.due_for_probe(self.probe_interval):
+            if endpoint.breaker.state != CLOSED and not endpoint.breaker.allow():
+                continue
+            try:
+                with self.metrics.span('http_probe'):
+                    response = self._send(
+                        endpoint, 'GET', 'nfc_lookup.php',
+                        params={'nfc_uid': 'PROBE', 'scanner_id': self.scanner_id}
+                    )
+                healthy = healthy or response.status_code < 500
+            except requests.RequestException as e:
+                logger.debug("Probe %s fehlgeschlagen: %s", endpoint.base_url, e)
+        return healthy
+    
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+        self.session.close()
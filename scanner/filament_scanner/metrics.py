@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Metriken für die Scan-Pipeline
+Zeitspannen pro Stufe (Karte warten, Connect, APDU, HTTP, JSON, Anzeige)
+als Histogramme mit p50/p95/p99 plus Zähler - Ausgabe im Prometheus
+Textformat und als periodische Zusammenfassung.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bucket-Grenzen in ms (kumulativ wie bei Prometheus)
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+# Messwerte pro Histogramm für die Quantile
+RESERVOIR_SIZE = 1024
+
+METRIC_PREFIX = 'filament_scanner'
+
+
+class Histogram:
+    def __init__(self):
+        self.bucket_counts = [0] * (len(BUCKETS_MS) + 1)
+        self.samples = deque(maxlen=RESERVOIR_SIZE)
+        self.count = 0
+        self.sum = 0.0
+    
+    def observe(self, value_ms: float):
+        self.bucket_counts[bisect.bisect_left(BUCKETS_MS, value_ms)] += 1
+        self.samples.append(value_ms)
+        self.count += 1
+        self.sum += value_ms
+    
+    def quantile(self, q: float) -> float:
+        """Quantil über die letzten RESERVOIR_SIZE Messwerte"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    
+    def summary(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'p50': self.quantile(0.50),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'max': max(self.samples) if self.samples else 0.0
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}  # (Stufe, Labels) -> Histogram
+        self.counters = {}  # (Name, Labels) -> Wert
+        self.gauges = {}  # Name -> Funktion, wird erst beim Export gelesen
+    
+    @staticmethod
+    def _key(name: str, labels: Optional[Dict[str, str]]) -> Tuple[str, Tuple]:
+        return name, tuple(sorted((labels or {}).items()))
+    
+    def observe(self, stage: str, value_ms: float, labels: Optional[Dict[str, str]] = None):
+        """Dauer einer Stufe in ms erfassen"""
+        key = self._key(stage, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value_ms)
+    
+    @contextmanager
+    def span(self, stage: str, labels: Optional[Dict[str, str]] = None):
+        """Zeitspanne um einen Block messen: with metrics.span('http'): ..."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, (time.perf_counter() - started) * 1000, labels)
+    
+    def inc(self, name: str, amount: int = 1, labels: Optional[Dict[str, str]] = None):
+        key = self._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+    
+    def gauge(self, name: str, read):
+        """Momentanwert registrieren (z.B. Journal-Füllstand)"""
+        with self.lock:
+            self.gauges[name] = read
+    
+    def counter(self, name: str, labels: Optional[Dict[str, str]] = None) -> int:
+        with self.lock:
+            return self.counters.get(self._key(name, labels), 0)
+    
+    def total(self, name: str) -> int:
+        """Zähler über alle Labels summiert"""
+        with self.lock:
+            return sum(value for (key, _), value in self.counters.items() if key == name)
+    
+    def stage(self, stage: str, labels: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+        with self.lock:
+            histogram = self.histograms.get(self._key(stage, labels))
+            return histogram.summary() if histogram else Histogram().summary()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Alle Werte als JSON-taugliches Dict"""
+        with self.lock:
+            stages = {self._label_name(name, labels): h.summary() for (name, labels), h in self.histograms.items()}
+            counters = {self._label_name(name, labels): v for (name, labels), v in self.counters.items()}
+            gauges = dict(self.gauges)
+        
+        return {
+            'stages': stages,
+            'counters': counters,
+            'gauges': {name: self._read_gauge(read) for name, read in gauges.items()}
+        }
+    
+    @staticmethod
+    def _label_name(name: str, labels: Tuple) -> str:
+        if not labels:
+            return name
+        return f"{name}[{','.join(f'{k}={v}' for k, v in labels)}]"
+    
+    @staticmethod
+    def _read_gauge(read) -> float:
+        try:
+            return float(read())
+        except Exception:
+            return float('nan')
+    
+    def render_prometheus(self) -> str:
+        """Prometheus Textformat (Version 0.0.4)"""
+        lines = []
+        
+        with self.lock:
+            histograms = sorted(self.histograms.items())
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+            
+            metric = f"{METRIC_PREFIX}_stage_duration_ms"
+            if histograms:
+                lines.append(f"# HELP {metric} Dauer einer Pipeline-Stufe in Millisekunden")
+                lines.append(f"# TYPE {metric} histogram")
+            for (stage, labels), histogram in histograms:
+                base = {'stage': stage, **dict(labels)}
+                cumulative = 0
+                for bound, count in zip(BUCKETS_MS, histogram.bucket_counts):
+                    cumulative += count
+                    lines.append(f"{metric}_bucket{format_labels(base, le=bound)} {cumulative}")
+                lines.append(f"{metric}_bucket{format_labels(base, le='+Inf')} {histogram.count}")
+                lines.append(f"{metric}_sum{format_labels(base)} {histogram.sum:.3f}")
+                lines.append(f"{metric}_count{format_labels(base)} {histogram.count}")
+            
+            seen = set()
+            for (name, labels), value in counters:
+                metric = f"{METRIC_PREFIX}_{name}_total"
+                if metric not in seen:
+                    seen.add(metric)
+                    lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric}{format_labels(dict(labels))} {value}")
+        
+        for name, read in gauges:
+            metric = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {self._read_gauge(read)}")
+        
+        return '\n'.join(lines) + '\n'
+    
+    def summary_line(self) -> str:
+        """Einzeilige Zusammenfassung für das Log"""
+        parts = [f"Scans {self.counter('scans')}", f"Lookups {self.counter('lookups')}",
+                 f"Fehler {self.total('lookup_errors')}", f"Cache-Treffer {self.counter('cache_hits')}"]
+        
+        for stage, label in (('scan_to_result', 'Scan→Ergebnis'), ('http', 'HTTP'), ('card_connect', 'Connect')):
+            summary = self.stage(stage)
+            if summary['count']:
+                parts.append(f"{label} p50 {summary['p50']:.0f} / p95 {summary['p95']:.0f} / "
+                             f"p99 {summary['p99']:.0f} ms")
+        return ' | '.join(parts)
+
+
+def format_labels(labels: Dict[str, Any], **extra) -> str:
+    """Labels im Prometheus Format: {stage="http",le="100"}"""
+    labels = dict(labels, **extra)
+    if not labels:
+        return ''
+    
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"')
+        pairs.append(f'{key}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+class MetricsReporter(threading.Thread):
+    """Schreibt periodisch eine Zusammenfassung - nur wenn seitdem gescannt wurde"""
+    
+    def __init__(self, metrics: MetricsRegistry, interval: float = 60):
+        super().__init__(daemon=True, name="MetricsReporter")
+        self.metrics = metrics
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.last_scans = 0
+    
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            scans = self.metrics.counter('scans')
+            if scans != self.last_scans:
+                self.last_scans = scans
+                logger.info("📈 %s", self.metrics.summary_line())
+    
+    def stop(self):
+        self.stop_event.set()
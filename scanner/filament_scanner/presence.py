@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Anwesenheitserkennung für Tags auf dem Reader
+Zustandsautomat pro Reader (abwesend → anwesend → verlassend → abwesend):
+kurze Aussetzer werden überbrückt, erneutes Auflegen derselben UID innerhalb
+der Sperrzeit zählt nicht als neuer Scan - ein Lookup pro physischem Auflegen.
+"""
+
+import threading
+import time
+from typing import Optional, Dict, Any, List
+
+ABSENT = 'absent'
+PRESENT = 'present'
+LEAVING = 'leaving'
+
+
+class PresenceTracker:
+    def __init__(self, removal_debounce: float = 0.8, cooldown: float = 2.0):
+        # Ein Tag gilt erst als entfernt, wenn er so lange nicht mehr gesehen wurde
+        self.removal_debounce = removal_debounce
+        # Dieselbe UID innerhalb dieser Zeit erneut aufgelegt → kein neuer Scan
+        self.cooldown = cooldown
+        
+        self.lock = threading.Lock()
+        self.readers = {}  # Reader -> {'state', 'uid', 'missing_since', 'reported'}
+        self.last_taps = {}  # UID -> Zeitpunkt des letzten gezählten Scans
+        
+        self.taps = 0
+        self.duplicates = 0  # Wiederholte Meldung eines aufliegenden Tags
+        self.flaps = 0  # Kurzer Aussetzer, Tag blieb liegen
+        self.cooldown_suppressed = 0
+    
+    def update(self, event: Optional[Dict[str, Any]], now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Rohes Reader-Ereignis einspeisen - liefert bestätigte 'inserted'/'removed' Ereignisse
+        
+        Auch ohne Ereignis (None) regelmäßig aufrufen, damit entfernte Tags
+        nach Ablauf der Entprellzeit gemeldet werden.
+        """
+        now = time.perf_counter() if now is None else now
+        
+        with self.lock:
+            confirmed = self._expire(now)
+            
+            if event is not None:
+                if event['type'] == 'inserted':
+                    confirmed.extend(self._inserted(event, now))
+                elif event['type'] == 'removed':
+                    self._missing(event['reader'], now)
+            
+            return confirmed
+    
+    def _inserted(self, event: Dict[str, Any], now: float) -> List[Dict[str, Any]]:
+        nfc_uid = event.get('uid')
+        if not nfc_uid:
+            # Tag liegt auf, UID aber nicht lesbar - Zustand unverändert lassen
+            return []
+        
+        reader = event['reader']
+        current = self.readers.get(reader)
+        
+        if current is not None and current['uid'] == nfc_uid and current['state'] != ABSENT:
+            if current['state'] == LEAVING:
+                self.flaps += 1
+            else:
+                self.duplicates += 1
+            current['state'] = PRESENT
+            current['missing_since'] = None
+            return []
+        
+        confirmed = []
+        if current is not None and current['state'] != ABSENT and current['reported']:
+            # Tag getauscht, bevor die Entprellzeit abgelaufen ist - altes Entfernen zuerst melden
+            confirmed.append({'type': 'removed', 'uid': current['uid'], 'reader': reader, 'time': now})
+        
+        self.readers[reader] = {'state': PRESENT, 'uid': nfc_uid, 'missing_since': None, 'reported': False}
+        
+        last_tap = self.last_taps.get(nfc_uid)
+        if last_tap is not None and now - last_tap < self.cooldown:
+            self.cooldown_suppressed += 1
+            return confirmed
+        
+        self.readers[reader]['reported'] = True
+        self.last_taps[nfc_uid] = now
+        self.taps += 1
+        self._prune_taps(now)
+        confirmed.append(dict(event, type='inserted'))
+        return confirmed
+    
+    def _missing(self, reader: str, now: float):
+        """Tag nicht mehr gesehen - erst nach der Entprellzeit als entfernt melden"""
+        current = self.readers.get(reader)
+        if current is not None and current['state'] == PRESENT:
+            current['state'] = LEAVING
+            current['missing_since'] = now
+    
+    def _expire(self, now: float) -> List[Dict[str, Any]]:
+        removed = []
+        for reader, current in self.readers.items():
+            if current['state'] == LEAVING and now - current['missing_since'] >= self.removal_debounce:
+                current['state'] = ABSENT
+                if not current['reported']:
+                    continue  # Auflegen wurde nicht gemeldet, Entfernen auch nicht
+                removed.append({'type': 'removed', 'uid': current['uid'], 'reader': reader, 'time': now})
+        return removed
+    
+    def _prune_taps(self, now: float):
+        """Abgelaufene Sperrzeiten vergessen"""
+        if len(self.last_taps) > 1000:
+            self.last_taps = {uid: t for uid, t in self.last_taps.items() if now - t < self.cooldown}
+    
+    def present_uid(self, reader: str) -> Optional[str]:
+        """UID des aufliegenden Tags (auch während der Entprellzeit)"""
+        with self.lock:
+            current = self.readers.get(str(reader))
+            if current is None or current['state'] == ABSENT:
+                return None
+            return current['uid']
+    
+    def reset(self):
+        """Zustand vergessen (z.B. beim Neustart der Erfassung)"""
+        with self.lock:
+            self.readers.clear()
+    
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                'taps': self.taps,
+                'duplicates': self.duplicates,
+                'flaps': self.flaps,
+                'cooldown_suppressed': self.cooldown_suppressed
+            }
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Reader-Backends
+Der Scanner spricht PC/SC nur über ein Backend an: 'pcsc' verwendet pyscard
+und echte Reader, 'emulator' einen emulierten ACR122U, der Tap-Folgen aus
+einem Skript abspielt (Tests und Benchmarks ohne Hardware).
+"""
+
+import logging
+from typing import Optional, Dict, Any, List
+
+try:
+    from smartcard.System import readers
+    from smartcard.CardMonitoring import CardMonitor, CardObserver
+    from smartcard.ReaderMonitoring import ReaderMonitor
+    from smartcard.CardType import AnyCardType
+    from smartcard.CardRequest import CardRequest
+    from smartcard.Exceptions import CardRequestTimeoutException, NoCardException
+    PYSCARD_AVAILABLE = True
+except ImportError:
+    PYSCARD_AVAILABLE = False
+    CardObserver = object
+    
+    class CardRequestTimeoutException(Exception):
+        pass
+    
+    class NoCardException(Exception):
+        pass
+
+logger = logging.getLogger(__name__)
+
+READER_BACKENDS = ('pcsc', 'emulator')
+
+
+class PCSCBackend:
+    """Echte Reader über pyscard"""
+    
+    name = 'pcsc'
+    available = PYSCARD_AVAILABLE
+    
+    def readers(self) -> List[Any]:
+        return readers()
+    
+    def card_monitor(self):
+        return CardMonitor()
+    
+    def reader_monitor(self):
+        return ReaderMonitor()
+    
+    def wait_for_card(self, reader, timeout: float = 1):
+        """Wie CardRequest.waitforcard() - liefert einen CardService mit .connection"""
+        cardrequest = CardRequest(timeout=timeout, cardType=AnyCardType(), readers=[reader])
+        return cardrequest.waitforcard()
+    
+    def start(self):
+        pass
+    
+    def stop(self):
+        pass
+
+
+def create_backend(config: Optional[Dict[str, str]] = None):
+    """Backend laut READER_BACKEND erzeugen (Standard: pcsc)"""
+    config = config or {}
+    name = config.get('READER_BACKEND', 'pcsc').strip().lower()
+    
+    if name == 'emulator':
+        from .reader_emulator import EmulatorBackend
+        return EmulatorBackend.from_config(config)
+    
+    if name not in READER_BACKENDS:
+        logger.warning("⚠️  Unbekanntes READER_BACKEND '%s', verwende pcsc", name)
+    return PCSCBackend()
+
+
+def backend_available(config: Dict[str, str]) -> bool:
+    """Kann mit dieser Konfiguration gescannt werden (pyscard oder Emulator)"""
+    return PYSCARD_AVAILABLE or config.get('READER_BACKEND', 'pcsc').strip().lower() == 'emulator'
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+Emulierter ACR122U
+Stellt dieselben Schnittstellen wie pyscard bereit (Reader-Liste, CardMonitor,
+ReaderMonitor, CardRequest, Kartenverbindung mit APDUs) und spielt Tap-Folgen
+aus einem Skript ab: Verweildauer, kurze Aussetzer, schnelle Folgen,
+Lesefehler und abgezogene Reader. NTAG Speicher wird pro UID gehalten, damit
+Spulen-Records geschrieben und beim nächsten Auflegen gelesen werden können.
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+from typing import Optional, Dict, Any, List
+
+from .card_session import GET_UID, GET_VERSION, NTAG_STORAGE_SIZES
+from .reader_backend import CardRequestTimeoutException, NoCardException
+from .tag_record import USER_START_PAGE, PAGE_SIZE, CC_PAGE, CC_MAGIC, encode_tag_memory
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_READER = "ACS ACR122U PICC Interface 0"
+
+# Dauer eines kurzen Aussetzers (Tag kurz ohne Feld, bleibt aber liegen)
+FLAP_TIME = 0.05
+
+
+class EmulatedTag:
+    """NTAG mit Seitenspeicher - Seite 0-3 UID/Lock/CC, Nutzdaten ab Seite 4"""
+    
+    def __init__(self, uid: str, storage_size: int = 0x0F):
+        self.uid = uid.upper()
+        self.storage_size = storage_size
+        self.user_bytes = NTAG_STORAGE_SIZES.get(storage_size, ("NTAG213", 144))[1]
+        self.memory = bytearray(USER_START_PAGE * PAGE_SIZE + self.user_bytes + 16)
+        # Auslieferungszustand: Capability Container und leerer NDEF TLV
+        self.memory[CC_PAGE * PAGE_SIZE:(CC_PAGE + 1) * PAGE_SIZE] = bytes([CC_MAGIC, 0x10, self.user_bytes // 8, 0x00])
+        self.memory[USER_START_PAGE * PAGE_SIZE:(USER_START_PAGE + 1) * PAGE_SIZE] = bytes([0x03, 0x00, 0xFE, 0x00])
+    
+    def write_record(self, spool: Dict[str, Any], revision: int = 1):
+        """Spulen-Record vorab auf den Tag legen"""
+        data = encode_tag_memory(spool, revision)
+        start = USER_START_PAGE * PAGE_SIZE
+        self.memory[start:start + len(data)] = data
+    
+    def version(self) -> List[int]:
+        """GET_VERSION Antwort (D5 43 Status + 8 Bytes)"""
+        return [0xD5, 0x43, 0x00, 0x00, 0x04, 0x04, 0x02, 0x01, 0x00, self.storage_size, 0x03]
+    
+    def read(self, page: int) -> Optional[List[int]]:
+        start = page * PAGE_SIZE
+        if start >= len(self.memory):
+            return None
+        return list(self.memory[start:start + 16].ljust(16, b'\x00'))
+    
+    def write(self, page: int, data: List[int]) -> bool:
+        last_user_page = USER_START_PAGE + self.user_bytes // PAGE_SIZE
+        if page < USER_START_PAGE or page >= last_user_page or len(data) != PAGE_SIZE:
+            return False
+        self.memory[page * PAGE_SIZE:(page + 1) * PAGE_SIZE] = bytes(data)
+        return True
+
+
+class EmulatedReader:
+    def __init__(self, name: str, backend: 'EmulatorBackend'):
+        self.name = name
+        self.backend = backend
+        self.tag = None
+        self.card = None
+        self.connect_errors = 0  # Nächste Verbindungsversuche schlagen fehl
+        self.uid_errors = 0  # Nächste GET_UID Antworten mit SW 63 00
+    
+    def __str__(self) -> str:
+        return self.name
+
+
+class EmulatedCard:
+    """Aufgelegter Tag wie smartcard.Card (reader + createConnection)"""
+    
+    def __init__(self, reader: EmulatedReader):
+        self.reader = reader.name
+        self.emulated_reader = reader
+    
+    def createConnection(self):
+        return EmulatedConnection(self.emulated_reader)
+
+
+class EmulatedConnection:
+    def __init__(self, reader: EmulatedReader):
+        self.reader = reader
+        self.tag = None
+    
+    def connect(self):
+        backend = self.reader.backend
+        time.sleep(backend.connect_latency)
+        
+        with backend.changed:
+            if self.reader.tag is None:
+                raise NoCardException("Card is unpowered")
+            if self.reader.connect_errors:
+                self.reader.connect_errors -= 1
+                raise Exception("Emulierter Verbindungsfehler")
+            self.tag = self.reader.tag
+    
+    def transmit(self, apdu: List[int]):
+        backend = self.reader.backend
+        time.sleep(backend.apdu_latency)
+        
+        with backend.changed:
+            if self.tag is None or self.reader.tag is not self.tag:
+                raise NoCardException("Card was removed")
+            
+            if apdu == GET_UID:
+                if self.reader.uid_errors:
+                    self.reader.uid_errors -= 1
+                    return [], 0x63, 0x00
+                return list(bytes.fromhex(self.tag.uid)), 0x90, 0x00
+            if apdu == GET_VERSION:
+                return self.tag.version(), 0x90, 0x00
+            if apdu[:3] == [0xFF, 0xB0, 0x00] and len(apdu) == 5:
+                data = self.tag.read(apdu[3])
+                if data is None:
+                    return [], 0x63, 0x00
+                return data, 0x90, 0x00
+            if apdu[:3] == [0xFF, 0xD6, 0x00] and len(apdu) >= 5:
+                if not self.tag.write(apdu[3], apdu[5:5 + apdu[4]]):
+                    return [], 0x63, 0x00
+                return [], 0x90, 0x00
+        
+        return [], 0x6A, 0x81  # Funktion nicht unterstützt
+    
+    def disconnect(self):
+        self.tag = None
+
+
+class EmulatedCardService:
+    def __init__(self, reader: EmulatedReader):
+        self.connection = EmulatedConnection(reader)
+
+
+class EmulatedCardMonitor:
+    """Wie pyscard CardMonitor: meldet Auflegen/Entfernen an alle Observer"""
+    
+    def __init__(self, backend: 'EmulatorBackend'):
+        self.backend = backend
+        self.observers = []
+        self.lock = threading.Lock()
+        self.rmthread = None
+        self.stop_event = threading.Event()
+    
+    def addObserver(self, observer):
+        with self.lock:
+            self.observers.append(observer)
+            stopping = self.rmthread if self.stop_event.is_set() else None
+        if stopping is not None:
+            # Thread nach dem letzten deleteObserver noch nicht beendet
+            stopping.join()
+        
+        with self.lock:
+            if self.rmthread is None or not self.rmthread.is_alive():
+                self.stop_event.clear()
+                self.rmthread = threading.Thread(target=self.run, daemon=True, name="EmulatedCardMonitor")
+                self.rmthread.start()
+    
+    def deleteObserver(self, observer):
+        with self.lock:
+            if observer in self.observers:
+                self.observers.remove(observer)
+            if not self.observers:
+                self.stop_event.set()
+        with self.backend.changed:
+            self.backend.changed.notify_all()
+    
+    def run(self):
+        # Wie bei pyscard gelten bereits aufliegende Tags als neu aufgelegt
+        known = {}
+        
+        while not self.stop_event.is_set():
+            with self.backend.changed:
+                current = {name: reader.card for name, reader in self.backend.reader_map.items()
+                           if reader.card is not None}
+                if current == known:
+                    self.backend.changed.wait(0.5)
+                    continue
+            
+            added = [card for name, card in current.items() if known.get(name) is not card]
+            removed = [card for name, card in known.items() if current.get(name) is not card]
+            known = current
+            
+            with self.lock:
+                observers = list(self.observers)
+            for observer in observers:
+                # Entfernen vor Auflegen melden, falls ein Aussetzer zwischen zwei Runden lag
+                if removed:
+                    observer.update(self, ([], removed))
+                if added:
+                    observer.update(self, (added, []))
+
+
+class EmulatedReaderMonitor:
+    """Wie pyscard ReaderMonitor: meldet angesteckte/abgezogene Reader"""
+    
+    def __init__(self, backend: 'EmulatorBackend'):
+        self.backend = backend
+        self.rmthread = None
+    
+    def addObserver(self, observer):
+        self.backend.reader_observers.append(observer)
+        observer.update(self, (self.backend.readers(), []))
+    
+    def deleteObserver(self, observer):
+        if observer in self.backend.reader_observers:
+            self.backend.reader_observers.remove(observer)
+
+
+class EmulatorBackend:
+    """Emulierte Reader als Backend des Scanners"""
+    
+    name = 'emulator'
+    available = True
+    
+    def __init__(self, reader_names: Optional[List[str]] = None, connect_ms: float = 15, apdu_ms: float = 4,
+                 script: Optional[List[Dict[str, Any]]] = None):
+        self.changed = threading.Condition()
+        self.reader_map = {name: EmulatedReader(name, self) for name in (reader_names or [DEFAULT_READER])}
+        self.connect_latency = connect_ms / 1000
+        self.apdu_latency = apdu_ms / 1000
+        self.tags = {}  # UID -> EmulatedTag (Speicher bleibt zwischen den Taps erhalten)
+        self.monitor = None
+        self.reader_observers = []
+        self.script = script
+        self.player = None
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, str]) -> 'EmulatorBackend':
+        names = [name.strip() for name in config.get('EMULATOR_READERS', DEFAULT_READER).split(',') if name.strip()]
+        
+        script_file = config.get('EMULATOR_SCRIPT', '').strip()
+        if script_file:
+            script = load_tap_script(script_file)
+        else:
+            script = build_tap_script(int(config.get('EMULATOR_TAPS', '20') or 0), readers=names)
+        
+        logger.info("🧪 Emulierter Reader: %s (%s Skript-Schritte)", ', '.join(names), len(script))
+        return cls(
+            names,
+            float(config.get('EMULATOR_CONNECT_MS', '15') or 0),
+            float(config.get('EMULATOR_APDU_MS', '4') or 0),
+            script
+        )
+    
+    # Schnittstelle wie PCSCBackend
+    
+    def readers(self) -> List[str]:
+        with self.changed:
+            return list(self.reader_map)
+    
+    def card_monitor(self) -> EmulatedCardMonitor:
+        # Wie pyscard: ein CardMonitor für alle Observer
+        if self.monitor is None:
+            self.monitor = EmulatedCardMonitor(self)
+        return self.monitor
+    
+    def reader_monitor(self) -> EmulatedReaderMonitor:
+        return EmulatedReaderMonitor(self)
+    
+    def wait_for_card(self, reader, timeout: float = 1) -> EmulatedCardService:
+        with self.changed:
+            emulated = self.reader_map.get(str(reader))
+            if emulated is None:
+                raise Exception(f"Reader nicht verfügbar: {reader}")
+            if not self.changed.wait_for(lambda: emulated.tag is not None, timeout):
+                raise CardRequestTimeoutException("Zeitüberschreitung")
+        return EmulatedCardService(emulated)
+    
+    def start(self):
+        """Skript abspielen (einmal pro Backend)"""
+        if self.script and self.player is None:
+            self.player = TapPlayer(self, self.script)
+            self.player.start()
+    
+    def stop(self):
+        if self.player is not None:
+            self.player.stop()
+    
+    # Steuerung der emulierten Hardware
+    
+    def tag(self, uid: str) -> EmulatedTag:
+        uid = uid.upper()
+        if uid not in self.tags:
+            self.tags[uid] = EmulatedTag(uid)
+        return self.tags[uid]
+    
+    def _reader(self, reader: Optional[str]) -> Optional[EmulatedReader]:
+        if reader is None:
+            return next(iter(self.reader_map.values()), None)
+        return self.reader_map.get(reader)
+    
+    def place(self, uid: str, reader: Optional[str] = None):
+        """Tag auflegen (ein aufliegender Tag wird ersetzt)"""
+        with self.changed:
+            emulated = self._reader(reader)
+            if emulated is None:
+                return
+            emulated.tag = self.tag(uid)
+            emulated.card = EmulatedCard(emulated)
+            self.changed.notify_all()
+    
+    def remove(self, reader: Optional[str] = None):
+        with self.changed:
+            emulated = self._reader(reader)
+            if emulated is None:
+                return
+            emulated.tag = None
+            emulated.card = None
+            self.changed.notify_all()
+    
+    def inject_error(self, kind: str, count: int = 1, reader: Optional[str] = None):
+        """Nächste Verbindungen ('connect') bzw. UID-Abfragen ('uid') fehlschlagen lassen"""
+        with self.changed:
+            emulated = self._reader(reader)
+            if emulated is None:
+                return
+            if kind == 'connect':
+                emulated.connect_errors += count
+            elif kind == 'uid':
+                emulated.uid_errors += count
+    
+    def plug(self, name: str):
+        """Reader anstecken"""
+        with self.changed:
+            if name in self.reader_map:
+                return
+            self.reader_map[name] = EmulatedReader(name, self)
+            self.changed.notify_all()
+        for observer in list(self.reader_observers):
+            observer.update(None, ([name], []))
+    
+    def unplug(self, name: str):
+        """Reader abziehen - ein aufliegender Tag verschwindet mit"""
+        with self.changed:
+            if self.reader_map.pop(name, None) is None:
+                return
+            self.changed.notify_all()
+        for observer in list(self.reader_observers):
+            observer.update(None, ([], [name]))
+
+
+class TapPlayer(threading.Thread):
+    """Spielt ein Tap-Skript ab und merkt sich, wann welcher Tag aufgelegt wurde
+    
+    Schritte:
+        {"uid": "04A1B2C3D4E5F6", "gap": 0.5, "dwell": 0.8, "flaps": 1, "reader": "...", "record": {...}}
+        {"error": "connect" | "uid", "count": 1, "reader": "..."}
+        {"wait": 2.0}
+        {"unplug": "Reader"} / {"plug": "Reader"}
+    """
+    
+    def __init__(self, backend: EmulatorBackend, script: List[Dict[str, Any]]):
+        super().__init__(daemon=True, name="TapPlayer")
+        self.backend = backend
+        self.script = script
+        self.stop_event = threading.Event()
+        self.taps = []  # [{'uid', 'reader', 'placed_at'}]
+        self.finished = threading.Event()
+    
+    def run(self):
+        try:
+            for step in self.script:
+                if self.stop_event.is_set():
+                    break
+                self.play(step)
+        finally:
+            self.finished.set()
+    
+    def play(self, step: Dict[str, Any]):
+        if 'uid' in step:
+            self.tap(step)
+        elif 'error' in step:
+            self.backend.inject_error(step['error'], int(step.get('count', 1)), step.get('reader'))
+        elif 'wait' in step:
+            self.stop_event.wait(float(step['wait']))
+        elif 'unplug' in step:
+            self.backend.unplug(step['unplug'])
+        elif 'plug' in step:
+            self.backend.plug(step['plug'])
+    
+    def tap(self, step: Dict[str, Any]):
+        uid = step['uid'].upper()
+        reader = step.get('reader')
+        if step.get('record'):
+            self.backend.tag(uid).write_record(step['record'], int(step['record'].get('revision', 1)))
+        
+        if self.stop_event.wait(float(step.get('gap', 0.5))):
+            return
+        
+        self.taps.append({'uid': uid, 'reader': reader, 'placed_at': time.perf_counter()})
+        self.backend.place(uid, reader)
+        
+        # Aussetzer gleichmäßig über die Verweildauer verteilen
+        dwell = float(step.get('dwell', 0.5))
+        flaps = int(step.get('flaps', 0))
+        segment = dwell / (flaps + 1)
+        for _ in range(flaps):
+            if self.stop_event.wait(segment):
+                break
+            self.backend.remove(reader)
+            time.sleep(FLAP_TIME)
+            self.backend.place(uid, reader)
+        else:
+            self.stop_event.wait(segment)
+        
+        self.backend.remove(reader)
+    
+    def stop(self):
+        self.stop_event.set()
+
+
+def load_tap_script(path: str) -> List[Dict[str, Any]]:
+    """Tap-Skript aus einer JSON Datei laden (Liste von Schritten)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        script = json.load(f)
+    if not isinstance(script, list):
+        raise ValueError(f"{path}: Tap-Skript muss eine Liste von Schritten sein")
+    return script
+
+
+def build_tap_script(taps: int, seed: int = 42, readers: Optional[List[str]] = None,
+                     gap: tuple = (0.2, 1.0), dwell: tuple = (0.3, 0.9), spools: int = 0,
+                     unknown_ratio: float = 0.1, burst_every: int = 10, burst_size: int = 5,
+                     flap_ratio: float = 0.1, error_ratio: float = 0.02) -> List[Dict[str, Any]]:
+    """Zufällige Tap-Folge mit schnellen Folgen, Aussetzern und Lesefehlern
+    
+    spools > 0: Taps verteilen sich auf so viele Spulen (Wiederholungen lesen
+    den beim ersten Tap geschriebenen Record); UIDs mit Präfix FF sind dem
+    Server unbekannt.
+    """
+    rng = random.Random(seed)
+    readers = readers or [DEFAULT_READER]
+    script = []
+    
+    for i in range(taps):
+        number = rng.randrange(spools) if spools > 0 else i
+        if rng.random() < unknown_ratio:
+            uid = f"FF{rng.randrange(1 << 48):012X}"
+        else:
+            uid = f"04A1B2{number:08X}"
+        
+        reader = readers[i % len(readers)]
+        in_burst = burst_every > 0 and i % burst_every >= burst_every - burst_size
+        
+        if rng.random() < error_ratio:
+            script.append({'error': rng.choice(('connect', 'uid')), 'reader': reader})
+        
+        script.append({
+            'uid': uid,
+            'reader': reader,
+            'gap': round(rng.uniform(0.02, 0.08) if in_burst else rng.uniform(*gap), 3),
+            'dwell': round(rng.uniform(0.1, 0.2) if in_burst else rng.uniform(*dwell), 3),
+            'flaps': 1 if rng.random() < flap_ratio else 0
+        })
+    
+    return script
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Reader-Überwachung
+Erkennt abgezogene Reader, einen neu gestarteten PC/SC Dienst und einen
+abgestürzten CardMonitor und stellt die Verbindung mit Backoff wieder her
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Any
+
+logger = logging.getLogger(__name__)
+
+
+class ReaderSupervisor(threading.Thread):
+    def __init__(self, scanner, check_interval: float = 2.0, max_backoff: float = 30.0):
+        super().__init__(daemon=True, name="ReaderSupervisor")
+        self.scanner = scanner
+        self.check_interval = check_interval
+        self.max_backoff = max_backoff
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+        
+        self.disconnects = 0
+        self.reconnects = 0
+        self.total_downtime = 0.0
+        self.down_since = None
+        self.last_error = None
+    
+    def run(self):
+        backoff = self.check_interval
+        
+        while not self.stop_event.is_set():
+            healthy, reason = self.scanner.reader_healthy()
+            
+            if healthy and self.down_since is None:
+                self.stop_event.wait(self.check_interval)
+                continue
+            
+            if not healthy and self.down_since is None:
+                self.mark_down(reason)
+                backoff = self.check_interval
+            
+            if self.scanner.reconnect_reader():
+                self.mark_up()
+                backoff = self.check_interval
+                self.stop_event.wait(self.check_interval)
+            else:
+                # Exponentielles Backoff bis der Reader wieder da ist
+                self.stop_event.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+    
+    def mark_down(self, reason: str):
+        with self.lock:
+            self.down_since = time.monotonic()
+            self.disconnects += 1
+            self.last_error = reason
+        logger.warning("⚠️  Reader nicht verfügbar: %s - versuche Wiederverbindung...", reason)
+    
+    def mark_up(self):
+        with self.lock:
+            downtime = time.monotonic() - self.down_since if self.down_since else 0.0
+            self.total_downtime += downtime
+            self.down_since = None
+            self.reconnects += 1
+        logger.info("✅ Reader wieder verbunden (Ausfall %.1fs, Wiederverbindung #%s)", downtime, self.reconnects)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Zustand, Wiederverbindungen und Ausfallzeit"""
+        with self.lock:
+            current = time.monotonic() - self.down_since if self.down_since else 0.0
+            return {
+                'state': 'down' if self.down_since else 'ok',
+                'disconnects': self.disconnects,
+                'reconnects': self.reconnects,
+                'current_downtime': current,
+                'total_downtime': self.total_downtime + current,
+                'last_error': self.last_error
+            }
+    
+    def stop(self):
+        self.stop_event.set()
+        self.join(timeout=5)
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Reader-Manager: alle angeschlossenen PC/SC Reader parallel betreiben
+Reader werden beim Start aufgezählt und per ReaderMonitor im Betrieb
+hinzugefügt bzw. entfernt (Hot-Plug) - beides über das Reader-Backend
+des Scanners (pyscard oder Emulator)
+"""
+
+import logging
+import threading
+import time
+from typing import Optional, Dict, Any, List
+
+try:
+    from smartcard.ReaderMonitoring import ReaderObserver
+    PYSCARD_AVAILABLE = True
+except ImportError:
+    PYSCARD_AVAILABLE = False
+    ReaderObserver = object
+
+logger = logging.getLogger(__name__)
+
+# Schlüsselwörter, an denen NFC Reader erkannt werden
+NFC_READER_KEYWORDS = ['acr122', 'acr 122', 'nfc']
+
+# Spaltenbreite von nfc_scan_log.scanner_id
+MAX_SCANNER_ID_LENGTH = 50
+
+
+def is_nfc_reader(reader) -> bool:
+    """ACR122U / NFC Reader am Namen erkennen"""
+    reader_name = str(reader).lower()
+    return any(keyword in reader_name for keyword in NFC_READER_KEYWORDS)
+
+
+def reader_scanner_id(scanner_id: str, reader) -> str:
+    """Scanner-ID um den Reader-Namen ergänzen (passend zur Spaltenbreite in nfc_scan_log)"""
+    reader_name = ' '.join(str(reader).split())
+    room = MAX_SCANNER_ID_LENGTH - len(scanner_id) - 1
+    if room <= 0:
+        return scanner_id[:MAX_SCANNER_ID_LENGTH]
+    # Das Ende des Namens enthält die Slot-Nummer und unterscheidet gleiche Reader
+    return f"{scanner_id}:{reader_name[-room:]}"
+
+
+class ReaderPoller(threading.Thread):
+    """Polling-Fallback für einen einzelnen Reader - meldet nur Zustandswechsel"""
+    
+    def __init__(self, scanner, reader, interval: float):
+        super().__init__(daemon=True, name=f"ReaderPoller[{reader}]")
+        self.scanner = scanner
+        self.reader = reader
+        self.interval = interval
+        self.stop_event = threading.Event()
+    
+    def run(self):
+        last_uid = None
+        
+        while not self.stop_event.is_set():
+            nfc_uid = self.scanner.read_nfc_uid(self.reader)
+            
+            if nfc_uid != last_uid:
+                last_uid = nfc_uid
+                self.scanner.card_events.put({
+                    'type': 'inserted' if nfc_uid else 'removed',
+                    'uid': nfc_uid,
+                    'reader': str(self.reader),
+                    'time': time.perf_counter()
+                })
+            
+            self.stop_event.wait(self.interval)
+    
+    def stop(self):
+        self.stop_event.set()
+
+
+class ReaderManager(ReaderObserver):
+    def __init__(self, scanner, poll_interval: float = 0.3):
+        super().__init__()
+        self.scanner = scanner
+        self.poll = False
+        self.poll_interval = poll_interval
+        self.readers = {}  # Name -> Reader
+        self.pollers = {}  # Name -> ReaderPoller
+        self.lock = threading.Lock()
+        self.accept_all = False
+        self.reader_monitor = None
+    
+    def discover(self) -> List[Any]:
+        """Alle NFC Reader aufzählen - falls keiner erkannt wird, alle Reader verwenden"""
+        try:
+            available_readers = self.scanner.backend.readers()
+        except Exception as e:
+            logger.error("❌ Fehler beim Suchen der Reader: %s", e)
+            return []
+        
+        nfc_readers = [reader for reader in available_readers if is_nfc_reader(reader)]
+        if nfc_readers:
+            return nfc_readers
+        
+        if available_readers:
+            logger.warning("⚠️  Kein ACR122U spezifisch gefunden, verwende alle Reader")
+            self.accept_all = True
+        return list(available_readers)
+    
+    def start(self) -> int:
+        """Reader aufzählen und Hot-Plug Überwachung starten - liefert die Anzahl Reader"""
+        for reader in self.discover():
+            self.add_reader(reader)
+        
+        try:
+            self.reader_monitor = self.scanner.backend.reader_monitor()
+            self.reader_monitor.addObserver(self)
+        except Exception as e:
+            logger.warning("⚠️  Reader Hot-Plug nicht verfügbar: %s", e)
+            self.reader_monitor = None
+        
+        return len(self.readers)
+    
+    def start_polling(self):
+        """Polling-Fallback: ein Thread pro Reader speist die Event-Queue des Scanners"""
+        with self.lock:
+            self.poll = True
+            for name, reader in self.readers.items():
+                if name not in self.pollers:
+                    poller = ReaderPoller(self.scanner, reader, self.poll_interval)
+                    self.pollers[name] = poller
+                    poller.start()
+    
+    def stop_polling(self):
+        with self.lock:
+            self.poll = False
+            pollers = list(self.pollers.values())
+            self.pollers.clear()
+        for poller in pollers:
+            poller.stop()
+    
+    def stop(self):
+        """Überwachung und alle Polling-Threads beenden"""
+        if self.reader_monitor is not None:
+            try:
+                self.reader_monitor.deleteObserver(self)
+            except Exception:
+                pass
+            self.reader_monitor = None
+        
+        self.stop_polling()
+    
+    def update(self, observable, actions):
+        """ReaderMonitor Callback: Reader angesteckt / abgezogen"""
+        added_readers, removed_readers = actions
+        
+        for reader in added_readers:
+            if self.accept_all or is_nfc_reader(reader):
+                self.add_reader(reader)
+        
+        for reader in removed_readers:
+            self.remove_reader(reader)
+    
+    def add_reader(self, reader):
+        name = str(reader)
+        with self.lock:
+            if name in self.readers:
+                return
+            self.readers[name] = reader
+            
+            if self.poll:
+                poller = ReaderPoller(self.scanner, reader, self.poll_interval)
+                self.pollers[name] = poller
+                poller.start()
+        
+        logger.info("➕ Reader verbunden: %s", name)
+    
+    def remove_reader(self, reader):
+        name = str(reader)
+        with self.lock:
+            if self.readers.pop(name, None) is None:
+                return
+            poller = self.pollers.pop(name, None)
+        
+        if poller is not None:
+            poller.stop()
+        
+        # Ein aufliegender Tag ist mit dem Reader verschwunden
+        self.scanner.close_card_session(name)
+        self.scanner.card_events.put({
+            'type': 'removed',
+            'uid': None,
+            'reader': name,
+            'time': time.perf_counter()
+        })
+        logger.info("➖ Reader entfernt: %s", name)
+    
+    def monitor_alive(self) -> bool:
+        """ReaderMonitor Thread läuft noch (stirbt z.B. bei Neustart des PC/SC Dienstes)"""
+        if self.reader_monitor is None:
+            return True
+        thread = getattr(self.reader_monitor, 'rmthread', None)
+        return thread is None or thread.is_alive()
+    
+    def is_active(self, reader) -> bool:
+        with self.lock:
+            return str(reader) in self.readers
+    
+    def reader_names(self) -> List[str]:
+        with self.lock:
+            return list(self.readers)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+asyncio-basierter Scanner-Kern
+Reader-Events rein, Lookups mit begrenzter Parallelität, Ergebnisse über
+eine Queue raus (wird von der Tk mainloop per after() geleert)
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any
+
+from .core import POLL_INTERVAL
+
+
+class AsyncScanEngine:
+    def __init__(self, scanner, max_in_flight: int = 4):
+        self.scanner = scanner
+        self.max_in_flight = max(1, max_in_flight)
+        
+        # Ergebnisse für die GUI: (art, daten) mit art in started/scan/tag/result/removed/error/stopped
+        self.results = queue.Queue()
+        
+        self.loop = None
+        self.thread = None
+        self.stop_event = None
+        self.stop_requested = threading.Event()
+        self.lookups = set()
+        self.current_lookups = {}  # Reader -> laufender Lookup
+        self.scan_count = 0
+        self.cancelled = 0
+        
+        # Blockierende Aufrufe (pyscard, requests) laufen im Executor:
+        # ein Worker für den Reader plus einer pro gleichzeitigem Lookup
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_in_flight + 1,
+            thread_name_prefix="scan-engine"
+        )
+    
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+    
+    def start(self):
+        """Event-Loop in eigenem Thread starten"""
+        self.thread = threading.Thread(target=self._run_loop, daemon=True, name="AsyncScanEngine")
+        self.thread.start()
+    
+    def stop(self, wait: bool = False, timeout: float = 2.0):
+        """Engine beenden - laufende Lookups werden abgebrochen"""
+        self.stop_requested.set()
+        if self.loop is not None and self.stop_event is not None:
+            try:
+                self.loop.call_soon_threadsafe(self.stop_event.set)
+            except RuntimeError:
+                pass  # Loop bereits beendet
+        
+        if wait and self.thread is not None:
+            self.thread.join(timeout)
+    
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self._main())
+        finally:
+            self.loop.close()
+            self.executor.shutdown(wait=False)
+    
+    async def _main(self):
+        self.stop_event = asyncio.Event()
+        if self.stop_requested.is_set():
+            self.stop_event.set()
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        
+        use_events = await self.loop.run_in_executor(self.executor, self.scanner.start_acquisition)
+        self.results.put(('started', {'use_events': use_events}))
+        
+        reader_task = asyncio.ensure_future(self._read_tags(use_events, semaphore))
+        stop_task = asyncio.ensure_future(self.stop_event.wait())
+        
+        await asyncio.wait([reader_task, stop_task], return_when=asyncio.FIRST_COMPLETED)
+        
+        # Aufräumen: Reader und offene Lookups abbrechen
+        for task in [reader_task, stop_task, *self.lookups]:
+            task.cancel()
+        await asyncio.gather(reader_task, stop_task, *self.lookups, return_exceptions=True)
+        
+        self.scanner.stop_acquisition()
+        self.results.put(('stopped', {'scan_count': self.scan_count, 'cancelled': self.cancelled}))
+    
+    async def _read_tags(self, use_events: bool, semaphore: asyncio.Semaphore):
+        """Bestätigte Reader-Events verarbeiten und Lookups starten"""
+        while True:
+            try:
+                # Entprellung und Duplikat-Unterdrückung übernimmt der PresenceTracker
+                events = await self.loop.run_in_executor(self.executor, self.scanner.acquire_taps, use_events)
+            except Exception as e:
+                self.results.put(('error', {'message': str(e)}))
+                return
+            
+            for event in events:
+                nfc_uid = event['uid']
+                reader = event['reader']
+                
+                if event['type'] == 'inserted':
+                    self.scan_count += 1
+                    detected_at = event.get('time')
+                    self.results.put(('scan', {'uid': nfc_uid, 'number': self.scan_count, 'reader': reader,
+                                               'detected_at': detected_at}))
+                    
+                    # Spulen-Record vom Tag sofort anzeigen, der Lookup gleicht danach ab
+                    tag = event.get('tag')
+                    tag_result = self.scanner.tag_result(tag)
+                    if tag_result is not None:
+                        self.results.put(('tag', {'uid': nfc_uid, 'number': self.scan_count, 'reader': reader,
+                                                  'result': tag_result, 'detected_at': detected_at}))
+                    self._start_lookup(nfc_uid, self.scan_count, reader, tag, detected_at, semaphore)
+                
+                else:
+                    self.results.put(('removed', {'reader': reader}))
+            
+            if not use_events:
+                await asyncio.sleep(POLL_INTERVAL)
+    
+    def _start_lookup(self, nfc_uid: str, scan_number: int, reader: str, tag: Optional[Dict[str, Any]],
+                      detected_at: Optional[float], semaphore: asyncio.Semaphore):
+        """Lookup starten - ein noch laufender Lookup am selben Reader ist veraltet"""
+        current = self.current_lookups.get(reader)
+        if current is not None and not current.done():
+            current.cancel()
+            self.cancelled += 1
+        
+        task = asyncio.ensure_future(self._lookup(nfc_uid, scan_number, reader, tag, detected_at, semaphore))
+        self.lookups.add(task)
+        task.add_done_callback(self.lookups.discard)
+        self.current_lookups[reader] = task
+    
+    async def _lookup(self, nfc_uid: str, scan_number: int, reader: str, tag: Optional[Dict[str, Any]],
+                      detected_at: Optional[float], semaphore: asyncio.Semaphore):
+        tag_shown = self.scanner.tag_result(tag) is not None
+        reconcile = None
+        async with semaphore:
+            lookup_started = time.perf_counter()
+            try:
+                # Journal + Cache + HTTP; der Scan wird auch bei Abbruch vollständig
+                # protokolliert, nur das Ergebnis wird dann nicht mehr angezeigt
+                result = await self.loop.run_in_executor(
+                    self.executor, self.scanner.process_scan, nfc_uid, reader
+                )
+                if tag is not None:
+                    # Tag-Daten abgleichen, bei Abweichung zurückschreiben
+                    reconcile = await self.loop.run_in_executor(
+                        self.executor, self.scanner.reconcile_tag, nfc_uid, reader, tag, result
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                result = {'error': str(e)}
+        
+        if detected_at is not None:
+            # Messwert, Scan-Record und Ereignis wie in der CLI
+            self.scanner.emit_result(nfc_uid, reader, scan_number, result, detected_at, lookup_started)
+        self.results.put(('result', {
+            'uid': nfc_uid,
+            'number': scan_number,
+            'reader': reader,
+            'result': result,
+            'tag_shown': tag_shown,
+            'reconcile': reconcile,
+            'detected_at': detected_at
+        }))
+    
+    def drain(self, limit: int = 50) -> list:
+        """Bis zu limit Ergebnisse ohne Blockieren abholen"""
+        items = []
+        while len(items) < limit:
+            try:
+                items.append(self.results.get_nowait())
+            except queue.Empty:
+                break
+        return items
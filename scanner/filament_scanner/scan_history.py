@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Scan-Historie
+Die neuesten Einträge liegen in einem begrenzten Ringpuffer im Speicher,
+alle Einträge in SQLite - die GUI lädt nur das sichtbare Fenster seitenweise
+nach, Suche nach UID/Material läuft über Indizes.
+"""
+
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Optional, Dict, Any, List
+
+
+class ScanHistory:
+    def __init__(self, path: str = 'scan_history.db', memory_size: int = 500, max_entries: int = 100000):
+        self.path = path
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        
+        # Neueste Einträge zuerst - erste Seite ohne Datenbankzugriff
+        self.recent = deque(maxlen=max(1, memory_size))
+        
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        # material NOCASE: LIKE 'abc%' (ohne Groß-/Kleinschreibung) kann den Index nutzen
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                scanned_at REAL NOT NULL,
+                nfc_uid TEXT NOT NULL,
+                status TEXT NOT NULL,
+                material TEXT COLLATE NOCASE NOT NULL DEFAULT '',
+                spool_id INTEGER
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_history_uid ON history (nfc_uid)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_history_material ON history (material)")
+        
+        # Ringpuffer mit den neuesten Einträgen aus der Datenbank füllen
+        for entry in reversed(self._query("SELECT * FROM history ORDER BY id DESC LIMIT ?", (self.recent.maxlen,))):
+            self.recent.appendleft(entry)
+    
+    def add(self, nfc_uid: str, status: str, material: str = '', spool_id: Optional[int] = None) -> Dict[str, Any]:
+        """Scan an die Historie anhängen"""
+        entry = {
+            'scanned_at': time.time(),
+            'nfc_uid': nfc_uid.upper(),
+            'status': status,
+            'material': material or '',
+            'spool_id': spool_id
+        }
+        
+        with self.lock:
+            cursor = self.conn.execute(
+                "INSERT INTO history (scanned_at, nfc_uid, status, material, spool_id) VALUES (?, ?, ?, ?, ?)",
+                (entry['scanned_at'], entry['nfc_uid'], entry['status'], entry['material'], entry['spool_id'])
+            )
+            entry['id'] = cursor.lastrowid
+            self.recent.appendleft(entry)
+            
+            if entry['id'] % 1000 == 0:
+                self._enforce_limit()
+        
+        return entry
+    
+    def older(self, before_id: Optional[int] = None, limit: int = 100, query: str = '') -> List[Dict[str, Any]]:
+        """Einträge älter als before_id (neueste zuerst) - Keyset-Paging statt OFFSET"""
+        if not query:
+            # Aus dem Ringpuffer, solange er die Seite vollständig abdeckt
+            with self.lock:
+                entries = [e for e in self.recent if before_id is None or e['id'] < before_id][:limit]
+                complete = len(self.recent) < self.recent.maxlen  # Ringpuffer hält alles
+            if len(entries) == limit or complete:
+                return entries
+        
+        where, params = self._search_clause(query)
+        if before_id is not None:
+            where.append("id < ?")
+            params.append(before_id)
+        sql = "SELECT * FROM history"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self._query(sql + " ORDER BY id DESC LIMIT ?", params + [limit])
+    
+    def newer(self, after_id: int, limit: int = 100, query: str = '') -> List[Dict[str, Any]]:
+        """Einträge neuer als after_id (neueste zuerst) - beim Zurückscrollen"""
+        where, params = self._search_clause(query)
+        where.append("id > ?")
+        params.append(after_id)
+        entries = self._query(
+            "SELECT * FROM history WHERE " + " AND ".join(where) + " ORDER BY id ASC LIMIT ?",
+            params + [limit]
+        )
+        return list(reversed(entries))
+    
+    def count(self, query: str = '') -> int:
+        where, params = self._search_clause(query)
+        sql = "SELECT COUNT(*) FROM history"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self.lock:
+            return self.conn.execute(sql, params).fetchone()[0]
+    
+    def matches(self, entry: Dict[str, Any], query: str) -> bool:
+        """Passt ein neuer Eintrag zur aktuellen Suche (gleiche Regel wie _search_clause)"""
+        if not query:
+            return True
+        query = query.strip()
+        return entry['nfc_uid'].startswith(query.upper()) or entry['material'].lower().startswith(query.lower())
+    
+    def _search_clause(self, query: str):
+        """Präfix-Suche auf UID oder Material - beide Bedingungen über Index"""
+        query = query.strip()
+        if not query:
+            return [], []
+        
+        uid = query.upper()
+        escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return (
+            ["((nfc_uid >= ? AND nfc_uid < ?) OR material LIKE ? ESCAPE '\\')"],
+            [uid, uid + '\uffff', escaped + '%']
+        )
+    
+    def _query(self, sql: str, params=()) -> List[Dict[str, Any]]:
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [
+            {'id': row[0], 'scanned_at': row[1], 'nfc_uid': row[2], 'status': row[3],
+             'material': row[4], 'spool_id': row[5]}
+            for row in rows
+        ]
+    
+    def _enforce_limit(self):
+        """Älteste Einträge über max_entries verwerfen (Lock wird vom Aufrufer gehalten)"""
+        self.conn.execute(
+            "DELETE FROM history WHERE id <= (SELECT id FROM history ORDER BY id DESC LIMIT 1 OFFSET ?)",
+            (self.max_entries,)
+        )
+    
+    def clear(self):
+        """Historie vollständig löschen"""
+        with self.lock:
+            self.conn.execute("DELETE FROM history")
+            self.recent.clear()
+    
+    def close(self):
+        with self.lock:
+            try:
+                self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error:
+                pass
+            self.conn.close()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Offline Scan-Journal
+Jeder Scan wird sofort in SQLite (WAL) festgehalten und nachgereicht,
+falls der Lookup Service gerade nicht erreichbar ist
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any, List, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class ScanJournal:
+    def __init__(self, path: str = 'scan_journal.db', max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.dropped = 0
+        
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # WAL: Anhängen blockiert keine Leser, Commit ist nach Absturz konsistent
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS scans (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nfc_uid TEXT NOT NULL,
+                scanner_id TEXT NOT NULL,
+                scanned_at INTEGER NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                claimed INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(scans)")]
+        if 'claimed' not in columns:
+            # Journal einer älteren Version
+            self.conn.execute("ALTER TABLE scans ADD COLUMN claimed INTEGER NOT NULL DEFAULT 0")
+        # Lookups eines beendeten Prozesses laufen nicht mehr - Scans wieder freigeben
+        self.conn.execute("UPDATE scans SET claimed = 0 WHERE claimed = 1")
+    
+    def append(self, nfc_uid: str, scanner_id: str, scanned_at: Optional[int] = None,
+               claimed: bool = False) -> int:
+        """Scan anhängen - liefert die Journal-ID
+        
+        claimed=True: der Live-Lookup läuft noch, pending() lässt den Scan bis
+        zu complete() oder release() aus (sonst würde er doppelt protokolliert)
+        """
+        with self.lock:
+            cursor = self.conn.execute(
+                "INSERT INTO scans (nfc_uid, scanner_id, scanned_at, claimed) VALUES (?, ?, ?, ?)",
+                (nfc_uid, scanner_id, scanned_at or int(time.time()), int(claimed))
+            )
+            journal_id = cursor.lastrowid
+            
+            if journal_id % 100 == 0:
+                self._enforce_limit()
+            
+            return journal_id
+    
+    def complete(self, journal_ids: List[int]):
+        """Zugestellte Scans entfernen (Checkpoint in einer Transaktion)"""
+        if not journal_ids:
+            return
+        
+        with self.lock:
+            self.conn.execute("BEGIN")
+            self.conn.executemany("DELETE FROM scans WHERE id = ?", [(i,) for i in journal_ids])
+            self.conn.execute("COMMIT")
+    
+    def release(self, journal_ids: List[int]):
+        """Live-Lookup beendet ohne Zustellung - Scans an den Flusher übergeben"""
+        if not journal_ids:
+            return
+        
+        with self.lock:
+            self.conn.execute("BEGIN")
+            self.conn.executemany("UPDATE scans SET claimed = 0 WHERE id = ?", [(i,) for i in journal_ids])
+            self.conn.execute("COMMIT")
+    
+    def mark_attempt(self, journal_ids: List[int]):
+        """Fehlgeschlagenen Zustellversuch zählen"""
+        if not journal_ids:
+            return
+        
+        with self.lock:
+            self.conn.execute("BEGIN")
+            self.conn.executemany("UPDATE scans SET attempts = attempts + 1 WHERE id = ?", [(i,) for i in journal_ids])
+            self.conn.execute("COMMIT")
+    
+    def pending(self, limit: int = 25) -> List[Dict[str, Any]]:
+        """Älteste offene Scans ohne laufenden Live-Lookup"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT id, nfc_uid, scanner_id, scanned_at, attempts FROM scans WHERE claimed = 0 ORDER BY id LIMIT ?",
+                (limit,)
+            ).fetchall()
+        
+        return [
+            {'id': row[0], 'nfc_uid': row[1], 'scanner_id': row[2], 'scanned_at': row[3], 'attempts': row[4]}
+            for row in rows
+        ]
+    
+    def pending_count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM scans").fetchone()[0]
+    
+    def _enforce_limit(self):
+        """Plattenplatz begrenzen: älteste offene Scans verwerfen (Lock muss gehalten werden)"""
+        count = self.conn.execute("SELECT COUNT(*) FROM scans").fetchone()[0]
+        overflow = count - self.max_entries
+        
+        if overflow > 0:
+            self.conn.execute(
+                "DELETE FROM scans WHERE id IN (SELECT id FROM scans ORDER BY id LIMIT ?)",
+                (overflow,)
+            )
+            self.dropped += overflow
+            logger.warning("⚠️  Scan-Journal voll - %s alte Scans verworfen", overflow)
+    
+    def checkpoint(self):
+        """WAL in die Datenbank zurückschreiben und kürzen"""
+        with self.lock:
+            self._enforce_limit()
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class JournalFlusher(threading.Thread):
+    """Hintergrund-Thread: offene Scans in Batches nachreichen sobald die API wieder erreichbar ist"""
+    
+    def __init__(self, journal: ScanJournal, replay: Callable[[List[Dict[str, Any]]], List[int]],
+                 interval: float = 5.0, batch_size: int = 25, max_interval: float = 60.0):
+        super().__init__(daemon=True, name="JournalFlusher")
+        self.journal = journal
+        self.replay = replay
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_interval = max_interval
+        self.stop_event = threading.Event()
+        self.wake_event = threading.Event()
+        
+        self.replayed = 0
+        self.failed_rounds = 0
+    
+    def run(self):
+        delay = self.interval
+        
+        while not self.stop_event.is_set():
+            self.wake_event.wait(delay)
+            self.wake_event.clear()
+            if self.stop_event.is_set():
+                break
+            
+            if self.flush():
+                delay = self.interval
+            else:
+                # Backoff solange die API nicht erreichbar ist
+                delay = min(delay * 2, self.max_interval)
+        
+    def flush(self) -> bool:
+        """Alle offenen Scans nachreichen - False wenn ein Batch nicht zugestellt werden konnte"""
+        delivered_any = False
+        
+        while not self.stop_event.is_set():
+            batch = self.journal.pending(self.batch_size)
+            if not batch:
+                break
+            
+            delivered = self.replay(batch)
+            self.journal.complete(delivered)
+            self.replayed += len(delivered)
+            
+            if len(delivered) < len(batch):
+                delivered_ids = set(delivered)
+                failed = [entry['id'] for entry in batch if entry['id'] not in delivered_ids]
+                self.journal.mark_attempt(failed)
+                self.failed_rounds += 1
+                return False
+            
+            delivered_any = True
+        
+        if delivered_any:
+            self.journal.checkpoint()
+        return True
+    
+    def wake(self):
+        """Sofort einen Flush-Versuch starten"""
+        self.wake_event.set()
+    
+    def stop(self):
+        self.stop_event.set()
+        self.wake_event.set()
+        self.join(timeout=5)
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Headless Dienst-Modus
+Kleiner lokaler HTTP Server: /status liefert den Scanner-Zustand als JSON,
+/metrics die Stufen-Latenzen und Zähler im Prometheus Textformat,
+/events streamt Scan-Ereignisse per Server-Sent Events an beliebig viele
+Abonnenten (Dashboards, Etikettendrucker). Jeder Abonnent hat eine eigene
+begrenzte Queue - langsame Abnehmer verlieren alte Ereignisse, die
+Erfassung wartet nie auf sie.
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional, Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+# Kommentarzeile an SSE Clients, damit Proxies/Browser die Verbindung offen halten
+HEARTBEAT_INTERVAL = 15
+# Ereignisse für Wiederverbindung mit Last-Event-ID
+REPLAY_SIZE = 100
+
+
+class EventBroadcaster:
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self.lock = threading.RLock()  # subscribe() liefert unter dem Lock nach
+        self.subscribers = set()
+        self.recent = deque(maxlen=REPLAY_SIZE)
+        self.next_id = 1
+        self.published = 0
+        self.dropped = 0
+    
+    def publish(self, kind: str, data: Dict[str, Any]):
+        """Ereignis an alle Abonnenten verteilen - blockiert nie"""
+        with self.lock:
+            event = {'id': self.next_id, 'event': kind, 'data': data}
+            self.next_id += 1
+            self.published += 1
+            self.recent.append(event)
+            subscribers = list(self.subscribers)
+        
+        for subscriber in subscribers:
+            self._offer(subscriber, event)
+    
+    def _offer(self, subscriber: queue.Queue, event: Dict[str, Any]):
+        """Volle Queue: ältestes Ereignis verwerfen statt zu warten"""
+        while True:
+            try:
+                subscriber.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    subscriber.get_nowait()
+                    with self.lock:
+                        self.dropped += 1
+                except queue.Empty:
+                    pass
+    
+    def subscribe(self, last_event_id: Optional[int] = None) -> queue.Queue:
+        """Neuen Abonnenten anlegen, verpasste Ereignisse seit last_event_id nachliefern"""
+        subscriber = queue.Queue(maxsize=self.queue_size)
+        with self.lock:
+            if last_event_id is not None:
+                for event in self.recent:
+                    if event['id'] > last_event_id:
+                        self._offer(subscriber, event)
+            self.subscribers.add(subscriber)
+        return subscriber
+    
+    def unsubscribe(self, subscriber: queue.Queue):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+    
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                'subscribers': len(self.subscribers),
+                'published': self.published,
+                'dropped': self.dropped
+            }
+
+
+class ScanServiceHandler(BaseHTTPRequestHandler):
+    server_version = "FilamentScanner/1.0"
+    
+    def do_GET(self):
+        path = self.path.split('?', 1)[0].rstrip('/')
+        
+        if path == '/status':
+            self.send_json(self.server.service.status())
+        elif path == '/events':
+            self.stream_events()
+        elif path == '/recent':
+            self.send_json({'events': self.server.service.broadcaster_recent()})
+        elif path == '/metrics':
+            self.send_text(self.server.service.scanner.metrics.render_prometheus(),
+                           'text/plain; version=0.0.4; charset=utf-8')
+        else:
+            self.send_json({'error': 'not_found'}, 404)
+    
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.send_cors_headers()
+        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Last-Event-ID')
+        self.end_headers()
+    
+    def send_cors_headers(self):
+        # Dashboards laufen im Browser auf einem anderen Origin
+        self.send_header('Access-Control-Allow-Origin', '*')
+    
+    def send_json(self, data: Dict[str, Any], status: int = 200):
+        body = json.dumps(data, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.send_cors_headers()
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_text(self, text: str, content_type: str):
+        body = text.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.send_cors_headers()
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def stream_events(self):
+        """SSE Stream - läuft bis der Client trennt oder der Dienst stoppt"""
+        broadcaster = self.server.service.broadcaster
+        
+        last_event_id = self.headers.get('Last-Event-ID')
+        try:
+            last_event_id = int(last_event_id) if last_event_id else None
+        except ValueError:
+            last_event_id = None
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Accel-Buffering', 'no')
+        self.send_cors_headers()
+        self.end_headers()
+        
+        subscriber = broadcaster.subscribe(last_event_id)
+        try:
+            self.wfile.write(b"retry: 2000\n\n")
+            self.wfile.flush()
+            
+            while not self.server.service.stopping.is_set():
+                try:
+                    event = subscriber.get(timeout=HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    self.wfile.write(b": heartbeat\n\n")
+                    self.wfile.flush()
+                    continue
+                
+                if event is None:
+                    break
+                payload = json.dumps(event['data'], default=str)
+                self.wfile.write(f"id: {event['id']}\nevent: {event['event']}\ndata: {payload}\n\n".encode('utf-8'))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            pass  # Client hat getrennt
+        finally:
+            broadcaster.unsubscribe(subscriber)
+    
+    def log_message(self, format, *args):
+        # Zugriffe nicht auf stdout protokollieren - dort laufen die Scan-Ausgaben
+        pass
+
+
+class ScanService:
+    def __init__(self, scanner, host: str = '127.0.0.1', port: int = 8766, queue_size: int = 100):
+        self.scanner = scanner
+        self.host = host
+        self.port = port
+        self.broadcaster = EventBroadcaster(queue_size)
+        self.stopping = threading.Event()
+        self.started_at = time.time()
+        self.httpd = None
+        self.thread = None
+    
+    def start(self):
+        """HTTP Server in eigenem Thread starten und Scanner-Ereignisse abonnieren"""
+        self.httpd = ThreadingHTTPServer((self.host, self.port), ScanServiceHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.service = self
+        self.port = self.httpd.server_address[1]
+        
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True, name="ScanService")
+        self.thread.start()
+        
+        self.scanner.add_event_listener(self.broadcaster.publish)
+        logger.info("🌐 Dienst läuft: http://%s:%s/status  |  Ereignisse: /events (SSE)  |  /metrics",
+                    self.host, self.port)
+    
+    def status(self) -> Dict[str, Any]:
+        status = self.scanner.status()
+        status['service'] = dict(self.broadcaster.stats(), uptime=time.time() - self.started_at)
+        status['metrics'] = self.scanner.metrics.snapshot()
+        return status
+    
+    def broadcaster_recent(self) -> List[Dict[str, Any]]:
+        with self.broadcaster.lock:
+            return list(self.broadcaster.recent)
+    
+    def stop(self):
+        """Abonnenten trennen und Server beenden"""
+        self.stopping.set()
+        self.scanner.remove_event_listener(self.broadcaster.publish)
+        
+        with self.broadcaster.lock:
+            subscribers = list(self.broadcaster.subscribers)
+        for subscriber in subscribers:
+            self.broadcaster._offer(subscriber, None)
+        
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
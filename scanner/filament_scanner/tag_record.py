@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Kompakter Spulen-Datensatz im NTAG Benutzerspeicher
+NDEF MIME Record ab Seite 4 - Spulen-ID, UUID, Material, Gewichte, Revision.
+Wird beim Auflegen über die offene Kartensitzung gelesen und nach dem
+Abgleich mit dem Server bei Abweichungen neu geschrieben - aber nur auf
+beschreibbare Tags, die leer sind oder schon einen Spulen-Record tragen.
+"""
+
+import logging
+import struct
+import uuid as uuidlib
+from typing import Optional, Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+# Erste Seite des Benutzerspeichers (0-3: UID, Lock Bytes, Capability Container)
+USER_START_PAGE = 4
+PAGE_SIZE = 4
+READ_PAGES = 4  # READ BINARY liefert 16 Bytes = 4 Seiten
+
+# Capability Container (Seite 3): NDEF Magic Number, Schreibzugriff im unteren Nibble von Byte 3
+CC_PAGE = 3
+CC_MAGIC = 0xE1
+# Dynamische Lock Bytes (erste Seite nach dem Benutzerspeicher) je nach Speichergröße
+DYNAMIC_LOCK_PAGES = {144: 0x28, 504: 0x82, 888: 0xE2}
+
+# NDEF: TLV Typ, Terminator und Record-Header (MB|ME|SR, TNF=2 MIME)
+NDEF_TLV = 0x03
+TERMINATOR_TLV = 0xFE
+RECORD_HEADER = 0xD2
+RECORD_TYPE = b"application/vnd.filament.spool"
+
+# Nutzdaten: Format, Revision, Spulen-ID, UUID, Gesamt-/Restgewicht (g), Materiallänge
+FORMAT_VERSION = 1
+PAYLOAD_HEADER = struct.Struct('>BHI16sHHB')
+MAX_MATERIAL_BYTES = 32
+
+
+def encode_payload(spool: Dict[str, Any], revision: int) -> bytes:
+    """Spulen-Daten in das kompakte Binärformat packen"""
+    try:
+        spool_uuid = uuidlib.UUID(str(spool.get('uuid'))).bytes
+    except ValueError:
+        spool_uuid = bytes(16)
+    
+    material = str(spool.get('material') or '').encode('utf-8')[:MAX_MATERIAL_BYTES]
+    material = material.decode('utf-8', 'ignore').encode('utf-8')  # kein halbes Zeichen
+    
+    header = PAYLOAD_HEADER.pack(
+        FORMAT_VERSION,
+        revision & 0xFFFF,
+        int(spool.get('id') or 0),
+        spool_uuid,
+        clamp_weight(spool.get('total_weight')),
+        clamp_weight(spool.get('remaining_weight')),
+        len(material)
+    )
+    return header + material
+
+
+def decode_payload(payload: bytes) -> Optional[Dict[str, Any]]:
+    """Binärformat zurück in Spulen-Daten wandeln"""
+    if len(payload) < PAYLOAD_HEADER.size:
+        return None
+    
+    version, revision, spool_id, spool_uuid, total, remaining, material_length = \
+        PAYLOAD_HEADER.unpack_from(payload)
+    if version != FORMAT_VERSION:
+        return None
+    
+    material = payload[PAYLOAD_HEADER.size:PAYLOAD_HEADER.size + material_length]
+    return {
+        'revision': revision,
+        'spool': {
+            'id': spool_id,
+            'uuid': str(uuidlib.UUID(bytes=spool_uuid)),
+            'material': material.decode('utf-8', 'replace'),
+            'total_weight': total,
+            'remaining_weight': remaining
+        }
+    }
+
+
+def clamp_weight(value) -> int:
+    """Gewicht in ganzen Gramm (0-65535)"""
+    try:
+        return max(0, min(0xFFFF, int(round(float(value or 0)))))
+    except (TypeError, ValueError):
+        return 0
+
+
+def encode_tag_memory(spool: Dict[str, Any], revision: int) -> bytes:
+    """NDEF TLV mit Spulen-Record, auf ganze Seiten aufgefüllt"""
+    payload = encode_payload(spool, revision)
+    record = bytes([RECORD_HEADER, len(RECORD_TYPE), len(payload)]) + RECORD_TYPE + payload
+    data = bytes([NDEF_TLV, len(record)]) + record + bytes([TERMINATOR_TLV])
+    
+    padding = -len(data) % PAGE_SIZE
+    return data + bytes(padding)
+
+
+def ndef_length(data: bytes) -> Optional[int]:
+    """Gesamtlänge des NDEF TLV (inkl. Kopf) aus den ersten Bytes - None wenn kein NDEF"""
+    # Leere/Lock TLVs überspringen
+    offset = 0
+    while offset < len(data) and data[offset] == 0x00:
+        offset += 1
+    if offset + 1 >= len(data) or data[offset] != NDEF_TLV:
+        return None
+    if data[offset + 1] == 0xFF:
+        return None  # 3-Byte Länge - kein kompakter Spulen-Record
+    return offset + 2 + data[offset + 1]
+
+
+def is_blank_user_area(data: bytes) -> bool:
+    """Benutzerspeicher enthält nur einen leeren NDEF TLV (03 00) - Auslieferungszustand"""
+    offset = 0
+    while offset < len(data) and data[offset] == 0x00:
+        offset += 1
+    return offset + 1 < len(data) and data[offset] == NDEF_TLV and data[offset + 1] == 0x00
+
+
+def decode_tag_memory(data: bytes) -> Optional[Dict[str, Any]]:
+    """Spulen-Record aus dem Benutzerspeicher lesen (None wenn keiner vorhanden)"""
+    length = ndef_length(data)
+    if length is None or length > len(data):
+        return None
+    
+    # TLV Kopf überspringen
+    offset = 0
+    while data[offset] == 0x00:
+        offset += 1
+    record = data[offset + 2:length]
+    
+    if len(record) < 3 or record[0] & 0x07 != 0x02 or not record[0] & 0x10:
+        return None  # kein MIME Short Record
+    
+    type_length = record[1]
+    payload_length = record[2]
+    record_type = record[3:3 + type_length]
+    if record_type != RECORD_TYPE:
+        return None
+    
+    payload = record[3 + type_length:3 + type_length + payload_length]
+    return decode_payload(payload)
+
+
+def read_spool_record(session) -> Optional[Dict[str, Any]]:
+    """Spulen-Record über die offene Kartensitzung lesen"""
+    data = read_binary(session, USER_START_PAGE)
+    if data is None:
+        return None
+    
+    length = ndef_length(data)
+    if length is None:
+        return None
+    
+    # Weitere Blöcke nur lesen, wenn der Record nicht in die ersten 16 Bytes passt
+    page = USER_START_PAGE + READ_PAGES
+    while len(data) < length:
+        block = read_binary(session, page)
+        if block is None:
+            return None
+        data += block
+        page += READ_PAGES
+    
+    return decode_tag_memory(data)
+
+
+def read_binary(session, page: int) -> Optional[bytes]:
+    """16 Bytes ab Seite lesen"""
+    response, sw1, sw2 = session.transmit([0xFF, 0xB0, 0x00, page & 0xFF, 0x10], f'READ:{page}')
+    if (sw1, sw2) != (0x90, 0x00):
+        return None
+    return bytes(response)
+
+
+def writeback_blocker(session, own_record: bool, user_bytes: Optional[int] = None) -> Optional[str]:
+    """Grund, warum der Tag nicht beschrieben werden darf - None wenn Schreiben erlaubt ist
+    
+    Geschrieben wird nur auf NDEF-formatierte Tags ohne Schreibschutz (CC und
+    Lock Bytes), deren Benutzerspeicher leer ist oder schon einen Spulen-Record
+    trägt. Fremde Inhalte (z.B. URL Records) bleiben unangetastet.
+    """
+    header = read_binary(session, 0)
+    if header is None or len(header) < 16:
+        return "Kopfseiten nicht lesbar"
+    
+    cc = header[CC_PAGE * PAGE_SIZE:(CC_PAGE + 1) * PAGE_SIZE]
+    if cc[0] != CC_MAGIC:
+        return "kein NDEF Capability Container"
+    if cc[3] & 0x0F:
+        return "Schreibschutz im Capability Container"
+    
+    # Statische Lock Bytes (Seite 2, Byte 2-3): Bits 3-7 sperren Seite 3-7, Byte 3 Seite 8-15
+    if header[10] & 0xF8 or header[11]:
+        return "Seiten über statische Lock Bytes gesperrt"
+    
+    lock_page = DYNAMIC_LOCK_PAGES.get(user_bytes)
+    if lock_page is not None:
+        dynamic = read_binary(session, lock_page)
+        if dynamic is None:
+            return "Dynamische Lock Bytes nicht lesbar"
+        if dynamic[0] or dynamic[1]:
+            return "Seiten über dynamische Lock Bytes gesperrt"
+    
+    if not own_record:
+        data = read_binary(session, USER_START_PAGE)
+        if data is None or not is_blank_user_area(data):
+            return "Benutzerspeicher enthält fremde Daten"
+    
+    return None
+
+
+def write_page(session, page: int, data: bytes) -> bool:
+    """Eine Seite schreiben (UPDATE BINARY, 4 Bytes)"""
+    apdu = [0xFF, 0xD6, 0x00, page, PAGE_SIZE] + list(data)
+    _, sw1, sw2 = session.transmit(apdu, f'WRITE:{page}')
+    if (sw1, sw2) != (0x90, 0x00):
+        logger.error("❌ Schreiben von Seite %s fehlgeschlagen: SW=%02X%02X", page, sw1, sw2)
+        return False
+    return True
+
+
+def write_spool_record(session, spool: Dict[str, Any], revision: int,
+                       user_bytes: Optional[int] = None) -> bool:
+    """Spulen-Record seitenweise schreiben - TLV-Kopf zuletzt
+    
+    Seite 4 wird zuerst auf einen leeren NDEF TLV gesetzt und erst nach allen
+    übrigen Seiten mit dem echten Kopf beschrieben. Wird der Tag mittendrin
+    abgezogen, bleibt er leer (und wird beim nächsten Mal neu beschrieben)
+    statt einen halb alten, halb neuen Record zu tragen.
+    """
+    data = encode_tag_memory(spool, revision)
+    if user_bytes is not None and len(data) > user_bytes:
+        logger.warning("⚠️  Spulen-Record (%s Bytes) passt nicht auf den Tag (%s Bytes)", len(data), user_bytes)
+        return False
+    
+    if not write_page(session, USER_START_PAGE, bytes([NDEF_TLV, 0x00, TERMINATOR_TLV, 0x00])):
+        return False
+    
+    for index in range(PAGE_SIZE, len(data), PAGE_SIZE):
+        if not write_page(session, USER_START_PAGE + index // PAGE_SIZE, data[index:index + PAGE_SIZE]):
+            return False
+    
+    return write_page(session, USER_START_PAGE, data[:PAGE_SIZE])
+
+
+def changed_fields(tag_spool: Dict[str, Any], server_spool: Dict[str, Any]) -> List[str]:
+    """Felder, in denen Tag und Server abweichen"""
+    changed = []
+    
+    if int(tag_spool.get('id') or 0) != int(server_spool.get('id') or 0):
+        changed.append('id')
+    if str(tag_spool.get('uuid') or '').lower() != str(server_spool.get('uuid') or '').lower():
+        changed.append('uuid')
+    material = str(server_spool.get('material') or '').encode('utf-8')[:MAX_MATERIAL_BYTES]
+    if tag_spool.get('material') != material.decode('utf-8', 'ignore'):
+        changed.append('material')
+    for key in ('total_weight', 'remaining_weight'):
+        if clamp_weight(tag_spool.get(key)) != clamp_weight(server_spool.get(key)):
+            changed.append(key)
+    
+    return changed
+
+
+def tag_lookup_result(record: Dict[str, Any], nfc_uid: str) -> Dict[str, Any]:
+    """Spulen-Record wie ein Lookup-Ergebnis aufbereiten (Anzeige ohne Server)"""
+    return {
+        'found': True,
+        'spool': dict(record['spool']),
+        'nfc_uid': nfc_uid,
+        'from_tag': True,
+        'revision': record['revision']
+    }
@@ -5,63 +5,66 @@ Schöne Benutzeroberfläche mit tkinter
 """
 
 import time
-import json
-import requests
-import sys
-import os
-import configparser
-import threading
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 from typing import Optional, Dict, Any
-import webbrowser
+from collections import deque
 
-try:
-    # Windows-kompatible Smart Card Bibliothek für ACR122U
-    from smartcard.System import readers
-    from smartcard.util import toHexString, toBytes
-    from smartcard.CardMonitoring import CardMonitor, CardObserver
-    from smartcard.CardType import AnyCardType
-    from smartcard.CardRequest import CardRequest
-    from smartcard.Exceptions import CardRequestTimeoutException, NoCardException
-    PYSCARD_AVAILABLE = True
-except ImportError:
-    PYSCARD_AVAILABLE = False
+# Nur leichte Module beim Start - requests, pyscard und der Scanner-Kern
+# werden erst in setup_scanner() geladen, wenn das Fenster schon steht
+from filament_scanner.audio_feedback import AudioFeedback
+from filament_scanner.config import load_config, config_int
+from filament_scanner.logging_setup import setup_logging
+from filament_scanner.scan_history import ScanHistory
+
+# Zeilen pro nachgeladener Seite der Historie
+HISTORY_PAGE = 50
+
+# Anzahl gemessener Anzeigezeiten für die Auswertung
+RENDER_SAMPLES = 500
 
 class NFCScannerGUI:
     def __init__(self):
         self.root = tk.Tk()
         self.config = self.load_config()
+        
+        # Meldungen des Scanner-Kerns in die Logdatei, in die Konsole nur falls vorhanden
+        self.log_pipeline = setup_logging(self.config)
+        
         self.scanner = None
+        self.metrics_service = None
+        self.engine = None
         self.scanning = False
         
+        # Töne im Hintergrund - der Tk Main Thread wartet nie auf winsound
+        self.audio = AudioFeedback(self.config.get('ENABLE_SOUND', '1') == '1', print_fallback=False)
+        
+        # Historie: Ringpuffer + SQLite, im Treeview nur ein Fenster von HISTORY_WINDOW Zeilen
+        self.history = ScanHistory(
+            self.config['HISTORY_FILE'],
+            self.config_value('HISTORY_MEMORY', 500),
+            self.config_value('HISTORY_MAX_ENTRIES', 100000)
+        )
+        self.history_window = max(HISTORY_PAGE * 2, self.config_value('HISTORY_WINDOW', 200))
+        self.history_query = ''
+        self.history_at_top = True
+        self.history_exhausted = False
+        self.history_loading = False
+        self.history_search_job = None
+        
+        # Anzeigezeiten (ms) der letzten Scans
+        self.render_times = deque(maxlen=RENDER_SAMPLES)
+        self.scan_to_screen = deque(maxlen=RENDER_SAMPLES)
+        self.visible_view = None
+        
         self.setup_ui()
-        self.setup_scanner()
+        
+        # Fenster zuerst zeichnen, dann Scanner-Kern laden und Reader verbinden
+        self.root.after_idle(self.setup_scanner)
         
     def load_config(self) -> Dict[str, str]:
         """Konfiguration aus config.ini laden"""
-        config = {
-            'API_URL': 'http://localhost:8000',
-            'SCANNER_ID': 'acr122u_001',
-            'ENABLE_SOUND': '1',
-            'DEBUG_MODE': '0'
-        }
-        
-        config_file = 'config.ini'
-        if os.path.exists(config_file):
-            try:
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                for line in content.split('\n'):
-                    line = line.strip()
-                    if line and not line.startswith('#') and '=' in line:
-                        key, value = line.split('=', 1)
-                        config[key.strip()] = value.strip()
-            except Exception as e:
-                pass
-        
-        return config
+        return load_config(verbose=False)
     
     def setup_ui(self):
         """GUI erstellen"""
@@ -159,6 +162,7 @@ class NFCScannerGUI:
         # Placeholder wenn keine Spule gescannt
         self.no_spool_frame = ttk.Frame(self.current_frame)
         self.no_spool_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=20, pady=20)
+        self.visible_view = self.no_spool_frame
         
         ttk.Label(self.no_spool_frame, text="📱", font=('Segoe UI', 48)).pack(pady=20)
         ttk.Label(self.no_spool_frame, text="Warten auf NFC Tag...", 
@@ -166,13 +170,141 @@ class NFCScannerGUI:
         ttk.Label(self.no_spool_frame, text="Halten Sie einen NFC Tag an den Reader", 
                  foreground="gray").pack()
         
-        # Spule Info Frame (versteckt bis Scan erfolgt)
+        # Spule Info Frame und Unbekannt-Frame (versteckt bis Scan erfolgt) - einmal
+        # aufgebaut und pro Scan nur über StringVars/config aktualisiert
         self.spool_info_frame = ttk.Frame(self.current_frame)
+        self.unknown_frame = ttk.Frame(self.current_frame)
+        self.setup_spool_view()
+        self.setup_unknown_view()
         self.current_frame.columnconfigure(0, weight=1)
         self.current_frame.rowconfigure(0, weight=1)
+    
+    def setup_spool_view(self):
+        """Detailansicht für gefundene Spulen aufbauen"""
+        self.current_spool_id = None
+        self.current_uid = ''
+        self.spool_vars = {key: tk.StringVar() for key in (
+            'header', 'id', 'material', 'filament_type', 'color_name', 'weight', 'location', 'nfc_uid',
+            'tag_type', 'tag_position', 'is_primary', 'percentage'
+        )}
+        
+        # Header
+        ttk.Label(self.spool_info_frame, textvariable=self.spool_vars['header'],
+                  font=('Segoe UI', 16, 'bold'), foreground="green").pack(pady=(0, 20))
+        
+        # Info Grid
+        info_frame = ttk.Frame(self.spool_info_frame)
+        info_frame.pack(fill=tk.X, pady=(0, 20))
+        
+        row = 0
+        for label, key, icon in [
+            ("ID", 'id', "🏷️"),
+            ("Material", 'material', "🎨"),
+            ("Typ", 'filament_type', "🔧"),
+            ("Farbe", 'color_name', "🌈"),
+            ("Gewicht", 'weight', "⚖️"),
+            ("Standort", 'location', "📍"),
+            ("NFC UID", 'nfc_uid', "📱")
+        ]:
+            ttk.Label(info_frame, text=f"{icon} {label}:", font=('Segoe UI', 10, 'bold')).grid(
+                row=row, column=0, sticky=tk.W, padx=(0, 20), pady=5
+            )
+            ttk.Label(info_frame, textvariable=self.spool_vars[key], font=('Segoe UI', 10)).grid(
+                row=row, column=1, sticky=tk.W, pady=5
+            )
+            row += 1
+        
+        # NFC-Tag Details (Multiple NFC-UIDs System) - nur sichtbar wenn der Server sie liefert
+        self.nfc_info_frame = ttk.Frame(info_frame)
+        self.nfc_info_frame.grid(row=row, column=0, columnspan=2, sticky=(tk.W, tk.E))
+        row += 1
+        
+        ttk.Separator(self.nfc_info_frame, orient='horizontal').grid(
+            row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=10
+        )
+        ttk.Label(self.nfc_info_frame, text="📋 NFC-Tag Informationen:", font=('Segoe UI', 11, 'bold')).grid(
+            row=1, column=0, columnspan=2, sticky=tk.W, pady=(5, 10)
+        )
+        for nfc_row, (label, key, icon) in enumerate([
+            ("Tag-Typ", 'tag_type', "🏷️"),
+            ("Position", 'tag_position', "📍"),
+            ("Primärer Tag", 'is_primary', "⭐")
+        ], start=2):
+            ttk.Label(self.nfc_info_frame, text=f"  {icon} {label}:", font=('Segoe UI', 9)).grid(
+                row=nfc_row, column=0, sticky=tk.W, padx=(20, 20), pady=2
+            )
+            ttk.Label(self.nfc_info_frame, textvariable=self.spool_vars[key], font=('Segoe UI', 9)).grid(
+                row=nfc_row, column=1, sticky=tk.W, pady=2
+            )
+        self.nfc_info_frame.columnconfigure(1, weight=1)
+        
+        # Progress Bar für Gewicht
+        ttk.Label(info_frame, text="📊 Verbrauch:", font=('Segoe UI', 10, 'bold')).grid(
+            row=row, column=0, sticky=tk.W, padx=(0, 20), pady=5
+        )
+        
+        progress_frame = ttk.Frame(info_frame)
+        progress_frame.grid(row=row, column=1, sticky=(tk.W, tk.E), pady=5)
+        
+        self.spool_progress = ttk.Progressbar(progress_frame, length=200, mode='determinate')
+        self.spool_progress.pack(side=tk.LEFT, padx=(0, 10))
+        
+        ttk.Label(progress_frame, textvariable=self.spool_vars['percentage']).pack(side=tk.LEFT)
+        
+        # Buttons
+        button_frame = ttk.Frame(self.spool_info_frame)
+        button_frame.pack(fill=tk.X, pady=20)
+        
+        ttk.Button(button_frame, text="🌐 In Browser öffnen", 
+                  command=lambda: self.open_in_browser(self.current_spool_id)).pack(side=tk.LEFT, padx=(0, 10))
+        
+        ttk.Button(button_frame, text="📋 NFC UID kopieren", 
+                  command=lambda: self.copy_to_clipboard(self.current_uid)).pack(side=tk.LEFT, padx=(0, 10))
+    
+    def setup_unknown_view(self):
+        """Ansicht für unbekannte Tags aufbauen"""
+        # Header
+        ttk.Label(self.unknown_frame, text="❓ UNBEKANNTER NFC TAG", 
+                  font=('Segoe UI', 16, 'bold'), foreground="orange").pack(pady=(0, 20))
+        
+        # NFC UID
+        uid_frame = ttk.LabelFrame(self.unknown_frame, text="📱 NFC Unique ID", padding="15")
+        uid_frame.pack(fill=tk.X, pady=(0, 20))
+        
+        self.unknown_uid_text = tk.Text(uid_frame, height=2, font=('Consolas', 12), wrap=tk.WORD)
+        self.unknown_uid_text.config(state=tk.DISABLED)
+        self.unknown_uid_text.pack(fill=tk.X, pady=(0, 10))
+        
+        # Buttons
+        button_frame = ttk.Frame(uid_frame)
+        button_frame.pack(fill=tk.X)
+        
+        ttk.Button(button_frame, text="📋 UID kopieren", 
+                  command=lambda: self.copy_to_clipboard(self.current_uid),
+                  style="Accent.TButton").pack(side=tk.LEFT)
+        
+        # Info Text
+        info_text = """Dieser NFC Tag ist nicht in der Datenbank registriert.
+
+Nächste Schritte:
+1. UID in die Zwischenablage kopieren  
+2. Web-App öffnen und neue Spule anlegen
+3. NFC UID in das entsprechende Feld eintragen"""
+        
+        ttk.Label(self.unknown_frame, text=info_text, foreground="gray", justify=tk.LEFT).pack(pady=20)
         
     def setup_history_tab(self):
         """Tab für Scan-Historie einrichten"""
+        # Suche nach UID oder Material (Präfix)
+        search_frame = ttk.Frame(self.history_frame)
+        search_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+        search_frame.columnconfigure(1, weight=1)
+        
+        ttk.Label(search_frame, text="🔍 Suche (UID/Material):").grid(row=0, column=0, sticky=tk.W, padx=(0, 10))
+        self.history_search_var = tk.StringVar()
+        ttk.Entry(search_frame, textvariable=self.history_search_var).grid(row=0, column=1, sticky=(tk.W, tk.E))
+        self.history_search_var.trace_add('write', lambda *args: self.schedule_history_search())
+        
         # Treeview für Historie
         columns = ("Zeit", "NFC UID", "Status", "Material")
         self.history_tree = ttk.Treeview(self.history_frame, columns=columns, show="headings", height=15)
@@ -189,37 +321,211 @@ class NFCScannerGUI:
         self.history_tree.column("Status", width=80)
         self.history_tree.column("Material", width=200)
         
-        # Scrollbar
-        history_scroll = ttk.Scrollbar(self.history_frame, orient=tk.VERTICAL, command=self.history_tree.yview)
-        self.history_tree.configure(yscrollcommand=history_scroll.set)
+        # Scrollbar - Scrollen an den Rand lädt weitere Einträge nach
+        self.history_scroll = ttk.Scrollbar(self.history_frame, orient=tk.VERTICAL, command=self.history_tree.yview)
+        self.history_tree.configure(yscrollcommand=self.on_history_scroll)
         
         # Grid
-        self.history_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        history_scroll.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.history_tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.history_scroll.grid(row=1, column=1, sticky=(tk.N, tk.S))
         
         self.history_frame.columnconfigure(0, weight=1)
-        self.history_frame.rowconfigure(0, weight=1)
+        self.history_frame.rowconfigure(1, weight=1)
         
         # Double-click event
         self.history_tree.bind("<Double-1>", self.on_history_double_click)
         
+        self.reload_history()
+    
+    def history_values(self, entry: Dict[str, Any]) -> tuple:
+        """Treeview-Zeile für einen Historien-Eintrag"""
+        scanned_at = time.localtime(entry['scanned_at'])
+        if time.strftime("%Y%m%d", scanned_at) == time.strftime("%Y%m%d"):
+            timestamp = time.strftime("%H:%M:%S", scanned_at)
+        else:
+            timestamp = time.strftime("%d.%m. %H:%M", scanned_at)
+        return (timestamp, entry['nfc_uid'], entry['status'], entry['material'] or "-")
+    
+    def add_history(self, nfc_uid: str, status: str, material: str = '', spool_id=None):
+        """Scan speichern und oben einfügen, falls das Fenster gerade die neuesten Einträge zeigt"""
+        entry = self.history.add(nfc_uid, status, material, spool_id)
+        
+        if self.history_at_top and self.history.matches(entry, self.history_query):
+            self.history_tree.insert("", 0, iid=str(entry['id']), values=self.history_values(entry))
+            self.trim_history(from_top=False)
+    
+    def reload_history(self):
+        """Fenster mit den neuesten Einträgen (der aktuellen Suche) neu aufbauen"""
+        self.history_tree.delete(*self.history_tree.get_children())
+        
+        entries = self.history.older(None, HISTORY_PAGE, self.history_query)
+        for entry in entries:
+            self.history_tree.insert("", tk.END, iid=str(entry['id']), values=self.history_values(entry))
+        
+        self.history_at_top = True
+        self.history_exhausted = len(entries) < HISTORY_PAGE
+    
+    def schedule_history_search(self):
+        """Suche entprellen - erst nach kurzer Tipp-Pause abfragen"""
+        if self.history_search_job is not None:
+            self.root.after_cancel(self.history_search_job)
+        self.history_search_job = self.root.after(250, self.run_history_search)
+    
+    def run_history_search(self):
+        self.history_search_job = None
+        self.history_query = self.history_search_var.get().strip()
+        self.reload_history()
+        
+        if self.history_query:
+            self.update_footer(f"🔍 {self.history.count(self.history_query)} Treffer für '{self.history_query}'")
+    
+    def on_history_scroll(self, first: str, last: str):
+        """Scrollbar aktualisieren und am Rand des Fensters nachladen"""
+        self.history_scroll.set(first, last)
+        if self.history_loading:
+            return
+        
+        if float(last) >= 1.0 and not self.history_exhausted:
+            self.history_loading = True
+            self.root.after_idle(self.load_older_history)
+        elif float(first) <= 0.0 and not self.history_at_top:
+            self.history_loading = True
+            self.root.after_idle(self.load_newer_history)
+    
+    def load_older_history(self):
+        """Nächste ältere Seite unten anhängen, oben überzählige Zeilen entfernen"""
+        try:
+            children = self.history_tree.get_children()
+            before_id = int(children[-1]) if children else None
+            entries = self.history.older(before_id, HISTORY_PAGE, self.history_query)
+            
+            for entry in entries:
+                self.history_tree.insert("", tk.END, iid=str(entry['id']), values=self.history_values(entry))
+            self.history_exhausted = len(entries) < HISTORY_PAGE
+            self.trim_history(from_top=True)
+        finally:
+            self.history_loading = False
+    
+    def load_newer_history(self):
+        """Nächste neuere Seite oben einfügen, unten überzählige Zeilen entfernen"""
+        try:
+            children = self.history_tree.get_children()
+            if not children:
+                self.reload_history()
+                return
+            
+            entries = self.history.newer(int(children[0]), HISTORY_PAGE, self.history_query)
+            for entry in reversed(entries):
+                self.history_tree.insert("", 0, iid=str(entry['id']), values=self.history_values(entry))
+            # Sichtbare Zeilen bleiben an ihrer Position
+            self.history_tree.yview_scroll(len(entries), 'units')
+            
+            self.history_at_top = len(entries) < HISTORY_PAGE
+            self.trim_history(from_top=False)
+        finally:
+            self.history_loading = False
+    
+    def trim_history(self, from_top: bool):
+        """Treeview auf history_window Zeilen begrenzen - der Rest bleibt in SQLite"""
+        children = self.history_tree.get_children()
+        excess = len(children) - self.history_window
+        if excess <= 0:
+            return
+        
+        if from_top:
+            self.history_tree.delete(*children[:excess])
+            self.history_tree.yview_scroll(-excess, 'units')
+            self.history_at_top = False
+        else:
+            self.history_tree.delete(*children[-excess:])
+            self.history_exhausted = False
+    
+    def config_value(self, key: str, default: int) -> int:
+        return config_int(self.config, key, default)
+    
     def setup_scanner(self):
         """Scanner initialisieren"""
-        if PYSCARD_AVAILABLE:
-            from acr122u_scanner import ACR122UNFCScanner
+        from filament_scanner.reader_backend import backend_available
+        
+        if backend_available(self.config):
+            from filament_scanner.core import ACR122UNFCScanner
             self.scanner = ACR122UNFCScanner(
                 self.config['API_URL'], 
-                self.config['SCANNER_ID']
+                self.config['SCANNER_ID'],
+                self.config['ACQUISITION_MODE'],
+                self.config
             )
             
-            # Reader Status prüfen
-            if self.scanner.connect_reader():
-                self.reader_label.config(text="ACR122U verbunden ✅", foreground="green")
-            else:
-                self.reader_label.config(text="ACR122U nicht gefunden ❌", foreground="red")
+            # Verbindung zur API vorwärmen, Offline-Journal öffnen, Katalog laden, Änderungen abonnieren
+            self.scanner.start_warm_up()
+            self.scanner.start_journal()
+            self.scanner.start_catalog()
+            self.scanner.start_change_stream()
+            self.scanner.start_breaker_probe()
+            self.scanner.start_coalescer()
+            self.scanner.start_metrics_reporter()
+            
+            # /metrics für Prometheus (METRICS_PORT=0 → aus)
+            metrics_port = self.config_value('METRICS_PORT', 0)
+            if metrics_port > 0:
+                from filament_scanner.scan_service import ScanService
+                self.metrics_service = ScanService(self.scanner, self.config.get('DAEMON_HOST', '127.0.0.1'), metrics_port)
+                self.metrics_service.start()
+            
+            # Reader verbinden; Ausfälle behebt die Überwachung im Hintergrund
+            self.scanner.connect_reader()
+            self.scanner.start_supervisor()
+            self.refresh_reader_status()
         else:
             self.reader_label.config(text="pyscard nicht installiert ❌", foreground="red")
     
+    def refresh_reader_status(self):
+        """Reader-Status inklusive Wiederverbindungen anzeigen (alle 2 Sekunden)"""
+        try:
+            stats = self.scanner.reader_stats()
+            
+            if stats['state'] == 'down':
+                self.reader_label.config(
+                    text=f"Reader getrennt - Wiederverbindung läuft ({stats['current_downtime']:.0f}s) ⚠️",
+                    foreground="red"
+                )
+            else:
+                # reconnect_reader() setzt reader_manager zwischendurch auf None
+                reader_manager = self.scanner.reader_manager
+                if reader_manager is not None:
+                    text = f"{len(reader_manager.reader_names())} Reader verbunden ✅"
+                else:
+                    text = "ACR122U verbunden ✅"
+                if stats['reconnects']:
+                    text += f"  ({stats['reconnects']}× wiederverbunden, {stats['total_downtime']:.0f}s Ausfall)"
+                self.reader_label.config(text=text, foreground="green")
+            
+            self.refresh_api_status()
+        finally:
+            # Auch nach einem Fehler weiter aktualisieren
+            self.root.after(2000, self.refresh_reader_status)
+    
+    def refresh_api_status(self):
+        """Bevorzugten Endpunkt und Zustand der Circuit Breaker in der API-Zeile anzeigen"""
+        circuit = self.scanner.lookup_client.endpoints.stats()
+        api_url = circuit['preferred']
+        
+        if circuit['state'] == 'open':
+            self.api_label.config(
+                text=f"{api_url} - nicht erreichbar, nächster Versuch in {circuit['retry_in']:.0f}s ⛔",
+                foreground="red"
+            )
+        elif circuit['state'] == 'half_open':
+            self.api_label.config(text=f"{api_url} - wird geprüft ⏳", foreground="orange")
+        else:
+            endpoints = circuit['endpoints']
+            if len(endpoints) > 1:
+                # Mehrere Endpunkte: Latenz des bevorzugten und wie viele erreichbar sind
+                available = sum(1 for endpoint in endpoints if endpoint['circuit']['state'] == 'closed')
+                latency = next(endpoint['latency_ms'] for endpoint in endpoints if endpoint['url'] == api_url)
+                api_url += f"  ({latency or 0:.0f} ms, {available}/{len(endpoints)} Endpunkte erreichbar)"
+            self.api_label.config(text=api_url, foreground="blue")
+    
     def toggle_scanning(self):
         """Scanning starten/stoppen"""
         if not self.scanning:
@@ -229,7 +535,7 @@ class NFCScannerGUI:
     
     def start_scanning(self):
         """Scanning starten"""
-        if not PYSCARD_AVAILABLE or not self.scanner:
+        if not self.scanner:
             messagebox.showerror("Fehler", "Scanner nicht verfügbar!\n\nInstallieren Sie pyscard:\npip install pyscard")
             return
         
@@ -238,74 +544,91 @@ class NFCScannerGUI:
         self.status_label.config(text="Scanning aktiv...", foreground="green")
         self.footer_label.config(text="🔍 Scanning läuft - halten Sie NFC Tags an den Reader")
         
-        # Scanning in eigenem Thread
-        self.scan_thread = threading.Thread(target=self.scan_loop, daemon=True)
-        self.scan_thread.start()
+        # asyncio Scanner-Kern; Ergebnisse holt poll_engine() im Tk Main Thread ab
+        from filament_scanner.scan_engine import AsyncScanEngine
+        
+        if self.engine:
+            # Vorherige Engine muss den Reader erst freigeben
+            self.engine.stop(wait=True)
+        
+        self.engine = AsyncScanEngine(self.scanner, config_int(self.config, 'MAX_IN_FLIGHT_LOOKUPS', 4))
+        self.engine.start()
+        self.poll_engine(self.engine)
     
     def stop_scanning(self):
         """Scanning stoppen"""
         self.scanning = False
+        if self.engine:
+            self.engine.stop()
         self.start_button.config(text="▶️ Scanner starten")
         self.status_label.config(text="Bereit", foreground="orange")
         self.footer_label.config(text="Scanner gestoppt")
     
-    def scan_loop(self):
-        """Haupt-Scanning-Schleife"""
-        last_uid = None
-        scan_count = 0
-        
-        while self.scanning:
-            try:
-                nfc_uid = self.scanner.read_nfc_uid()
-                
-                if nfc_uid and nfc_uid != last_uid:
-                    scan_count += 1
-                    
-                    # GUI Update in Main Thread
-                    self.root.after(0, lambda: self.handle_nfc_scan(nfc_uid, scan_count))
-                    
-                    last_uid = nfc_uid
-                
-                elif nfc_uid is None and last_uid is not None:
-                    # Tag entfernt
-                    last_uid = None
-                    self.root.after(0, lambda: self.update_footer("Tag entfernt - bereit für nächsten Scan"))
-                
-                time.sleep(0.3)
-                
-            except Exception as e:
+    def poll_engine(self, engine):
+        """Ergebnisse der Scan-Engine im Main Thread verarbeiten"""
+        for kind, data in engine.drain():
+            if kind == 'scan':
+                self.handle_nfc_scan(data['uid'], data['number'])
+            elif kind == 'tag':
+                # Spulen-Daten direkt vom Tag - ohne Server-Roundtrip
+                self.display_scan_result(data['uid'], data['result'], data['number'], data.get('detected_at'))
+            elif kind == 'result':
+                self.display_lookup_result(data)
+            elif kind == 'removed':
+                self.update_footer("Tag entfernt - bereit für nächsten Scan")
+            elif kind == 'error':
                 if self.scanning:  # Nur Fehler zeigen wenn wir noch scannen
-                    self.root.after(0, lambda: messagebox.showerror("Scanner Fehler", str(e)))
-                break
+                    messagebox.showerror("Scanner Fehler", data['message'])
+                    self.stop_scanning()
+            elif kind == 'stopped':
+                summary = self.render_summary()
+                self.update_footer(f"Scanning beendet - {data['scan_count']} Scans durchgeführt"
+                                   + (f" | {summary}" if summary else ""))
+                if self.engine is engine:
+                    self.engine = None
+                return
+        
+        self.root.after(50, lambda: self.poll_engine(engine))
+    
+    def display_lookup_result(self, data: Dict[str, Any]):
+        """Server-Ergebnis anzeigen - nach Tag-Anzeige nur bei Abweichung"""
+        result = data['result']
+        
+        if not data.get('tag_shown'):
+            self.display_scan_result(data['uid'], result, data['number'], data.get('detected_at'))
+            return
         
-        # Cleanup
-        self.root.after(0, lambda: self.update_footer(f"Scanning beendet - {scan_count} Scans durchgeführt"))
+        reconcile = data.get('reconcile') or {}
+        if 'error' in result:
+            self.update_footer(f"📱 Daten vom Tag - Server nicht erreichbar, Scan {data['uid']} wird nachgereicht")
+        elif not result.get('found'):
+            self.display_scan_result(data['uid'], result, data['number'])
+        elif reconcile.get('changed'):
+            self.display_scan_result(data['uid'], result, data['number'])
+            if reconcile.get('written'):
+                self.update_footer(f"✏️ Tag aktualisiert: {', '.join(reconcile['changed'])}")
+        else:
+            self.update_footer("✅ Tag-Daten vom Server bestätigt")
     
     def handle_nfc_scan(self, nfc_uid: str, scan_number: int):
-        """NFC Scan verarbeiten"""
+        """NFC Scan verarbeiten - der Lookup läuft bereits in der Engine"""
         self.update_footer(f"📡 Scan #{scan_number} - Lade Daten...")
-        
-        # API Anfrage in eigenem Thread
-        threading.Thread(
-            target=self.api_lookup, 
-            args=(nfc_uid, scan_number), 
-            daemon=True
-        ).start()
-    
-    def api_lookup(self, nfc_uid: str, scan_number: int):
-        """API Lookup in separatem Thread"""
-        try:
-            result = self.scanner.send_to_api(nfc_uid)
-            
-            # GUI Update zurück im Main Thread
-            self.root.after(0, lambda: self.display_scan_result(nfc_uid, result, scan_number))
-            
-        except Exception as e:
-            self.root.after(0, lambda: self.display_error(f"API Fehler: {e}"))
     
-    def display_scan_result(self, nfc_uid: str, result: Dict[str, Any], scan_number: int):
+    def display_scan_result(self, nfc_uid: str, result: Dict[str, Any], scan_number: int,
+                            detected_at: Optional[float] = None):
         """Scan-Ergebnis anzeigen"""
-        timestamp = time.strftime("%H:%M:%S")
+        started = time.perf_counter()
+        
+        if 'error' in result:
+            # API nicht erreichbar - Scan liegt im Journal
+            status = "📦 Gespeichert" if result.get('queued') else "❌ Fehler"
+            self.add_history(nfc_uid, status)
+            
+            if result.get('queued'):
+                self.update_footer(f"📦 API nicht erreichbar - Scan {nfc_uid} wird nachgereicht")
+            else:
+                self.update_footer(f"❌ API Fehler: {result['error']}")
+            return
         
         if result.get('found'):
             # Spule gefunden
@@ -313,9 +636,7 @@ class NFCScannerGUI:
             self.show_spool_info(spool, nfc_uid, result)
             
             # Historie hinzufügen
-            self.history_tree.insert("", 0, values=(
-                timestamp, nfc_uid, "✅ Gefunden", spool.get('material', 'N/A')
-            ))
+            self.add_history(nfc_uid, "✅ Gefunden", spool.get('material', 'N/A'), spool.get('id'))
             
             self.update_footer(f"✅ Spule gefunden - {spool.get('material', 'N/A')}")
             self.play_success_sound()
@@ -325,153 +646,108 @@ class NFCScannerGUI:
             self.show_unknown_tag(nfc_uid)
             
             # Historie hinzufügen
-            self.history_tree.insert("", 0, values=(
-                timestamp, nfc_uid, "❓ Unbekannt", "-"
-            ))
+            self.add_history(nfc_uid, "❓ Unbekannt")
             
             self.update_footer(f"❓ Unbekannte NFC UID: {nfc_uid}")
             self.play_unknown_sound()
         
         # Zum aktuellen Tab wechseln
         self.notebook.select(0)
+        self.record_render(started, detected_at)
     
     def show_spool_info(self, spool: Dict[str, Any], nfc_uid: str, result: Dict[str, Any] = None):
-        """Spule-Informationen anzeigen"""
-        # Verstecke "Warten auf Tag" Frame
-        self.no_spool_frame.grid_remove()
-        
-        # Setup Spool Info Frame
-        self.spool_info_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=20, pady=20)
-        
-        # Clear previous content
-        for widget in self.spool_info_frame.winfo_children():
-            widget.destroy()
-        
-        # Header
-        header = ttk.Label(self.spool_info_frame, text="🎯 SPULE GEFUNDEN!", 
-                          font=('Segoe UI', 16, 'bold'), foreground="green")
-        header.pack(pady=(0, 20))
-        
-        # Info Grid
-        info_frame = ttk.Frame(self.spool_info_frame)
-        info_frame.pack(fill=tk.X, pady=(0, 20))
-        
-        row = 0
-        for label, value, icon in [
-            ("ID", spool.get('id', 'N/A'), "🏷️"),
-            ("Material", spool.get('material', 'N/A'), "🎨"),
-            ("Typ", spool.get('filament_type', 'N/A'), "🔧"),
-            ("Farbe", spool.get('color_name', 'Nicht angegeben'), "🌈"),
-            ("Gewicht", f"{spool.get('remaining_weight', 0)}g / {spool.get('total_weight', 0)}g", "⚖️"),
-            ("Standort", spool.get('location', 'Nicht angegeben'), "📍"),
-            ("NFC UID", nfc_uid, "📱")
-        ]:
-            ttk.Label(info_frame, text=f"{icon} {label}:", font=('Segoe UI', 10, 'bold')).grid(
-                row=row, column=0, sticky=tk.W, padx=(0, 20), pady=5
-            )
-            ttk.Label(info_frame, text=str(value), font=('Segoe UI', 10)).grid(
-                row=row, column=1, sticky=tk.W, pady=5
-            )
-            row += 1
+        """Spule-Informationen anzeigen - vorhandene Widgets werden nur aktualisiert"""
+        result = result or {}
+        self.current_spool_id = spool.get('id')
+        self.current_uid = nfc_uid
+        
+        if result.get('from_tag'):
+            source = " (vom Tag)"
+        elif result.get('from_mirror'):
+            source = " (Katalog)"
+        elif result.get('stale'):
+            source = " (Cache, offline)"
+        else:
+            source = ""
+        values = self.spool_vars
+        values['header'].set(f"🎯 SPULE GEFUNDEN!{source}")
+        values['id'].set(str(spool.get('id', 'N/A')))
+        values['material'].set(str(spool.get('material', 'N/A')))
+        values['filament_type'].set(str(spool.get('filament_type', 'N/A')))
+        values['color_name'].set(str(spool.get('color_name', 'Nicht angegeben')))
+        values['weight'].set(f"{spool.get('remaining_weight', 0)}g / {spool.get('total_weight', 0)}g")
+        values['location'].set(str(spool.get('location', 'Nicht angegeben')))
+        values['nfc_uid'].set(nfc_uid)
         
         # NFC-Tag Details (Multiple NFC-UIDs System)
         nfc_info = result.get('nfc_info', {})
         if nfc_info:
-            # Separator
-            separator = ttk.Separator(info_frame, orient='horizontal')
-            separator.grid(row=row, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=10)
-            row += 1
-            
-            # NFC Tag Info Header
-            ttk.Label(info_frame, text="📋 NFC-Tag Informationen:", font=('Segoe UI', 11, 'bold')).grid(
-                row=row, column=0, columnspan=2, sticky=tk.W, pady=(5, 10)
-            )
-            row += 1
-            
-            # NFC Tag Details
-            for label, value, icon in [
-                ("Tag-Typ", nfc_info.get('tag_type', 'N/A'), "🏷️"),
-                ("Position", nfc_info.get('tag_position', 'N/A'), "📍"),
-                ("Primärer Tag", "✅ Ja" if nfc_info.get('is_primary') else "❌ Nein", "⭐")
-            ]:
-                ttk.Label(info_frame, text=f"  {icon} {label}:", font=('Segoe UI', 9)).grid(
-                    row=row, column=0, sticky=tk.W, padx=(20, 20), pady=2
-                )
-                ttk.Label(info_frame, text=str(value), font=('Segoe UI', 9)).grid(
-                    row=row, column=1, sticky=tk.W, pady=2
-                )
-                row += 1
+            values['tag_type'].set(str(nfc_info.get('tag_type', 'N/A')))
+            values['tag_position'].set(str(nfc_info.get('tag_position', 'N/A')))
+            values['is_primary'].set("✅ Ja" if nfc_info.get('is_primary') else "❌ Nein")
+            self.nfc_info_frame.grid()
+        else:
+            self.nfc_info_frame.grid_remove()
         
         # Progress Bar für Gewicht
         remaining = spool.get('remaining_weight', 0)
         total = spool.get('total_weight', 1)
         percentage = (remaining / total) * 100 if total > 0 else 0
+        self.spool_progress.config(value=percentage)
+        values['percentage'].set(f"{percentage:.1f}%")
         
-        ttk.Label(info_frame, text="📊 Verbrauch:", font=('Segoe UI', 10, 'bold')).grid(
-            row=row, column=0, sticky=tk.W, padx=(0, 20), pady=5
-        )
-        
-        progress_frame = ttk.Frame(info_frame)
-        progress_frame.grid(row=row, column=1, sticky=(tk.W, tk.E), pady=5)
-        
-        progress = ttk.Progressbar(progress_frame, length=200, mode='determinate', value=percentage)
-        progress.pack(side=tk.LEFT, padx=(0, 10))
-        
-        ttk.Label(progress_frame, text=f"{percentage:.1f}%").pack(side=tk.LEFT)
-        
-        # Buttons
-        button_frame = ttk.Frame(self.spool_info_frame)
-        button_frame.pack(fill=tk.X, pady=20)
-        
-        ttk.Button(button_frame, text="🌐 In Browser öffnen", 
-                  command=lambda: self.open_in_browser(spool.get('id'))).pack(side=tk.LEFT, padx=(0, 10))
-        
-        ttk.Button(button_frame, text="📋 NFC UID kopieren", 
-                  command=lambda: self.copy_to_clipboard(nfc_uid)).pack(side=tk.LEFT, padx=(0, 10))
+        self.show_current_view(self.spool_info_frame)
     
     def show_unknown_tag(self, nfc_uid: str):
         """Unbekannten Tag anzeigen"""
-        # Verstecke "Warten auf Tag" Frame
-        self.no_spool_frame.grid_remove()
-        
-        # Setup Spool Info Frame
-        self.spool_info_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=20, pady=20)
-        
-        # Clear previous content
-        for widget in self.spool_info_frame.winfo_children():
-            widget.destroy()
-        
-        # Header
-        header = ttk.Label(self.spool_info_frame, text="❓ UNBEKANNTER NFC TAG", 
-                          font=('Segoe UI', 16, 'bold'), foreground="orange")
-        header.pack(pady=(0, 20))
-        
-        # NFC UID
-        uid_frame = ttk.LabelFrame(self.spool_info_frame, text="📱 NFC Unique ID", padding="15")
-        uid_frame.pack(fill=tk.X, pady=(0, 20))
-        
-        uid_text = tk.Text(uid_frame, height=2, font=('Consolas', 12), wrap=tk.WORD)
-        uid_text.insert(tk.END, nfc_uid)
-        uid_text.config(state=tk.DISABLED)
-        uid_text.pack(fill=tk.X, pady=(0, 10))
+        self.current_spool_id = None
+        self.current_uid = nfc_uid
         
-        # Buttons
-        button_frame = ttk.Frame(uid_frame)
-        button_frame.pack(fill=tk.X)
+        self.unknown_uid_text.config(state=tk.NORMAL)
+        self.unknown_uid_text.delete('1.0', tk.END)
+        self.unknown_uid_text.insert(tk.END, nfc_uid)
+        self.unknown_uid_text.config(state=tk.DISABLED)
         
-        ttk.Button(button_frame, text="📋 UID kopieren", 
-                  command=lambda: self.copy_to_clipboard(nfc_uid),
-                  style="Accent.TButton").pack(side=tk.LEFT)
-        
-        # Info Text
-        info_text = """Dieser NFC Tag ist nicht in der Datenbank registriert.
-
-Nächste Schritte:
-1. UID in die Zwischenablage kopieren  
-2. Web-App öffnen und neue Spule anlegen
-3. NFC UID in das entsprechende Feld eintragen"""
+        self.show_current_view(self.unknown_frame)
+    
+    def show_current_view(self, frame):
+        """Eine der vorbereiteten Ansichten im Tab "Aktueller Scan" einblenden"""
+        if self.visible_view is frame:
+            return
         
-        ttk.Label(self.spool_info_frame, text=info_text, foreground="gray", justify=tk.LEFT).pack(pady=20)
+        for view in (self.no_spool_frame, self.spool_info_frame, self.unknown_frame):
+            if view is not frame:
+                view.grid_remove()
+        frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=20, pady=20)
+        self.visible_view = frame
+    
+    def record_render(self, started: float, detected_at: Optional[float] = None):
+        """Anzeigezeit messen - after_idle läuft erst nach dem Neuzeichnen"""
+        def done():
+            now = time.perf_counter()
+            self.render_times.append((now - started) * 1000)
+            if detected_at is not None:
+                self.scan_to_screen.append((now - detected_at) * 1000)
+            if self.scanner:
+                self.scanner.metrics.observe('gui_render', (now - started) * 1000)
+                if detected_at is not None:
+                    self.scanner.metrics.observe('scan_to_screen', (now - detected_at) * 1000)
+        
+        self.root.after_idle(done)
+    
+    def render_summary(self) -> str:
+        """Median/p95 der Anzeigezeiten, z.B. für den Footer"""
+        if not self.render_times:
+            return ""
+        
+        import statistics
+        parts = []
+        for name, samples in (("Anzeige", self.render_times), ("Scan→Anzeige", self.scan_to_screen)):
+            if samples:
+                ordered = sorted(samples)
+                p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+                parts.append(f"{name} p50 {statistics.median(ordered):.1f} ms / p95 {p95:.1f} ms")
+        return " | ".join(parts)
     
     def show_settings(self):
         """Einstellungen Dialog"""
@@ -512,6 +788,7 @@ Nächste Schritte:
             self.config['API_URL'] = api_var.get()
             self.config['SCANNER_ID'] = id_var.get()
             self.config['ENABLE_SOUND'] = '1' if sound_var.get() else '0'
+            self.audio.enabled = sound_var.get()
             
             # Config speichern
             try:
@@ -528,12 +805,11 @@ Nächste Schritte:
     def clear_results(self):
         """Ergebnisse löschen"""
         # Current tab zurücksetzen
-        self.spool_info_frame.grid_remove()
-        self.no_spool_frame.grid()
+        self.show_current_view(self.no_spool_frame)
         
-        # Historie löschen
-        for item in self.history_tree.get_children():
-            self.history_tree.delete(item)
+        # Historie löschen (Speicher und Datenbank)
+        self.history.clear()
+        self.reload_history()
         
         self.update_footer("Ergebnisse gelöscht")
     
@@ -545,7 +821,12 @@ Nächste Schritte:
     
     def open_in_browser(self, spool_id: str):
         """Spule in Browser öffnen"""
-        url = f"{self.config['API_URL']}/spools?id={spool_id}"
+        import webbrowser
+        if self.scanner:
+            api_url = self.scanner.api_url_base
+        else:
+            api_url = self.config['API_URL'].split(',')[0].strip().rstrip('/')
+        url = f"{api_url}/spools?id={spool_id}"
         webbrowser.open(url)
     
     def update_footer(self, message: str):
@@ -559,24 +840,11 @@ Nächste Schritte:
     
     def play_success_sound(self):
         """Erfolgssound abspielen"""
-        if self.config.get('ENABLE_SOUND', '1') == '1':
-            try:
-                import winsound
-                winsound.Beep(1000, 200)
-                winsound.Beep(1200, 200)
-            except:
-                pass
+        self.audio.play('success')
     
     def play_unknown_sound(self):
         """Unbekannt-Sound abspielen"""
-        if self.config.get('ENABLE_SOUND', '1') == '1':
-            try:
-                import winsound
-                winsound.Beep(800, 300)
-                winsound.Beep(600, 300)
-                winsound.Beep(400, 300)
-            except:
-                pass
+        self.audio.play('unknown')
     
     def on_history_double_click(self, event):
         """Historie Doppelklick"""
@@ -589,7 +857,17 @@ Nächste Schritte:
     def on_closing(self):
         """App schließen"""
         self.scanning = False
-        time.sleep(0.5)  # Kurz warten
+        if self.engine:
+            # Lookups abbrechen und auf das Ende der Engine warten
+            self.engine.stop(wait=True)
+            self.engine = None
+        if self.metrics_service:
+            self.metrics_service.stop()
+        if self.scanner:
+            self.scanner.close()
+        self.audio.close()
+        self.history.close()
+        self.log_pipeline.stop()
         self.root.destroy()
     
     def run(self):
@@ -605,101 +883,6 @@ Nächste Schritte:
         
         self.root.mainloop()
 
-# Importiere das originale Scanner-Modul
-class ACR122UNFCScanner:
-    def __init__(self, api_url: str, scanner_id: str = "acr122u_001"):
-        self.api_url_base = api_url.rstrip('/')
-        self.scanner_id = scanner_id
-        self.running = False
-        self.reader = None
-        self.connection = None
-        
-    def find_acr122u_reader(self) -> Optional[str]:
-        """ACR122U Reader finden"""
-        try:
-            available_readers = readers()
-            
-            for reader in available_readers:
-                reader_name = str(reader).lower()
-                if any(keyword in reader_name for keyword in ['acr122', 'acr 122', 'nfc']):
-                    return reader
-            
-            if available_readers:
-                return available_readers[0]
-            
-            return None
-            
-        except Exception as e:
-            return None
-    
-    def connect_reader(self) -> bool:
-        """Verbindung zum ACR122U herstellen"""
-        try:
-            self.reader = self.find_acr122u_reader()
-            return self.reader is not None
-        except Exception as e:
-            return False
-    
-    def read_nfc_uid(self) -> Optional[str]:
-        """NFC UID vom NTAG lesen"""
-        if not self.reader:
-            return None
-        
-        try:
-            cardtype = AnyCardType()
-            cardrequest = CardRequest(timeout=1, cardType=cardtype, readers=[self.reader])
-            
-            cardservice = cardrequest.waitforcard()
-            cardservice.connection.connect()
-            
-            GET_UID = [0xFF, 0xCA, 0x00, 0x00, 0x00]
-            response, sw1, sw2 = cardservice.connection.transmit(GET_UID)
-            
-            if sw1 == 0x90 and sw2 == 0x00:
-                uid = toHexString(response).replace(' ', '').upper()
-                cardservice.connection.disconnect()
-                return uid
-            else:
-                cardservice.connection.disconnect()
-                return None
-                
-        except (CardRequestTimeoutException, NoCardException):
-            return None
-        except Exception as e:
-            return None
-    
-    def send_to_api(self, nfc_uid: str) -> Dict[str, Any]:
-        """NFC UID über API lookup"""
-        try:
-            api_url = f"{self.api_url_base}/nfc_lookup.php"
-            
-            data = {
-                'nfc_uid': nfc_uid,
-                'scanner_id': self.scanner_id,
-                'timestamp': int(time.time()),
-                'reader_type': 'ACR122U'
-            }
-            
-            headers = {
-                'Content-Type': 'application/json',
-                'User-Agent': f'ACR122U-Scanner/{self.scanner_id}'
-            }
-            
-            response = requests.post(
-                api_url,
-                json=data,
-                headers=headers,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {'error': f'HTTP {response.status_code}'}
-                
-        except requests.RequestException as e:
-            return {'error': str(e)}
-
 def main():
     """Hauptfunktion"""
     app = NFCScannerGUI()
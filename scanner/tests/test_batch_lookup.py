@@ -0,0 +1,89 @@
+from filament_scanner.batch_lookup import LookupCoalescer, MAX_BATCH_SIZE
+
+
+def echo_batches(batches):
+    def send_batch(scans):
+        batches.append([scan['nfc_uid'] for scan in scans])
+        return [{'found': True, 'nfc_uid': scan['nfc_uid']} for scan in scans]
+    return send_batch
+
+
+def test_concurrent_lookups_share_one_request():
+    batches = []
+    coalescer = LookupCoalescer(echo_batches(batches), window=0.2)
+    futures = [coalescer.submit(uid) for uid in ('A', 'B', 'C')]
+    coalescer.start()
+    
+    try:
+        results = [future.result(timeout=5) for future in futures]
+    finally:
+        coalescer.stop()
+    
+    assert batches == [['A', 'B', 'C']]
+    assert [result['nfc_uid'] for result in results] == ['A', 'B', 'C']
+
+
+def test_batch_size_limited():
+    batches = []
+    coalescer = LookupCoalescer(echo_batches(batches), window=0.2, max_batch=2)
+    futures = [coalescer.submit(uid) for uid in ('A', 'B', 'C')]
+    coalescer.start()
+    
+    try:
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        coalescer.stop()
+    
+    assert batches == [['A', 'B'], ['C']]
+    assert LookupCoalescer(echo_batches([]), max_batch=10000).max_batch == MAX_BATCH_SIZE
+
+
+def test_failed_batch_reported_to_every_lookup():
+    def send_batch(scans):
+        raise RuntimeError('Verbindung verloren')
+    
+    coalescer = LookupCoalescer(send_batch, window=0.05)
+    futures = [coalescer.submit(uid) for uid in ('A', 'B')]
+    coalescer.start()
+    
+    try:
+        assert [future.result(timeout=5) for future in futures] == [{'error': 'Verbindung verloren'}] * 2
+    finally:
+        coalescer.stop()
+
+
+def test_stopped_coalescer_answers_immediately():
+    coalescer = LookupCoalescer(echo_batches([]))
+    pending = coalescer.submit('A')
+    coalescer.stop_event.set()
+    coalescer.drain()
+    
+    assert pending.result(timeout=1) == {'error': 'Scanner wird beendet'}
+    assert coalescer.submit('B').result(timeout=1) == {'error': 'Scanner wird beendet'}
+
+
+def test_stop_resolves_lookups_the_thread_never_saw():
+    coalescer = LookupCoalescer(echo_batches([]))
+    pending = coalescer.submit('A')
+    
+    # Thread nie gestartet - stop() darf den Lookup trotzdem nicht hängen lassen
+    coalescer.stop()
+    assert pending.result(timeout=1) == {'error': 'Scanner wird beendet'}
+
+
+def test_failed_batch_results_are_separate_objects():
+    def send_batch(scans):
+        raise RuntimeError('Verbindung verloren')
+    
+    coalescer = LookupCoalescer(send_batch, window=0.05)
+    futures = [coalescer.submit(uid) for uid in ('A', 'B')]
+    coalescer.start()
+    
+    try:
+        first, second = [future.result(timeout=5) for future in futures]
+    finally:
+        coalescer.stop()
+    
+    first['stale'] = True
+    assert 'stale' not in second
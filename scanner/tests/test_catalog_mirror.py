@@ -0,0 +1,90 @@
+import pytest
+
+from filament_scanner.catalog_mirror import CatalogMirror
+from filament_scanner.fake_lookup_server import FakeLookupServer, catalog_uid, fake_spool
+from filament_scanner.lookup_client import LookupClient
+
+CONFIG = {'HTTP_RETRIES': '0', 'HTTP_CONNECT_TIMEOUT': '1', 'HTTP_READ_TIMEOUT': '2'}
+
+
+@pytest.fixture
+def server():
+    server = FakeLookupServer(latency_ms=0, jitter_ms=0, catalog_size=5).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def mirror(server):
+    client = LookupClient(server.url, 'test', CONFIG)
+    yield CatalogMirror(client.fetch_catalog)
+    client.close()
+
+
+def catalog_entry(nfc_uid, spool_id, active=True):
+    return {
+        'nfc_uid': nfc_uid,
+        'active': active,
+        'spool': {'id': spool_id},
+        'nfc_info': {'nfc_uid': nfc_uid}
+    }
+
+
+def test_delta_merges_new_and_inactive(server, mirror):
+    assert mirror.sync()
+    assert mirror.stats()['size'] == 5
+    
+    server.change_catalog('04AAAAAA')
+    server.change_catalog(catalog_uid(1), active=False)
+    assert mirror.sync()
+    
+    stats = mirror.stats()
+    assert (stats['full_syncs'], stats['delta_syncs']) == (1, 1)
+    assert stats['last_sync_rows'] == 2
+    assert mirror.lookup('04aaaaaa')['spool']['id'] == fake_spool('04AAAAAA')['id']
+    assert mirror.lookup(catalog_uid(1)) is None
+    assert stats['size'] == 5
+
+
+def test_full_resync_on_total_mismatch(server, mirror):
+    assert mirror.sync()
+    
+    # Gelöschte Zuordnung taucht in keinem Delta auf
+    server.change_catalog(catalog_uid(2), active=None)
+    assert mirror.sync()
+    
+    stats = mirror.stats()
+    assert (stats['full_syncs'], stats['delta_syncs']) == (2, 1)
+    assert stats['size'] == 4
+    assert mirror.lookup(catalog_uid(2)) is None
+
+
+def test_moved_uid_replaces_old_spool():
+    responses = [
+        {'cursor': '1', 'total': 2, 'entries': [catalog_entry('04A1', 1), catalog_entry('04B2', 1)]},
+        # UID auf eine andere Spule umgehängt (filament_nfc_uids.updated_at)
+        {'cursor': '2', 'total': 2, 'entries': [catalog_entry('04A1', 2)]}
+    ]
+    mirror = CatalogMirror(lambda since: responses.pop(0))
+    
+    assert mirror.sync()
+    assert mirror.sync()
+    
+    assert mirror.stats()['full_syncs'] == 1
+    assert mirror.lookup('04A1')['spool']['id'] == 2
+    assert mirror.by_spool == {'1': {'04B2'}, '2': {'04A1'}}
+    # Die alte Spule verliert nur die umgehängte UID
+    assert mirror.remove_spool(1) == 1
+    assert mirror.lookup('04A1') is not None
+
+
+def test_sync_error_keeps_entries():
+    responses = [{'cursor': '1', 'total': 1, 'entries': [catalog_entry('04A1', 1)]}, None]
+    mirror = CatalogMirror(lambda since: responses.pop(0))
+    
+    assert mirror.sync()
+    assert not mirror.sync()
+    
+    assert mirror.stats()['sync_errors'] == 1
+    assert mirror.stats()['cursor'] == '1'
+    assert mirror.lookup('04A1') is not None
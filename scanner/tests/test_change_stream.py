@@ -0,0 +1,118 @@
+import time
+
+import pytest
+
+from filament_scanner.change_stream import ChangeStream, iter_sse
+from filament_scanner.core import ACR122UNFCScanner
+from filament_scanner.fake_lookup_server import FakeLookupServer, catalog_uid, fake_spool
+from filament_scanner.lookup_client import LookupClient
+from filament_scanner.reader_emulator import EmulatorBackend
+
+CONFIG = {'HTTP_RETRIES': '0', 'HTTP_CONNECT_TIMEOUT': '1', 'HTTP_READ_TIMEOUT': '2'}
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def server():
+    server = FakeLookupServer(latency_ms=0, jitter_ms=0, catalog_size=3, stream_duration=0.3).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client(server):
+    client = LookupClient(server.url, 'test', CONFIG)
+    yield client
+    client.close()
+
+
+def test_iter_sse():
+    lines = [
+        'retry: 2000',
+        ': ping',
+        'id: 7',
+        'event: spool',
+        'data: {"a": 1,',
+        'data:  "b": 2}',
+        '',
+        '',
+        'data: ohne Art',
+        ''
+    ]
+    assert list(iter_sse(lines)) == [
+        {'retry': 2000},
+        {'id': '7', 'event': 'spool', 'data': '{"a": 1,\n "b": 2}'},
+        {'id': None, 'event': 'message', 'data': 'ohne Art'}
+    ]
+
+
+def test_reconnect_resumes_from_last_event_id(server, client):
+    received = []
+    sent_ids = []
+    
+    def connect(session, headers, timeout):
+        sent_ids.append(headers.get('Last-Event-ID'))
+        return client.open_change_stream(session, headers, timeout)
+    
+    stream = ChangeStream(connect, lambda kind, data: received.append((kind, data['nfc_uid'])))
+    stream.start()
+    try:
+        assert wait_for(lambda: stream.connected)
+        server.change_catalog('04AAAAAA')
+        assert wait_for(lambda: len(received) == 1)
+        
+        # Änderung während der Server den Stream neu aufbaut
+        assert wait_for(lambda: not stream.connected)
+        server.change_catalog('04BBBBBB', active=None)
+        assert wait_for(lambda: len(received) == 2)
+    finally:
+        stream.stop()
+    
+    assert received == [('bind', '04AAAAAA'), ('unbind', '04BBBBBB')]
+    assert sent_ids[:2] == [None, '1']
+    assert stream.stats()['last_event_id'] == '2'
+    assert stream.errors == 0
+
+
+def test_unknown_last_event_id_resets(client):
+    received = []
+    stream = ChangeStream(client.open_change_stream, lambda kind, data: received.append(kind))
+    stream.last_event_id = '99'
+    stream.start()
+    try:
+        assert wait_for(lambda: received)
+    finally:
+        stream.stop()
+    
+    assert received[0] == 'reset'
+
+
+def test_changes_applied_to_cache_and_catalog(server):
+    config = dict(CONFIG, CHANGE_STREAM='1', CATALOG_MIRROR='1', JOURNAL_FILE='')
+    scanner = ACR122UNFCScanner(server.url, 'test', config=config, backend=EmulatorBackend())
+    try:
+        assert scanner.catalog.sync()
+        scanner.cache.put('04CCCCCC', {'found': False})
+        assert scanner.start_change_stream()
+        assert wait_for(lambda: scanner.change_stream.connected)
+        
+        server.update_spool(catalog_uid(1), remaining_weight=123.0)
+        server.change_catalog(catalog_uid(2), active=False)
+        server.change_catalog('04CCCCCC')
+        assert wait_for(lambda: scanner.change_stream.events == 3)
+        
+        assert scanner.catalog.lookup(catalog_uid(1))['spool']['remaining_weight'] == 123.0
+        assert scanner.catalog.lookup(catalog_uid(2)) is None
+        # Frisch registrierter Tag ersetzt das gecachte "unbekannt"
+        assert scanner.cache.get('04CCCCCC')['spool']['id'] == fake_spool('04CCCCCC')['id']
+        assert scanner.catalog.lookup('04CCCCCC') is not None
+    finally:
+        scanner.close()
@@ -0,0 +1,121 @@
+import pytest
+
+from filament_scanner import circuit_breaker
+from filament_scanner.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, 'monotonic', clock)
+    return clock
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+    
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats()['rejected'] == 1
+    assert breaker.retry_in() == pytest.approx(10)
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2)
+    
+    breaker.record_failure()
+    breaker.record_success(10)
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_allows_single_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    
+    clock.now += 10
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # Nur eine Probe gleichzeitig
+    assert not breaker.allow()
+    
+    breaker.record_success(10)
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_doubles_timeout_up_to_maximum(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, max_reset_timeout=30)
+    breaker.record_failure()
+    
+    for expected in (20, 30, 30):
+        clock.now += breaker.retry_in()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert breaker.retry_in() == pytest.approx(expected)
+    
+    # Erfolgreiche Probe setzt die Wartezeit zurück
+    clock.now += breaker.retry_in()
+    assert breaker.allow()
+    breaker.record_success(10)
+    breaker.record_failure()
+    assert breaker.retry_in() == pytest.approx(10)
+
+
+def test_slow_responses_trip_breaker(clock):
+    breaker = CircuitBreaker(slow_threshold=2, slo_ms=100)
+    
+    breaker.record_success(150)
+    breaker.record_success(50)
+    breaker.record_success(150)
+    assert breaker.state == CLOSED
+    
+    breaker.record_success(150)
+    assert breaker.state == OPEN
+
+
+def test_slow_probe_keeps_breaker_open(clock):
+    breaker = CircuitBreaker(failure_threshold=1, slo_ms=100, reset_timeout=10)
+    breaker.record_failure()
+    
+    clock.now += 10
+    assert breaker.allow()
+    breaker.record_success(500)
+    assert breaker.state == OPEN
+
+
+def test_latency_ignored_without_slow_threshold(clock):
+    breaker = CircuitBreaker(slow_threshold=0, slo_ms=100)
+    for _ in range(10):
+        breaker.record_success(5000)
+    assert breaker.state == CLOSED
+
+
+def test_listeners_see_transitions(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    transitions = []
+    breaker.add_listener(lambda previous, state: transitions.append((previous, state)))
+    # Ein fehlerhafter Abnehmer darf die übrigen nicht aufhalten
+    breaker.add_listener(lambda previous, state: 1 / 0)
+    
+    breaker.record_failure()
+    clock.now += 10
+    breaker.allow()
+    breaker.record_success(10)
+    
+    assert transitions == [(CLOSED, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, CLOSED)]
+    assert breaker.stats()['trips'] == 1
@@ -0,0 +1,62 @@
+import threading
+import time
+
+from filament_scanner.cli import ScannerCLI
+from filament_scanner.metrics import MetricsRegistry
+
+
+class FakeScanner:
+    """Nur was der Abgleich getaggter Scans braucht"""
+    
+    def __init__(self, lookup_time: float = 0.05):
+        self.metrics = MetricsRegistry()
+        self.lookup_time = lookup_time
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.scans = []
+        self.reconciled = []
+    
+    def process_scan(self, nfc_uid, reader=None):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.lookup_time)
+        with self.lock:
+            self.active -= 1
+            self.scans.append(nfc_uid)
+        return {'found': True, 'spool': {'id': 1}}
+    
+    def reconcile_tag(self, nfc_uid, reader, tag, result):
+        self.reconciled.append((nfc_uid, tag['number']))
+        return {'changed': [], 'written': False, 'blocked': None}
+    
+    def emit(self, kind, data):
+        pass
+
+
+def test_tap_burst_reconciles_once_per_uid():
+    scanner = FakeScanner()
+    cli = ScannerCLI(scanner)
+    
+    for number in range(1, 6):
+        cli.schedule_reconcile('A', 'r1', {'number': number}, number)
+    cli.stop_reconcilers()
+    
+    # Jeder Tap protokolliert, aber nur der neueste schreibt - nie parallel auf einem Reader
+    assert scanner.scans == ['A'] * 5
+    assert scanner.reconciled == [('A', 5)]
+    assert scanner.max_active == 1
+    assert cli.reconcile_taps == {}
+
+
+def test_readers_reconcile_independently():
+    scanner = FakeScanner(lookup_time=0.2)
+    cli = ScannerCLI(scanner)
+    
+    cli.schedule_reconcile('A', 'r1', {'number': 1}, 1)
+    cli.schedule_reconcile('B', 'r2', {'number': 2}, 2)
+    cli.stop_reconcilers()
+    
+    assert sorted(scanner.reconciled) == [('A', 1), ('B', 2)]
+    assert scanner.max_active == 2
@@ -0,0 +1,128 @@
+import pytest
+
+from filament_scanner import endpoint_pool
+from filament_scanner.circuit_breaker import CircuitBreaker, OPEN, HALF_OPEN, CLOSED
+from filament_scanner.endpoint_pool import EndpointPool, parse_api_urls, MIN_SAMPLES
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Gilt auch für die Circuit Breaker (gemeinsames time Modul)
+    monkeypatch.setattr(endpoint_pool.time, 'monotonic', clock)
+    return clock
+
+
+def make_pool(*urls: str) -> EndpointPool:
+    return EndpointPool(list(urls), lambda name: CircuitBreaker(failure_threshold=1, reset_timeout=10, name=name))
+
+
+def test_parse_api_urls():
+    assert parse_api_urls(' http://lan/ , https://cloud/api,, ') == ['http://lan', 'https://cloud/api']
+    assert parse_api_urls('') == []
+
+
+def test_requires_endpoint():
+    with pytest.raises(ValueError):
+        make_pool()
+
+
+def test_breaker_names_url_only_with_several_endpoints():
+    assert make_pool('http://a').endpoints[0].breaker.name == 'Lookup Service'
+    assert [e.breaker.name for e in make_pool('http://a', 'http://b').endpoints] == ['http://a', 'http://b']
+
+
+def test_choose_prefers_fastest_measured_endpoint(clock):
+    pool = make_pool('http://a', 'http://b', 'http://c')
+    a, b, c = pool.endpoints
+    
+    # Ungemessen: Konfigurationsreihenfolge
+    assert pool.choose() == [a, b, c]
+    
+    a.record(80, ok=True)
+    b.record(20, ok=True)
+    assert pool.choose() == [b, a, c]
+    assert pool.preferred is b
+
+
+def test_error_rate_penalizes_endpoint(clock):
+    pool = make_pool('http://a', 'http://b')
+    a, b = pool.endpoints
+    a.record(20, ok=True)
+    b.record(40, ok=True)
+    
+    a.breaker.failure_threshold = 10
+    a.record(0, ok=False)
+    a.record(0, ok=False)
+    assert pool.choose() == [b, a]
+
+
+def test_choose_skips_open_endpoints(clock):
+    pool = make_pool('http://a', 'http://b')
+    a, b = pool.endpoints
+    a.record(0, ok=False)
+    
+    assert a.breaker.state == OPEN
+    assert pool.choose() == [b]
+    assert pool.state == CLOSED
+
+
+def test_choose_all_open_hands_out_single_probe(clock):
+    pool = make_pool('http://a', 'http://b')
+    for endpoint in pool.endpoints:
+        endpoint.record(0, ok=False)
+    
+    assert pool.state == OPEN
+    assert pool.choose() == []
+    
+    clock.now += 10
+    chosen = pool.choose()
+    assert len(chosen) == 1
+    assert chosen[0].breaker.state == HALF_OPEN
+
+
+def test_due_for_probe(clock):
+    pool = make_pool('http://a', 'http://b')
+    a, b = pool.endpoints
+    a.record(10, ok=True)
+    b.record(0, ok=False)
+    
+    # b ist gesperrt und noch nicht fällig, a gerade benutzt
+    assert pool.due_for_probe(idle_interval=30) == []
+    
+    clock.now += 30
+    assert pool.due_for_probe(idle_interval=30) == [a, b]
+
+
+def test_single_endpoint_not_probed_when_idle(clock):
+    pool = make_pool('http://a')
+    pool.endpoints[0].record(10, ok=True)
+    clock.now += 300
+    assert pool.due_for_probe(idle_interval=30) == []
+
+
+def test_untimed_response_counts_only_outcome(clock):
+    endpoint = make_pool('http://a').endpoints[0]
+    endpoint.record(None, ok=True)
+    
+    assert endpoint.latency_ms is None
+    assert endpoint.requests == 1
+    assert endpoint.errors == 0
+
+
+def test_p95_needs_enough_samples(clock):
+    endpoint = make_pool('http://a').endpoints[0]
+    for duration in range(1, MIN_SAMPLES):
+        endpoint.record(duration, ok=True)
+    assert endpoint.p95() is None
+    
+    endpoint.record(MIN_SAMPLES, ok=True)
+    assert endpoint.p95() == 19
@@ -0,0 +1,95 @@
+import pytest
+
+from filament_scanner import lookup_cache
+from filament_scanner.lookup_cache import LookupCache, normalize_uid
+
+FOUND = {'found': True, 'spool': {'id': 1, 'material': 'PLA'}}
+NOT_FOUND = {'found': False}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(lookup_cache.time, 'monotonic', clock)
+    return clock
+
+
+def test_normalize_uid():
+    assert normalize_uid(' 04:a1-b2 c3 ') == '04A1B2C3'
+
+
+def test_lookup_by_normalized_uid(clock):
+    cache = LookupCache()
+    cache.put('04:a1:b2', FOUND)
+    
+    assert cache.get('04A1B2') is FOUND
+    assert cache.stats()['hits'] == 1
+
+
+def test_least_recently_used_evicted(clock):
+    cache = LookupCache(max_size=2)
+    cache.put('A', FOUND)
+    cache.put('B', FOUND)
+    cache.get('A')
+    cache.put('C', FOUND)
+    
+    assert cache.get('B') is None
+    assert cache.get('A') is FOUND
+    assert cache.get('C') is FOUND
+    assert cache.evictions == 1
+
+
+def test_expired_entry_kept_as_stale_fallback(clock):
+    cache = LookupCache(ttl=10)
+    cache.put('A', FOUND)
+    
+    clock.now += 10
+    assert cache.get('A') is None
+    assert cache.get_stale('A') is FOUND
+
+
+def test_negative_results_expire_sooner(clock):
+    cache = LookupCache(ttl=300, negative_ttl=30)
+    cache.put('A', NOT_FOUND)
+    
+    clock.now += 29
+    assert cache.get('A') is NOT_FOUND
+    clock.now += 1
+    assert cache.get('A') is None
+    # Unbekannte Tags nie als Notreserve
+    assert cache.get_stale('A') is None
+
+
+def test_errors_not_cached(clock):
+    cache = LookupCache()
+    cache.put('A', {'error': 'HTTP 500'})
+    assert cache.get('A') is None
+
+
+def test_disabled_cache(clock):
+    cache = LookupCache(max_size=0)
+    cache.put('A', FOUND)
+    assert not cache.enabled
+    assert cache.get('A') is None
+
+
+def test_spool_changes_update_all_uids(clock):
+    cache = LookupCache()
+    cache.put('A', FOUND)
+    cache.put('B', FOUND)
+    cache.put('C', dict(FOUND, spool={'id': 2}))
+    
+    assert cache.patch_spool(1, {'id': 1, 'material': 'PETG'}) == 2
+    assert cache.get('B')['spool']['material'] == 'PETG'
+    
+    assert cache.invalidate_spool('1') == 2
+    assert cache.get('A') is None
+    assert cache.get('C') is not None
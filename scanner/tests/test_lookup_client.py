@@ -0,0 +1,106 @@
+import pytest
+
+from filament_scanner.circuit_breaker import OPEN
+from filament_scanner.core import ACR122UNFCScanner
+from filament_scanner.fake_lookup_server import FakeLookupServer, MAX_UPLOAD_SIZE
+from filament_scanner.lookup_client import LookupClient
+from filament_scanner.reader_emulator import EmulatorBackend
+
+# Port 9 (discard) - Verbindung wird sofort abgelehnt
+UNREACHABLE = 'http://127.0.0.1:9'
+CONFIG = {'HTTP_RETRIES': '0', 'HTTP_CONNECT_TIMEOUT': '1', 'HTTP_READ_TIMEOUT': '2'}
+
+
+@pytest.fixture
+def server():
+    server = FakeLookupServer(latency_ms=0, jitter_ms=0, catalog_size=5, stream_duration=1).start()
+    yield server
+    server.stop()
+
+
+def test_failover_to_next_endpoint(server):
+    client = LookupClient(f"{UNREACHABLE},{server.url}", 'test', CONFIG)
+    try:
+        assert 'error' not in client.lookup('04A1B2C3')
+        assert client.fetch_catalog() is not None
+        assert client.metrics.snapshot()['counters']['endpoint_failovers'] >= 1
+    finally:
+        client.close()
+
+
+def test_fast_fail_while_all_endpoints_blocked():
+    client = LookupClient(UNREACHABLE, 'test', dict(CONFIG, BREAKER_FAILURES='1'))
+    try:
+        assert 'error' in client.lookup('04A1B2C3')
+        assert client.endpoints.state == OPEN
+        
+        assert client.lookup('04A1B2C3')['offline']
+        assert client.fetch_catalog() is None
+        assert client.open_change_stream(client.session, {}, client.http_timeout) is None
+        assert client.metrics.snapshot()['counters']['circuit_fast_fails'] == 2
+    finally:
+        client.close()
+
+
+def test_batch_errors_are_separate_objects():
+    client = LookupClient(UNREACHABLE, 'test', CONFIG)
+    try:
+        results = client.lookup_batch([{'nfc_uid': 'A'}, {'nfc_uid': 'B'}])
+        assert all('error' in result for result in results)
+        
+        # process_scan ergänzt Ergebnisse - darf nicht auf andere Scans durchschlagen
+        results[0]['queued'] = True
+        assert 'queued' not in results[1]
+    finally:
+        client.close()
+
+
+def test_oversized_scan_log_split(server):
+    client = LookupClient(server.url, 'test', CONFIG)
+    client.scan_log_max_size = MAX_UPLOAD_SIZE + 100
+    scans = [{'nfc_uid': f'04{index:06X}', 'scanned_at': 1} for index in range(MAX_UPLOAD_SIZE + 200)]
+    try:
+        assert client.upload_scan_log(scans) == len(scans)
+        # Einmal halbiert, danach passen alle Uploads
+        assert client.scan_log_max_size == (MAX_UPLOAD_SIZE + 100) // 2
+        assert server.stats()['logged'] == len(scans)
+        assert server.stats()['uploads'] == 3
+    finally:
+        client.close()
+
+
+def test_scan_log_kept_on_server_error(server):
+    server.error_rate = 1.0
+    client = LookupClient(server.url, 'test', CONFIG)
+    try:
+        assert client.upload_scan_log([{'nfc_uid': '04A1B2C3'}]) == 0
+    finally:
+        client.close()
+
+
+def test_scan_log_falls_back_without_endpoint(server):
+    server.scan_log = False
+    client = LookupClient(server.url, 'test', CONFIG)
+    client.log_scans = False
+    try:
+        assert client.upload_scan_log([{'nfc_uid': '04A1B2C3'}]) == 0
+        assert client.log_scans
+    finally:
+        client.close()
+
+
+def test_journal_replayed_by_lookup_without_scan_log(server, tmp_path):
+    server.scan_log = False
+    config = dict(CONFIG, JOURNAL_FILE=str(tmp_path / 'journal.db'), JOURNAL_FLUSH_INTERVAL='60')
+    scanner = ACR122UNFCScanner(server.url, 'test', config=config, backend=EmulatorBackend())
+    try:
+        assert scanner.start_journal()
+        for index in range(3):
+            scanner.journal.append(f'04{index:06X}', 'test')
+        
+        assert scanner.journal_flusher.flush()
+        assert scanner.lookup_client.log_scans
+        assert server.stats()['logged'] == 3
+        assert scanner.journal.pending_count() == 0
+    finally:
+        scanner.close()
@@ -0,0 +1,93 @@
+from filament_scanner.presence import PresenceTracker
+
+
+def inserted(uid: str, reader: str = 'r1'):
+    return {'type': 'inserted', 'uid': uid, 'reader': reader}
+
+
+def removed(reader: str = 'r1'):
+    return {'type': 'removed', 'reader': reader}
+
+
+def kinds(events):
+    return [(event['type'], event['uid']) for event in events]
+
+
+def test_single_tap_and_removal():
+    tracker = PresenceTracker(removal_debounce=0.8, cooldown=2.0)
+    
+    assert kinds(tracker.update(inserted('A'), now=0.0)) == [('inserted', 'A')]
+    assert tracker.update(removed(), now=1.0) == []
+    assert tracker.present_uid('r1') == 'A'  # noch in der Entprellzeit
+    
+    assert kinds(tracker.update(None, now=1.8)) == [('removed', 'A')]
+    assert tracker.present_uid('r1') is None
+
+
+def test_repeated_reports_are_duplicates():
+    tracker = PresenceTracker()
+    tracker.update(inserted('A'), now=0.0)
+    
+    assert tracker.update(inserted('A'), now=0.1) == []
+    assert tracker.stats()['duplicates'] == 1
+    assert tracker.stats()['taps'] == 1
+
+
+def test_short_dropout_is_bridged():
+    tracker = PresenceTracker(removal_debounce=0.8)
+    tracker.update(inserted('A'), now=0.0)
+    tracker.update(removed(), now=1.0)
+    
+    assert tracker.update(inserted('A'), now=1.5) == []
+    assert tracker.update(None, now=5.0) == []
+    assert tracker.stats()['flaps'] == 1
+
+
+def test_cooldown_suppresses_quick_retap():
+    tracker = PresenceTracker(removal_debounce=0.1, cooldown=2.0)
+    tracker.update(inserted('A'), now=0.0)
+    tracker.update(removed(), now=0.2)
+    tracker.update(None, now=0.4)
+    
+    # Innerhalb der Sperrzeit: weder Auflegen noch späteres Entfernen melden
+    assert tracker.update(inserted('A'), now=1.0) == []
+    tracker.update(removed(), now=1.1)
+    assert tracker.update(None, now=1.3) == []
+    assert tracker.stats()['cooldown_suppressed'] == 1
+    
+    assert kinds(tracker.update(inserted('A'), now=2.5)) == [('inserted', 'A')]
+
+
+def test_swap_during_debounce_reports_old_removal_first():
+    tracker = PresenceTracker(removal_debounce=0.8)
+    tracker.update(inserted('A'), now=0.0)
+    tracker.update(removed(), now=1.0)
+    
+    assert kinds(tracker.update(inserted('B'), now=1.2)) == [('removed', 'A'), ('inserted', 'B')]
+    # Kein zweites Entfernen für A nach Ablauf der Entprellzeit
+    assert tracker.update(None, now=3.0) == []
+    assert tracker.present_uid('r1') == 'B'
+
+
+def test_swap_without_removal_event():
+    tracker = PresenceTracker()
+    tracker.update(inserted('A'), now=0.0)
+    
+    assert kinds(tracker.update(inserted('B'), now=0.5)) == [('removed', 'A'), ('inserted', 'B')]
+
+
+def test_readers_are_independent():
+    tracker = PresenceTracker()
+    
+    assert kinds(tracker.update(inserted('A', 'r1'), now=0.0)) == [('inserted', 'A')]
+    assert kinds(tracker.update(inserted('B', 'r2'), now=0.1)) == [('inserted', 'B')]
+    assert tracker.present_uid('r1') == 'A'
+    assert tracker.present_uid('r2') == 'B'
+
+
+def test_unreadable_uid_ignored():
+    tracker = PresenceTracker()
+    tracker.update(inserted('A'), now=0.0)
+    
+    assert tracker.update({'type': 'inserted', 'uid': None, 'reader': 'r1'}, now=0.1) == []
+    assert tracker.present_uid('r1') == 'A'
@@ -0,0 +1,205 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from filament_scanner.batch_lookup import MAX_BATCH_SIZE
+from filament_scanner.core import ACR122UNFCScanner
+from filament_scanner.fake_lookup_server import FakeLookupServer
+from filament_scanner.reader_emulator import EmulatorBackend
+from filament_scanner.scan_journal import ScanJournal, JournalFlusher
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = ScanJournal(str(tmp_path / 'journal.db'))
+    yield journal
+    journal.close()
+
+
+def test_flusher_retries_undelivered_scans(journal):
+    ids = [journal.append(uid, 'scanner') for uid in ('A', 'B', 'C')]
+    # Erster Versuch: nur der erste Scan kommt an
+    flusher = JournalFlusher(journal, lambda batch: [batch[0]['id']])
+    
+    assert not flusher.flush()
+    assert flusher.failed_rounds == 1
+    assert [(entry['id'], entry['attempts']) for entry in journal.pending()] == [(ids[1], 1), (ids[2], 1)]
+    
+    flusher.replay = lambda batch: [entry['id'] for entry in batch]
+    assert flusher.flush()
+    assert flusher.replayed == 3
+    assert journal.pending_count() == 0
+
+
+def test_flusher_batch_size(journal):
+    for index in range(5):
+        journal.append(f'04{index:06X}', 'scanner')
+    sizes = []
+    
+    def replay(batch):
+        sizes.append(len(batch))
+        return [entry['id'] for entry in batch]
+    
+    assert JournalFlusher(journal, replay, batch_size=2).flush()
+    assert sizes == [2, 2, 1]
+
+
+def test_claimed_scan_not_pending(journal):
+    claimed = journal.append('A', 'scanner', claimed=True)
+    journal.append('B', 'scanner')
+    
+    assert [entry['nfc_uid'] for entry in journal.pending()] == ['B']
+    
+    journal.release([claimed])
+    assert [entry['nfc_uid'] for entry in journal.pending()] == ['A', 'B']
+
+
+def test_claims_released_on_reopen(tmp_path):
+    path = str(tmp_path / 'journal.db')
+    journal = ScanJournal(path)
+    journal.append('A', 'scanner', claimed=True)
+    journal.close()
+    
+    # Der Lookup des beendeten Prozesses kommt nie zurück
+    journal = ScanJournal(path)
+    try:
+        assert [entry['nfc_uid'] for entry in journal.pending()] == ['A']
+    finally:
+        journal.close()
+
+
+def test_old_journal_gets_claim_column(tmp_path):
+    path = str(tmp_path / 'journal.db')
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE scans (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nfc_uid TEXT NOT NULL,
+            scanner_id TEXT NOT NULL,
+            scanned_at INTEGER NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute("INSERT INTO scans (nfc_uid, scanner_id, scanned_at) VALUES ('A', 'scanner', 1)")
+    conn.commit()
+    conn.close()
+    
+    journal = ScanJournal(path)
+    try:
+        assert [entry['nfc_uid'] for entry in journal.pending()] == ['A']
+    finally:
+        journal.close()
+
+
+def test_flusher_skips_scan_with_running_lookup(tmp_path):
+    # Lookup protokolliert serverseitig (SCAN_LOG_UPLOAD=0) und ist langsam
+    server = FakeLookupServer(latency_ms=400, jitter_ms=0).start()
+    config = {
+        'JOURNAL_FILE': str(tmp_path / 'journal.db'),
+        'JOURNAL_FLUSH_INTERVAL': '0.02',
+        'SCAN_LOG_UPLOAD': '0',
+        'CACHE_SIZE': '0',
+        'HTTP_RETRIES': '0'
+    }
+    scanner = ACR122UNFCScanner(server.url, 'test', config=config, backend=EmulatorBackend())
+    try:
+        assert scanner.start_journal()
+        
+        scan = threading.Thread(target=scanner.process_scan, args=('04A1B2C3D4E5F6',))
+        scan.start()
+        # Flusher läuft während des Lookups mehrfach
+        deadline = time.monotonic() + 0.3
+        while time.monotonic() < deadline:
+            scanner.journal_flusher.wake()
+            time.sleep(0.02)
+        scan.join(timeout=5)
+        
+        assert server.stats()['logged'] == 1
+        assert scanner.journal.pending_count() == 0
+    finally:
+        scanner.close()
+        server.stop()
+
+
+def test_cache_hit_still_logged(tmp_path):
+    server = FakeLookupServer(latency_ms=0, jitter_ms=0).start()
+    config = {
+        'JOURNAL_FILE': str(tmp_path / 'journal.db'),
+        'JOURNAL_FLUSH_INTERVAL': '60',
+        'SCAN_LOG_UPLOAD': '0',
+        'HTTP_RETRIES': '0'
+    }
+    scanner = ACR122UNFCScanner(server.url, 'test', config=config, backend=EmulatorBackend())
+    try:
+        assert scanner.start_journal()
+        
+        scanner.process_scan('04A1B2C3D4E5F6')
+        assert scanner.process_scan('04A1B2C3D4E5F6').get('cached')
+        assert server.stats()['logged'] == 1
+        # Der Cache-Treffer wartet im Journal und wird nachgereicht
+        assert scanner.journal.pending_count() == 1
+        
+        assert scanner.journal_flusher.flush()
+        assert server.stats()['logged'] == 2
+        assert scanner.journal.pending_count() == 0
+    finally:
+        scanner.close()
+        server.stop()
+
+
+def test_journal_replay_respects_server_batch_limit(tmp_path):
+    server = FakeLookupServer(latency_ms=0, jitter_ms=0).start()
+    config = {
+        'JOURNAL_FILE': str(tmp_path / 'journal.db'),
+        'JOURNAL_FLUSH_INTERVAL': '60',
+        'JOURNAL_BATCH_SIZE': str(MAX_BATCH_SIZE * 5),
+        'SCAN_LOG_UPLOAD': '0',
+        'HTTP_RETRIES': '0'
+    }
+    # Offline gesammelte Scans aus einem früheren Lauf
+    journal = ScanJournal(config['JOURNAL_FILE'])
+    for index in range(MAX_BATCH_SIZE + 50):
+        journal.append(f'04{index:06X}', 'test')
+    journal.close()
+    
+    scanner = ACR122UNFCScanner(server.url, 'test', config=config, backend=EmulatorBackend())
+    try:
+        assert scanner.journal_batch_size == MAX_BATCH_SIZE
+        assert scanner.start_journal()
+        assert scanner.journal_flusher.batch_size == MAX_BATCH_SIZE
+        
+        assert scanner.journal_flusher.flush()
+        assert server.stats()['logged'] == MAX_BATCH_SIZE + 50
+        assert scanner.journal.pending_count() == 0
+    finally:
+        scanner.close()
+        server.stop()
+
+
+def test_journal_kept_while_server_fails(tmp_path):
+    server = FakeLookupServer(latency_ms=0, jitter_ms=0, error_rate=1.0).start()
+    config = {
+        'JOURNAL_FILE': str(tmp_path / 'journal.db'),
+        'JOURNAL_FLUSH_INTERVAL': '60',
+        'SCAN_LOG_UPLOAD': '0',
+        'CACHE_SIZE': '0',
+        'HTTP_RETRIES': '0',
+        'BREAKER_FAILURES': '100'
+    }
+    scanner = ACR122UNFCScanner(server.url, 'test', config=config, backend=EmulatorBackend())
+    try:
+        assert scanner.start_journal()
+        
+        assert scanner.process_scan('04A1B2C3D4E5F6')['queued']
+        assert not scanner.journal_flusher.flush()
+        assert scanner.journal.pending()[0]['attempts'] == 1
+        
+        server.error_rate = 0.0
+        assert scanner.journal_flusher.flush()
+        assert server.stats()['logged'] == 1
+        assert scanner.journal.pending_count() == 0
+    finally:
+        scanner.close()
+        server.stop()
@@ -0,0 +1,172 @@
+from typing import List, Optional
+
+import pytest
+
+from filament_scanner.reader_emulator import EmulatedTag
+from filament_scanner.tag_record import (
+    CC_PAGE, PAGE_SIZE, USER_START_PAGE, MAX_MATERIAL_BYTES, DYNAMIC_LOCK_PAGES,
+    encode_payload, decode_payload, encode_tag_memory, decode_tag_memory, is_blank_user_area,
+    read_spool_record, write_spool_record, writeback_blocker, changed_fields
+)
+
+SPOOL = {
+    'id': 4711,
+    'uuid': '0b5c3a4e-7d1f-4c2a-9e8b-123456789abc',
+    'material': 'PETG',
+    'total_weight': 1000,
+    'remaining_weight': 642.6
+}
+
+
+class TagSession:
+    """Kartensitzung auf einem EmulatedTag - merkt sich die geschriebenen Seiten"""
+    
+    def __init__(self, tag: EmulatedTag, fail_after: Optional[int] = None):
+        self.tag = tag
+        self.fail_after = fail_after  # Tag nach so vielen Schreibzugriffen abgezogen
+        self.writes: List[int] = []
+    
+    def transmit(self, apdu: List[int], label: str = ''):
+        page = apdu[3]
+        if apdu[1] == 0xB0:
+            data = self.tag.read(page)
+            return (data, 0x90, 0x00) if data is not None else ([], 0x6A, 0x82)
+        
+        if self.fail_after is not None and len(self.writes) >= self.fail_after:
+            return [], 0x63, 0x00
+        self.writes.append(page)
+        return [], (0x90 if self.tag.write(page, apdu[5:]) else 0x63), 0x00
+
+
+def test_payload_round_trip():
+    record = decode_payload(encode_payload(SPOOL, revision=7))
+    
+    assert record['revision'] == 7
+    assert record['spool'] == dict(SPOOL, remaining_weight=643)
+
+
+def test_payload_limits():
+    spool = dict(SPOOL, uuid='keine-uuid', material='ä' * 40, total_weight=100000, remaining_weight=-5)
+    record = decode_payload(encode_payload(spool, revision=0x1FFFF))
+    
+    assert record['revision'] == 0xFFFF
+    assert record['spool']['uuid'] == '00000000-0000-0000-0000-000000000000'
+    # Auf ganze Zeichen gekürzt
+    assert record['spool']['material'] == 'ä' * (MAX_MATERIAL_BYTES // 2)
+    assert record['spool']['total_weight'] == 0xFFFF
+    assert record['spool']['remaining_weight'] == 0
+
+
+def test_tag_memory_round_trip():
+    data = encode_tag_memory(SPOOL, revision=3)
+    
+    assert len(data) % PAGE_SIZE == 0
+    assert decode_tag_memory(data)['spool']['id'] == SPOOL['id']
+    # Vorangestellte Null-TLVs werden übersprungen
+    assert decode_tag_memory(bytes(2) + data)['revision'] == 3
+
+
+def test_foreign_or_empty_memory_not_decoded():
+    data = bytearray(encode_tag_memory(SPOOL, revision=1))
+    data[5] ^= 0xFF  # erstes Zeichen des Record-Typs
+    
+    assert decode_tag_memory(bytes(data)) is None
+    assert decode_tag_memory(bytes([0x03, 0x00, 0xFE, 0x00])) is None
+    assert decode_tag_memory(bytes(16)) is None
+
+
+def test_is_blank_user_area():
+    assert is_blank_user_area(bytes([0x03, 0x00, 0xFE, 0x00]))
+    assert is_blank_user_area(bytes([0x00, 0x03, 0x00, 0xFE]))
+    assert not is_blank_user_area(encode_tag_memory(SPOOL, revision=1))
+    assert not is_blank_user_area(bytes(16))
+
+
+def test_write_and_read_back():
+    tag = EmulatedTag('04A1B2C3D4E5F6')
+    session = TagSession(tag)
+    
+    assert write_spool_record(session, SPOOL, revision=2, user_bytes=tag.user_bytes)
+    record = read_spool_record(session)
+    
+    assert record['revision'] == 2
+    assert record['spool']['material'] == 'PETG'
+
+
+def test_header_page_written_last():
+    session = TagSession(EmulatedTag('04A1B2C3D4E5F6'))
+    write_spool_record(session, SPOOL, revision=1)
+    
+    assert session.writes[0] == USER_START_PAGE
+    assert session.writes[-1] == USER_START_PAGE
+    assert USER_START_PAGE not in session.writes[1:-1]
+
+
+@pytest.mark.parametrize('fail_after', [1, 3])
+def test_interrupted_write_leaves_blank_tag(fail_after):
+    tag = EmulatedTag('04A1B2C3D4E5F6')
+    tag.write_record(dict(SPOOL, material='PLA'), revision=1)
+    session = TagSession(tag, fail_after=fail_after)
+    
+    assert not write_spool_record(session, SPOOL, revision=2)
+    
+    # Kein halb alter, halb neuer Record - der Tag gilt als leer
+    assert read_spool_record(session) is None
+    assert is_blank_user_area(tag.read(USER_START_PAGE))
+
+
+def test_record_too_large_for_tag():
+    session = TagSession(EmulatedTag('04A1B2C3D4E5F6'))
+    assert not write_spool_record(session, SPOOL, revision=1, user_bytes=16)
+    assert session.writes == []
+
+
+def test_writeback_allowed_on_blank_or_own_tag():
+    tag = EmulatedTag('04A1B2C3D4E5F6')
+    assert writeback_blocker(TagSession(tag), own_record=False, user_bytes=tag.user_bytes) is None
+    
+    tag.write_record(SPOOL)
+    assert writeback_blocker(TagSession(tag), own_record=True, user_bytes=tag.user_bytes) is None
+
+
+def test_writeback_refused_for_foreign_content():
+    tag = EmulatedTag('04A1B2C3D4E5F6')
+    # URL Record (TNF 1, Typ 'U')
+    tag.memory[16:24] = bytes([0x03, 0x05, 0xD1, 0x01, 0x01, 0x55, 0x04, 0xFE])
+    assert writeback_blocker(TagSession(tag), own_record=False) is not None
+
+
+def test_writeback_refused_without_ndef_cc():
+    tag = EmulatedTag('04A1B2C3D4E5F6')
+    tag.memory[CC_PAGE * PAGE_SIZE] = 0x00
+    assert writeback_blocker(TagSession(tag), own_record=True) is not None
+
+
+def test_writeback_refused_for_read_only_cc():
+    tag = EmulatedTag('04A1B2C3D4E5F6')
+    tag.memory[CC_PAGE * PAGE_SIZE + 3] = 0x0F
+    assert writeback_blocker(TagSession(tag), own_record=True) is not None
+
+
+def test_writeback_refused_for_static_lock():
+    tag = EmulatedTag('04A1B2C3D4E5F6')
+    tag.memory[10] = 0x10  # Seite 4 gesperrt
+    assert writeback_blocker(TagSession(tag), own_record=True) is not None
+
+
+def test_writeback_refused_for_dynamic_lock():
+    tag = EmulatedTag('04A1B2C3D4E5F6')
+    tag.memory[DYNAMIC_LOCK_PAGES[tag.user_bytes] * PAGE_SIZE] = 0x01
+    
+    assert writeback_blocker(TagSession(tag), own_record=True, user_bytes=tag.user_bytes) is not None
+    # Ohne bekannte Speichergröße keine dynamischen Lock Bytes prüfen
+    assert writeback_blocker(TagSession(tag), own_record=True) is None
+
+
+def test_changed_fields():
+    tag_spool = decode_payload(encode_payload(SPOOL, revision=1))['spool']
+    
+    assert changed_fields(tag_spool, SPOOL) == []
+    assert changed_fields(tag_spool, dict(SPOOL, remaining_weight=500, material='PLA')) == [
+        'material', 'remaining_weight'
+    ]
@@ -90,13 +90,15 @@ CREATE TABLE filament_nfc_uids (
   tag_position VARCHAR(50) NULL COMMENT 'z.B. "Spulenanfang", "Spulenende", "Etikett"',
   is_primary TINYINT(1) NOT NULL DEFAULT 0,
   created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at DATETIME NULL ON UPDATE CURRENT_TIMESTAMP,
   
   FOREIGN KEY (filament_id) REFERENCES filaments(id) ON DELETE CASCADE,
   
   INDEX idx_filament_id (filament_id),
   INDEX idx_nfc_uid (nfc_uid),
   INDEX idx_tag_type (tag_type),
-  INDEX idx_is_primary (is_primary)
+  INDEX idx_is_primary (is_primary),
+  INDEX idx_updated_at (updated_at)
 ) ENGINE=InnoDB CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
 
 -- Usage log table for tracking consumption
@@ -19,6 +19,9 @@ require_once __DIR__ . '/../src/autoload.php';
 
 use Filament\Services\BackupService;
 
+// Änderungs-Ereignisse für Scanner so lange aufbewahren
+const NFC_EVENT_RETENTION_DAYS = 7;
+
 /**
  * Log function for cron output
  */
@@ -29,6 +32,26 @@ function logMessage(string $message): void
     error_log("[Backup Cron] {$message}");
 }
 
+/**
+ * Delete scanner change events older than NFC_EVENT_RETENTION_DAYS
+ *
+ * Scanners that were offline longer receive a reset from nfc_events.php
+ * and reload their cache and catalog.
+ */
+function purgeNfcChangeEvents(PDO $pdo): void
+{
+    try {
+        $stmt = $pdo->prepare("DELETE FROM nfc_change_events WHERE created_at < NOW() - INTERVAL ? DAY");
+        $stmt->execute([NFC_EVENT_RETENTION_DAYS]);
+        if ($stmt->rowCount() > 0) {
+            logMessage("Purged {$stmt->rowCount()} old NFC change events");
+        }
+    } catch (PDOException $e) {
+        // Tabelle fehlt, solange die Migration nicht eingespielt ist - Backup nicht deswegen abbrechen
+        logMessage("NFC change event purge skipped: " . $e->getMessage());
+    }
+}
+
 try {
     logMessage("Starting automated backup process");
     
@@ -65,6 +88,9 @@ try {
             logMessage("Cleaned {$cleaned} old backup files");
         }
         
+        // Alte Änderungs-Ereignisse der Scanner aufräumen (nfc_events.php)
+        purgeNfcChangeEvents($pdo);
+        
         // Log storage usage
         $usage = $backupService->getStorageUsage();
         logMessage("Storage usage: {$usage['total_backups']} files, {$usage['total_size_formatted']} total");
@@ -46,12 +46,17 @@ class NFCController
             $nfcUid = trim($input['nfc_uid']);
             $scannerId = $input['scanner_id'] ?? 'unknown';
             
-            // Log scan attempt
-            $this->logScan($nfcUid, $scannerId);
-            
             // Find spool by NFC UID
             $spool = $this->spoolModel->findByNfcUid($nfcUid);
             
+            // Log scan attempt after the response has been sent (jsonResponse() exits)
+            register_shutdown_function(function () use ($nfcUid, $scannerId, $spool) {
+                if (function_exists('fastcgi_finish_request')) {
+                    fastcgi_finish_request();
+                }
+                $this->logScan($nfcUid, $scannerId, $spool ?: null);
+            });
+            
             if ($spool) {
                 $this->jsonResponse([
                     'found' => true,
@@ -225,19 +230,19 @@ class NFCController
     }
     
     /**
-     * Log NFC scan attempt
+     * Log NFC scan attempt with the spool already found by scan()
      */
-    private function logScan(string $nfcUid, string $scannerId): void
+    private function logScan(string $nfcUid, string $scannerId, ?array $spool): void
     {
         $logFile = __DIR__ . '/../../logs/nfc_scans.log';
         $timestamp = date('Y-m-d H:i:s');
         
-        $spool = $this->spoolModel->findByNfcUid($nfcUid);
         $result = $spool ? "Found spool ID {$spool['id']} - {$spool['material']}" : "No spool found";
         
         $logEntry = "[{$timestamp}] Scanner: {$scannerId} | UID: {$nfcUid} | {$result}\n";
         
-        file_put_contents($logFile, $logEntry, FILE_APPEND | LOCK_EX);
+        // A single short O_APPEND write does not interleave with other writers - no LOCK_EX needed
+        file_put_contents($logFile, $logEntry, FILE_APPEND);
     }
     
     /**